@@ -0,0 +1,139 @@
+"""Balon güncelleme mikro benchmark'ı - eski liste tabanlı iz vs IzDeposu
+
+Çalıştırma:
+    python benchmarks/balon_guncelleme.py [--tekrar 2000] [--iz 1 3 10 50] [--olcum 5]
+
+Eski: her güncellemede birkaç time.time(), listeye ekle + pop(0) ve 8
+kayıtlık geçmişi baştan tarayan hız hesabı (referans için aşağıda kopyası var).
+Yeni: halka tamponu + ardışık fark toplamları, kare başına tek zaman damgası.
+    Balon.guncelle  iz başına IzDeposu.guncelleTek (skaler yol)
+    skaler depo     IzDeposu.guncelle, skalerSinir sonsuz - hep skaler yol
+    toplu depo      IzDeposu.guncelle, skalerSinir sıfır - hep vektörize yol
+Her sütun --olcum çalıştırmanın en iyisidir. IzDeposu.skalerSinir son iki
+sütunun kesişiminden seçilir.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from takip import Balon, IzDeposu  # noqa: E402
+
+
+class EskiBalon:
+    """Referans: halka tamponundan önceki Balon güncelleme yolu"""
+    def __init__(self, X1, X2, Y1, Y2, guvenSkoru):
+        self.X1, self.X2, self.Y1, self.Y2 = X1, X2, Y1, Y2
+        self.guvenSkoru = guvenSkoru
+        self.sonGorulen = time.time()
+        self.zamanDamgasi = time.time()
+        self.toplameHits = 0
+        self.stabiliteSkoru = 0
+        self.consecutiveHits = 0
+        self.consecutiveMisses = 0
+        self.hizVektoruX = 0
+        self.hizVektoruY = 0
+        self.tahminEdilenX = None
+        self.tahminEdilenY = None
+        self.oncekiKonumlar = [((X1 + X2) // 2, (Y1 + Y2) // 2, time.time())]
+
+    def guncelle(self, X1, X2, Y1, Y2, guvenSkoru):
+        smoothing = 0.6
+        self.X1 = int(self.X1 * smoothing + X1 * (1 - smoothing))
+        self.Y1 = int(self.Y1 * smoothing + Y1 * (1 - smoothing))
+        self.X2 = int(self.X2 * smoothing + X2 * (1 - smoothing))
+        self.Y2 = int(self.Y2 * smoothing + Y2 * (1 - smoothing))
+        self.guvenSkoru = max(self.guvenSkoru * 0.8 + guvenSkoru * 0.2, guvenSkoru)
+        self.sonGorulen = time.time()
+        self.zamanDamgasi = time.time()
+        self.consecutiveHits += 1
+        self.consecutiveMisses = 0
+        self.toplameHits += 1
+        self.stabiliteSkoru = min(self.stabiliteSkoru + 1, 100)
+        self.hizVektoruGuncelle()
+
+    def hizVektoruGuncelle(self):
+        merkezX, merkezY = (self.X1 + self.X2) // 2, (self.Y1 + self.Y2) // 2
+        self.oncekiKonumlar.append((merkezX, merkezY, time.time()))
+        if len(self.oncekiKonumlar) > 8:
+            self.oncekiKonumlar.pop(0)
+        if len(self.oncekiKonumlar) >= 3:
+            toplamDx = toplamDy = toplamDt = 0
+            validSayac = 0
+            for i in range(len(self.oncekiKonumlar) - 1):
+                nokta1 = self.oncekiKonumlar[i]
+                nokta2 = self.oncekiKonumlar[i + 1]
+                dt = nokta2[2] - nokta1[2]
+                if dt > 0:
+                    toplamDx += nokta2[0] - nokta1[0]
+                    toplamDy += nokta2[1] - nokta1[1]
+                    toplamDt += dt
+                    validSayac += 1
+            if validSayac > 0 and toplamDt > 0:
+                self.hizVektoruX = toplamDx / toplamDt
+                self.hizVektoruY = toplamDy / toplamDt
+                self.tahminEdilenX = merkezX + self.hizVektoruX * 0.15 * 40
+                self.tahminEdilenY = merkezY + self.hizVektoruY * 0.15 * 40
+
+
+def kutular(tekrar, izSayisi, rng):
+    """Her kare için izSayisi kadar hafif kayan kutu"""
+    merkez = rng.uniform(100, 500, (izSayisi, 2))
+    adim = rng.normal(0, 3, (tekrar, izSayisi, 2)).cumsum(axis=0)
+    merkezler = (merkez[None] + adim).astype(np.int64)
+    return np.concatenate((merkezler - 20, merkezler + 20), axis=2)
+
+
+def eskiOlc(kareler):
+    izler = [EskiBalon(x1, x2, y1, y2, 80.0) for x1, y1, x2, y2 in kareler[0]]
+    baslangic = time.perf_counter()
+    for kare in kareler:
+        for balon, (x1, y1, x2, y2) in zip(izler, kare.tolist()):
+            balon.guncelle(x1, x2, y1, y2, 80.0)
+    return time.perf_counter() - baslangic
+
+
+def tekliOlc(kareler):
+    depo = IzDeposu(kareler.shape[1])
+    izler = [Balon.gorunum(depo, depo.ekle(x1, x2, y1, y2, 80.0, 0.0), "HEAD")
+             for x1, y1, x2, y2 in kareler[0].tolist()]
+    baslangic = time.perf_counter()
+    for sira, kare in enumerate(kareler):
+        simdi = sira / 30.0
+        for balon, (x1, y1, x2, y2) in zip(izler, kare.tolist()):
+            balon.guncelle(x1, x2, y1, y2, 80.0, simdi)
+    return time.perf_counter() - baslangic
+
+
+def topluOlc(kareler, skalerSinir):
+    depo = IzDeposu(kareler.shape[1])
+    depo.skalerSinir = skalerSinir
+    indeksler = np.array([depo.ekle(x1, x2, y1, y2, 80.0, 0.0) for x1, y1, x2, y2 in kareler[0].tolist()])
+    guvenler = np.full(len(indeksler), 80.0)
+    baslangic = time.perf_counter()
+    for sira, kare in enumerate(kareler):
+        depo.guncelle(indeksler, kare, guvenler, sira / 30.0)
+    return time.perf_counter() - baslangic
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tekrar", type=int, default=2000, help="Kare sayısı")
+    parser.add_argument("--iz", type=int, nargs="+", default=[1, 3, 10, 20, 30, 50], help="Kare başına iz sayıları")
+    parser.add_argument("--olcum", type=int, default=5, help="En iyisi alınan çalıştırma sayısı")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'iz':>4} | {'eski (us/güncelleme)':>21} | {'Balon.guncelle':>15} | {'skaler depo':>12} | "
+          f"{'toplu depo':>11}")
+    for izSayisi in args.iz:
+        kareler = kutular(args.tekrar, izSayisi, rng)
+        guncellemeSayisi = args.tekrar * izSayisi
+        eski = min(eskiOlc(kareler) for _ in range(args.olcum)) / guncellemeSayisi * 1e6
+        tekli = min(tekliOlc(kareler) for _ in range(args.olcum)) / guncellemeSayisi * 1e6
+        skaler = min(topluOlc(kareler, float("inf")) for _ in range(args.olcum)) / guncellemeSayisi * 1e6
+        toplu = min(topluOlc(kareler, 0) for _ in range(args.olcum)) / guncellemeSayisi * 1e6
+        print(f"{izSayisi:>4} | {eski:>21.2f} | {tekli:>15.2f} | {skaler:>12.2f} | {toplu:>11.2f}")
@@ -0,0 +1,69 @@
+"""Uzaysal ızgara eşiği benchmark'ı - yoğun eşleştirme vs UzaysalIzgara kesişim noktası
+
+Çalıştırma:
+    python benchmarks/izgara_esigi.py [--hedef 3 10 20 60 100 200] [--kare 300] [--tekrar 3]
+
+Her hedef sayısı ve sahne boyutu için senaryo.senaryoUret ile aynı senaryo
+iki kez oynatılır: izgaraEsigi sonsuz (her zaman yoğun iz x detection
+matrisi + Macar atama) ve sıfır (her zaman ızgara + seyrek atama). Kare
+başına tracker süresinin medyanı (--tekrar çalıştırmanın en iyisi) ve kare
+başına ortalama iz x detection çifti raporlanır; iki yolun iz sonuçları
+karşılaştırılır. UltraKararliUcBalonSistemi.izgaraEsigi bu tablonun
+kesişim noktasından seçilir.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from senaryo import senaryoUret  # noqa: E402
+from takip import SimuleSaat, UltraKararliUcBalonSistemi  # noqa: E402
+
+
+def oynat(kareler, maksIz, izgaraEsigi):
+    """Kare süreleri (s), kare başına çift sayısı ve son iz durumu"""
+    saat = SimuleSaat(kareler[0][0])
+    sistem = UltraKararliUcBalonSistemi(maksIz, saat=saat, ayrintili=False)
+    sistem.izgaraEsigi = izgaraEsigi
+    sureler, ciftler = [], []
+    for zaman, satirlar, _ in kareler:
+        saat.zaman = zaman
+        ciftler.append(np.count_nonzero(sistem.depo.gecerliMaske(zaman)) * len(satirlar))
+        baslangic = time.perf_counter()
+        sistem.tumDetectionlariIsle(satirlar, zaman)
+        sistem.optimize_kontrol(zaman)
+        sistem.beslikliBalonKontrolu(zaman)
+        sureler.append(time.perf_counter() - baslangic)
+    durum = (sistem.depo.kimlik.copy(), sistem.depo.kutular.copy())
+    return np.array(sureler), float(np.mean(ciftler)), durum
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hedef", type=int, nargs="+", default=[3, 10, 20, 40, 60, 100, 200], help="Hedef sayıları")
+    parser.add_argument("--sahne", nargs="+", default=["640x480", "1920x1080"], metavar="GxY")
+    parser.add_argument("--kare", type=int, default=300, help="Senaryo başına kare sayısı")
+    parser.add_argument("--sahte", type=float, default=3.0, help="Kare başına ortalama sahte tespit")
+    parser.add_argument("--tekrar", type=int, default=3, help="En iyisi alınan çalıştırma sayısı")
+    args = parser.parse_args()
+
+    print(f"{'hedef':>5} | {'sahne':>9} | {'çift/kare':>9} | {'yoğun ms':>8} | {'ızgara ms':>9} | {'oran':>5} | aynı")
+    for sahne in args.sahne:
+        genislik, yukseklik = (int(v) for v in sahne.lower().split("x"))
+        for hedefSayisi in args.hedef:
+            kareler = senaryoUret(hedefSayisi, args.kare, genislik=genislik, yukseklik=yukseklik, sahte=args.sahte)
+            sonuclar = {}
+            for ad, esik in (("yogun", float("inf")), ("izgara", 0)):
+                enIyi = None
+                for _ in range(args.tekrar):
+                    sureler, ciftler, durum = oynat(kareler, hedefSayisi, esik)
+                    medyan = float(np.median(sureler))
+                    enIyi = medyan if enIyi is None else min(enIyi, medyan)
+                sonuclar[ad] = (enIyi * 1000, ciftler, durum)
+            yogun, izgara = sonuclar["yogun"], sonuclar["izgara"]
+            ayni = all(np.array_equal(a, b) for a, b in zip(yogun[2], izgara[2]))
+            print(f"{hedefSayisi:>5} | {sahne:>9} | {yogun[1]:>9.0f} | {yogun[0]:>8.2f} | {izgara[0]:>9.2f} | "
+                  f"{yogun[0] / izgara[0]:>5.2f} | {'evet' if ayni else 'HAYIR'}")
@@ -0,0 +1,65 @@
+"""Tracker ölçekleme benchmark'ı - sentetik senaryolarda gecikme, bellek, takip kalitesi
+
+Çalıştırma:
+    python benchmarks/olcekleme.py [--hedef 1 3 10 50 200] [--kare 600] [--hareket-modeli hiz]
+
+Her hedef sayısı için senaryo.senaryoUret ile (gürültü, ıskalama, kesinti ve
+sahte tespitli) bir senaryo üretilir ve tekrar.tekrarOynat ile
+UltraKararliUcBalonSistemi'nden geçirilir (maksIz = hedef sayısı). Raporlanan:
+    ms p50/p95/p99/max  kare başına tracker süresi (tumDetectionlariIsle + bakım)
+    bellek KB           tracemalloc tepe değeri - ayrı ve kısa bir tekrarda (ilk --bellek-kare
+                        kare), tracemalloc süreleri bozmasın ve çalıştırmayı uzatmasın diye
+    kapsama %           gerçek tespitlerin geçerli bir ize eşlenen oranı
+    ID/100 kare         100 karede hedef başına kimlik değişimi
+    HEAD / kilit        HEAD değişimi ve kilit kaybı sayısı
+Aynı tohumla sonuçlar (süreler hariç) her çalıştırmada aynıdır.
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from senaryo import senaryoUret  # noqa: E402
+from takip import IzDeposu  # noqa: E402
+from tekrar import tekrarOynat  # noqa: E402
+
+
+def bellekOlc(kareler, maksIz, hareketModeli):
+    """Tekrarın tracemalloc tepe bellek kullanımı (bayt)"""
+    tracemalloc.start()
+    try:
+        tekrarOynat(iter(kareler), maksIz, hareketModeli)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hedef", type=int, nargs="+", default=[1, 3, 10, 50, 200], help="Hedef sayıları")
+    parser.add_argument("--kare", type=int, default=600, help="Senaryo başına kare sayısı")
+    parser.add_argument("--bellek-kare", type=int, default=100, help="Bellek ölçümündeki kare sayısı")
+    parser.add_argument("--hareket-modeli", choices=sorted(IzDeposu.hareketModelleri), default="hiz")
+    parser.add_argument("--kacirma", type=float, default=0.1, help="Kare başına ıskalama olasılığı")
+    parser.add_argument("--sahte", type=float, default=0.5, help="Kare başına ortalama sahte tespit")
+    parser.add_argument("--tohum", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'hedef':>5} | {'ms p50':>7} {'p95':>7} {'p99':>7} {'max':>7} | {'bellek KB':>9} | "
+          f"{'kapsama %':>9} | {'ID/100 kare':>11} | {'HEAD':>5} {'kilit':>5}")
+    for hedefSayisi in args.hedef:
+        kareler = senaryoUret(hedefSayisi, args.kare, kacirma=args.kacirma, sahte=args.sahte, tohum=args.tohum)
+        sonuc = tekrarOynat(iter(kareler), hedefSayisi, args.hareket_modeli)
+        bellek = bellekOlc(kareler[:args.bellek_kare], hedefSayisi, args.hareket_modeli)
+
+        sureler = np.array(sonuc.kareSureleri) * 1000
+        p50, p95, p99 = np.percentile(sureler, [50, 95, 99])
+        gercekTespit = sum(int(np.count_nonzero(kimlikler >= 0)) for _, _, kimlikler in kareler)
+        kapsama = 100.0 * sonuc.eslesme / max(gercekTespit, 1)
+        idOrani = 100.0 * sonuc.idDegisimi / (hedefSayisi * len(kareler))
+        print(f"{hedefSayisi:>5} | {p50:>7.3f} {p95:>7.3f} {p99:>7.3f} {sureler.max():>7.3f} | "
+              f"{bellek / 1024:>9.1f} | {kapsama:>9.1f} | {idOrani:>11.3f} | "
+              f"{sonuc.headDegisimi:>5} {sonuc.kilitKaybi:>5}")
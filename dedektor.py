@@ -0,0 +1,373 @@
+"""Detector arka uçları - ultralytics, ONNX Runtime, OpenVINO
+
+Tüm arka uçlar ultralytics modeli gibi çağrılır: model(img veya kare listesi,
+verbose=False, imgsz=...) sonuç listesi döner, her sonucun boxes.data alanı
+(n, 6) [x1,y1,x2,y2,conf,cls] ve speed alanı ms cinsinden aşama süreleridir.
+tespitEt/tespitEtToplu bu sonuçları dizilere çevirir, TespitSuzgeci ön eler;
+main.py ve araçlar bunları buradan alır, arka uçtan habersizdir.
+
+ONNX arka uçları YOLOv8 tarzı (1, 4+sınıf, N) çıktılı modeller içindir;
+letterbox ön işleme ve NMS burada yapılır. OpenVINO aynı .onnx dosyasını
+(INT8 dahil) doğrudan derler.
+
+Çalıştırma:
+    python dedektor.py disa-aktar best.pt                        # best.onnx
+    python dedektor.py nicemle best.onnx kayit.mp4               # best_int8.onnx
+    python dedektor.py karsilastir best.pt kayit.mp4 --onnx best.onnx best_int8.onnx
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from olcum import OLCUMLER
+from takip import iouMatrisi, macarAtama
+
+ARKA_UCLAR = ("ultralytics", "onnxruntime", "openvino")
+
+
+class _Kutular:
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+
+class Sonuc:
+    """Ultralytics Results yerine geçen en küçük sonuç"""
+    __slots__ = ("boxes", "speed")
+
+    def __init__(self, data, speed):
+        self.boxes = _Kutular(data)
+        self.speed = speed
+
+
+def letterbox(img, boyut):
+    """Oranı koruyarak boyut x boyut kareye sığdır - (tuval, ölçek, (padX, padY))"""
+    import cv2
+    yukseklik, genislik = img.shape[:2]
+    olcek = min(boyut / yukseklik, boyut / genislik)
+    yeniG, yeniY = int(round(genislik * olcek)), int(round(yukseklik * olcek))
+    padX, padY = (boyut - yeniG) // 2, (boyut - yeniY) // 2
+    tuval = np.full((boyut, boyut, 3), 114, dtype=np.uint8)
+    tuval[padY:padY + yeniY, padX:padX + yeniG] = cv2.resize(img, (yeniG, yeniY), interpolation=cv2.INTER_LINEAR)
+    return tuval, olcek, (padX, padY)
+
+
+def girdiTensoru(kareler, boyut):
+    """BGR kareler -> (B, 3, boyut, boyut) float32 RGB [0, 1] + geri dönüşüm bilgisi"""
+    tensor = np.empty((len(kareler), 3, boyut, boyut), dtype=np.float32)
+    donusumler = []
+    for i, img in enumerate(kareler):
+        tuval, olcek, pad = letterbox(img, boyut)
+        tensor[i] = tuval[:, :, ::-1].transpose(2, 0, 1)
+        donusumler.append((olcek, pad, img.shape[:2]))
+    tensor *= 1 / 255.0
+    return tensor, donusumler
+
+
+def ciktiCoz(cikti, donusum, minGuven=0.25, iouEsigi=0.7, maksTespit=300):
+    """Tek görüntünün (4+sınıf, N) çıktısı -> (n, 6) kare koordinatlarında"""
+    import cv2
+    tahminler = cikti.T
+    sinifSkorlari = tahminler[:, 4:]
+    siniflar = sinifSkorlari.argmax(axis=1)
+    guvenler = sinifSkorlari[np.arange(len(siniflar)), siniflar]
+    maske = guvenler >= minGuven
+    if not maske.any():
+        return np.zeros((0, 6), dtype=np.float32)
+    cxcywh, guvenler, siniflar = tahminler[maske, :4], guvenler[maske], siniflar[maske]
+
+    # Sınıf başına NMS (OpenCV, x/y/genişlik/yükseklik kutularıyla)
+    xywh = cxcywh.copy()
+    xywh[:, :2] -= xywh[:, 2:] / 2
+    tut = np.asarray(cv2.dnn.NMSBoxesBatched(xywh.tolist(), guvenler.tolist(), siniflar.tolist(),
+                                             minGuven, iouEsigi), dtype=np.int64).reshape(-1)[:maksTespit]
+
+    olcek, (padX, padY), (yukseklik, genislik) = donusum
+    kutular = np.empty((len(tut), 4), dtype=np.float32)
+    kutular[:, :2] = xywh[tut, :2]
+    kutular[:, 2:] = xywh[tut, :2] + xywh[tut, 2:]
+    kutular -= (padX, padY, padX, padY)
+    kutular /= olcek
+    np.clip(kutular, 0, (genislik, yukseklik, genislik, yukseklik), out=kutular)
+    return np.column_stack((kutular, guvenler[tut], siniflar[tut])).astype(np.float32)
+
+
+class OnnxDedektor:
+    """ONNX modeli ONNX Runtime veya OpenVINO ile çalıştıran detector
+
+    Girdi boyutu modelde sabitse o kullanılır; dinamikse imgsz ile seçilir
+    (ROI çağrıları küçük boyut ister). Sabit batch 1'li modellerde kareler
+    tek tek verilir.
+    """
+    def __init__(self, yol, calisma="onnxruntime", imgsz=640, minGuven=0.25, iouEsigi=0.7, izlekSayisi=None):
+        self.yol = yol
+        self.calisma = calisma
+        self.minGuven = minGuven
+        self.iouEsigi = iouEsigi
+        if calisma == "onnxruntime":
+            import onnxruntime as ort
+            ayarlar = ort.SessionOptions()
+            ayarlar.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            if izlekSayisi:
+                ayarlar.intra_op_num_threads = izlekSayisi
+            self._oturum = ort.InferenceSession(yol, ayarlar, providers=["CPUExecutionProvider"])
+            girdi = self._oturum.get_inputs()[0]
+            self._girdiAdi, sekil = girdi.name, girdi.shape
+            self._calistir = lambda tensor: self._oturum.run(None, {self._girdiAdi: tensor})[0]
+        elif calisma == "openvino":
+            import openvino as ov
+            cekirdek = ov.Core()
+            model = cekirdek.read_model(yol)
+            sekil = [boyut.get_length() if boyut.is_static else None for boyut in model.inputs[0].get_partial_shape()]
+            ayarlar = {"PERFORMANCE_HINT": "LATENCY"}
+            if izlekSayisi:
+                ayarlar["INFERENCE_NUM_THREADS"] = izlekSayisi
+            self._derlenmis = cekirdek.compile_model(model, "CPU", ayarlar)
+            self._calistir = lambda tensor: self._derlenmis(tensor)[self._derlenmis.output(0)]
+        else:
+            raise ValueError(f"Bilinmeyen çalışma ortamı: {calisma}")
+        self.sabitBatch = sekil[0] if isinstance(sekil[0], int) else None
+        self.sabitBoyut = sekil[2] if isinstance(sekil[2], int) else None
+        self.imgsz = self.sabitBoyut or imgsz
+
+    def __call__(self, girdi, verbose=False, imgsz=None, **_):
+        kareler = girdi if isinstance(girdi, list) else [girdi]
+        boyut = self.sabitBoyut or imgsz or self.imgsz
+        t0 = time.perf_counter()
+        tensor, donusumler = girdiTensoru(kareler, boyut)
+        t1 = time.perf_counter()
+        if self.sabitBatch == 1 and len(kareler) > 1:
+            cikti = np.concatenate([self._calistir(tensor[i:i + 1]) for i in range(len(kareler))])
+        else:
+            cikti = self._calistir(tensor)
+        t2 = time.perf_counter()
+        veriler = [ciktiCoz(cikti[i], donusum, self.minGuven, self.iouEsigi) for i, donusum in enumerate(donusumler)]
+        t3 = time.perf_counter()
+        n = len(kareler)
+        hizlar = {"preprocess": (t1 - t0) * 1000 / n, "inference": (t2 - t1) * 1000 / n,
+                  "postprocess": (t3 - t2) * 1000 / n}
+        return [Sonuc(veri, hizlar) for veri in veriler]
+
+
+def modelYukle(yol, arkaUc="ultralytics", **ayarlar):
+    """Arka uca göre detector - ultralytics için YOLO nesnesinin kendisi"""
+    if arkaUc == "ultralytics":
+        from ultralytics import YOLO
+        return YOLO(yol)
+    return OnnxDedektor(yol, calisma=arkaUc, **ayarlar)
+
+
+BOS_TESPIT = np.zeros((0, 6), dtype=np.float32)
+
+
+def tespitDizisi(sonuc):
+    """YOLO sonucundan (n, 6) float32 [x1,y1,x2,y2,conf,cls] dizisi
+
+    Tensör CPU'daysa .numpy() aynı belleği paylaşır, float32 olduğu için
+    np.asarray de kopyalamaz. Python listesine hiç çevrilmez.
+    """
+    if sonuc.boxes is None:
+        return BOS_TESPIT
+    veri = sonuc.boxes.data
+    if hasattr(veri, "cpu"):
+        veri = veri.cpu().numpy()
+    return np.asarray(veri, dtype=np.float32).reshape(-1, 6)
+
+
+def modelCagir(model, girdi, **secenekler):
+    """Model çağrısı + aşama süreleri
+
+    Ultralytics sonuçları kare başına ön işleme/çıkarım/son işleme sürelerini
+    (ms) taşır, çağrı toplamı olarak kaydedilir. Yoksa tüm süre çıkarımdır.
+    """
+    baslangic = time.perf_counter()
+    sonuclar = model(girdi, verbose=False, **secenekler)
+    sure = time.perf_counter() - baslangic
+    hizlar = getattr(sonuclar[0], "speed", None) if len(sonuclar) else None
+    if hizlar:
+        for asama, anahtar in (("onisleme", "preprocess"), ("cikarim", "inference"), ("sonisleme", "postprocess")):
+            if hizlar.get(anahtar) is not None:
+                OLCUMLER.ekle(asama, hizlar[anahtar] * len(sonuclar) / 1000)
+    else:
+        OLCUMLER.ekle("cikarim", sure)
+    return sonuclar
+
+
+def tespitEt(model, img):
+    """Tek kare YOLO çıkarımı - [x1,y1,x2,y2,conf,cls] satırları"""
+    return tespitDizisi(modelCagir(model, img)[0])
+
+
+def tespitEtToplu(model, kareler, **secenekler):
+    """Kare listesi için tek YOLO çağrısı - kare başına detection dizileri"""
+    return [tespitDizisi(sonuc) for sonuc in modelCagir(model, kareler, **secenekler)]
+
+
+class TespitSuzgeci:
+    """Model çıktısını tracker'a vermeden önce vektörel ön eleme
+
+    Güven eşiği, sınıf listesi ve kutu tutarlılığı (sonlu değerler, en az
+    minKenar piksel genişlik/yükseklik, kare ile kesişim) tek maskede
+    birleşir. Tracker yalnızca kalan satırların sıkışık kopyasını alır.
+    """
+    def __init__(self, minGuven=0.4, siniflar=None, minKenar=2.0):
+        self.minGuven = minGuven
+        self.siniflar = None if siniflar is None else np.asarray(siniflar, dtype=np.float32)
+        self.minKenar = minKenar
+
+    def __call__(self, tespitler, genislik=None, yukseklik=None):
+        tespitler = np.asarray(tespitler, dtype=np.float32).reshape(-1, 6)
+        if len(tespitler) == 0:
+            return BOS_TESPIT
+        x1, y1, x2, y2, guven, sinif = tespitler.T
+        maske = np.isfinite(tespitler).all(axis=1)
+        maske &= guven >= self.minGuven
+        maske &= (x2 - x1 >= self.minKenar) & (y2 - y1 >= self.minKenar)
+        if self.siniflar is not None:
+            maske &= np.isin(sinif, self.siniflar)
+        if genislik is not None:
+            maske &= (x2 > 0) & (y2 > 0) & (x1 < genislik) & (y1 < yukseklik)
+        return tespitler[maske]
+
+
+VARSAYILAN_SUZGEC = TespitSuzgeci()
+
+
+def disaAktar(ptYolu, imgsz=640):
+    """best.pt -> best.onnx (dinamik batch/boyut, sadeleştirilmiş)"""
+    from ultralytics import YOLO
+    return YOLO(ptYolu).export(format="onnx", imgsz=imgsz, dynamic=True, simplify=True)
+
+
+def kalibrasyonKareleri(kaynak, sayi=200):
+    """Video dosyasından eşit aralıklı veya klasördeki görüntülerden en fazla sayi kare"""
+    import cv2
+    if os.path.isdir(kaynak):
+        dosyalar = sorted(os.path.join(kaynak, ad) for ad in os.listdir(kaynak)
+                          if ad.lower().endswith((".jpg", ".jpeg", ".png", ".bmp")))
+        secilen = dosyalar[::max(1, len(dosyalar) // sayi)][:sayi]
+        return [img for img in (cv2.imread(yol) for yol in secilen) if img is not None]
+    cap = cv2.VideoCapture(kaynak)
+    toplam = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or sayi
+    adim = max(1, toplam // sayi)
+    kareler = []
+    sira = 0
+    while len(kareler) < sayi:
+        basarili, img = cap.read()
+        if not basarili:
+            break
+        if sira % adim == 0:
+            kareler.append(img)
+        sira += 1
+    cap.release()
+    return kareler
+
+
+def nicemle(onnxYolu, kareler, ciktiYolu=None, imgsz=640):
+    """Kayıtlı karelerle kalibre edilen statik INT8 (QDQ) ONNX modeli üret"""
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    kok = os.path.splitext(onnxYolu)[0]
+    ciktiYolu = ciktiYolu or kok + "_int8.onnx"
+    hazirYolu = kok + "_hazir.onnx"
+    quant_pre_process(onnxYolu, hazirYolu)
+
+    import onnx
+    girdiAdi = onnx.load(hazirYolu, load_external_data=False).graph.input[0].name
+
+    class KareOkuyucu(CalibrationDataReader):
+        def __init__(self):
+            self._kareler = iter(kareler)
+
+        def get_next(self):
+            img = next(self._kareler, None)
+            return None if img is None else {girdiAdi: girdiTensoru([img], imgsz)[0]}
+
+    quantize_static(hazirYolu, ciktiYolu, KareOkuyucu(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8, per_channel=True)
+    os.remove(hazirYolu)
+    return ciktiYolu
+
+
+def uyumHesapla(referans, tespitler, iouEsigi=0.5):
+    """İki detection kümesinin uyumu: 2 * eşleşen / (n1 + n2), 1 = aynı"""
+    if len(referans) == 0 and len(tespitler) == 0:
+        return 1.0
+    if len(referans) == 0 or len(tespitler) == 0:
+        return 0.0
+    iou = iouMatrisi(referans[:, :4], tespitler[:, :4])
+    satirlar, sutunlar = macarAtama(-iou)
+    eslesen = np.count_nonzero(iou[satirlar, sutunlar] >= iouEsigi)
+    return 2 * eslesen / (len(referans) + len(tespitler))
+
+
+def karsilastir(modeller, kareler, isinma=5):
+    """Aynı karelerde arka uçların gecikme ve ilk modele göre uyumu
+
+    modeller: [(ad, model)], ilki referanstır. Döner: ad -> (gecikmeler ms, uyumlar)
+    """
+    sonuclar = {}
+    referans = None
+    for ad, model in modeller:
+        for img in kareler[:isinma]:
+            model(img, verbose=False)
+        gecikmeler, tespitListesi = [], []
+        for img in kareler:
+            baslangic = time.perf_counter()
+            tespitler = tespitEt(model, img)
+            gecikmeler.append((time.perf_counter() - baslangic) * 1000)
+            tespitListesi.append(VARSAYILAN_SUZGEC(tespitler))
+        if referans is None:
+            referans = tespitListesi
+        uyumlar = [uyumHesapla(r, t) for r, t in zip(referans, tespitListesi)]
+        sonuclar[ad] = (np.array(gecikmeler), np.array(uyumlar))
+    return sonuclar
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Detector arka uçları: dışa aktarma, INT8 nicemleme, karşılaştırma")
+    komutlar = parser.add_subparsers(dest="komut", required=True)
+
+    aktar = komutlar.add_parser("disa-aktar", help=".pt modelini ONNX'e çevir")
+    aktar.add_argument("pt")
+    aktar.add_argument("--imgsz", type=int, default=640)
+
+    nicem = komutlar.add_parser("nicemle", help="Kayıtlı karelerle statik INT8 ONNX üret")
+    nicem.add_argument("onnx")
+    nicem.add_argument("kaynak", help="Kalibrasyon videosu veya görüntü klasörü")
+    nicem.add_argument("--kare", type=int, default=200, help="Kalibrasyon kare sayısı")
+    nicem.add_argument("--imgsz", type=int, default=640)
+    nicem.add_argument("--cikti")
+
+    kars = komutlar.add_parser("karsilastir", help="Arka uçların gecikme ve tespit uyumunu karşılaştır")
+    kars.add_argument("pt", help="Referans ultralytics modeli")
+    kars.add_argument("kaynak", help="Karşılaştırma videosu veya görüntü klasörü")
+    kars.add_argument("--onnx", nargs="*", default=[], help="Karşılaştırılacak ONNX modelleri")
+    kars.add_argument("--calisma", nargs="+", choices=ARKA_UCLAR[1:], default=["onnxruntime", "openvino"])
+    kars.add_argument("--kare", type=int, default=200)
+    args = parser.parse_args()
+
+    if args.komut == "disa-aktar":
+        print(disaAktar(args.pt, args.imgsz))
+    elif args.komut == "nicemle":
+        kareler = kalibrasyonKareleri(args.kaynak, args.kare)
+        print(f"{len(kareler)} kalibrasyon karesi")
+        print(nicemle(args.onnx, kareler, args.cikti, args.imgsz))
+    else:
+        kareler = kalibrasyonKareleri(args.kaynak, args.kare)
+        modeller = [("ultralytics", modelYukle(args.pt))]
+        for yol in args.onnx:
+            for calisma in args.calisma:
+                try:
+                    modeller.append((f"{calisma}:{os.path.basename(yol)}", modelYukle(yol, calisma)))
+                except ImportError as hata:
+                    print(f"{calisma} atlandı: {hata}")
+        print(f"{len(kareler)} kare")
+        print(f"{'arka uç':<36}{'p50 ms':>9}{'p95 ms':>9}{'ort ms':>9}{'uyum':>8}")
+        for ad, (gecikmeler, uyumlar) in karsilastir(modeller, kareler).items():
+            p50, p95 = np.percentile(gecikmeler, [50, 95])
+            print(f"{ad:<36}{p50:>9.2f}{p95:>9.2f}{gecikmeler.mean():>9.2f}{uyumlar.mean():>8.3f}")
@@ -0,0 +1,262 @@
+"""Detection ve video kaydı - arka planda yazma, memory-map ile okuma
+
+Bir detection oturumu iki dosyadır:
+    <ad>.det  başlık + kare kare eklenen sabit genişlikli float32 satırlar
+              [x1, y1, x2, y2, conf, cls] (satır başına 24 bayt)
+    <ad>.idx  başlık + kare başına sabit genişlikli indeks kaydı
+              (zaman float64, ilk satır int64, satır sayısı int64)
+
+Dosyalar yalnızca sona eklenir. İndeks kaydı satırlardan sonra yazıldığı
+için yarıda kesilen bir oturumda da tamamlanmış kareler okunabilir.
+
+VideoKaydedici ham veya çizimli kareleri ayrı thread'de videoya, tracker
+durumunu kare başına yanındaki CSV'ye yazar.
+"""
+import csv
+import os
+import queue
+import threading
+from collections import deque
+
+import numpy as np
+
+BASLIK_BOYU = 16
+DET_BASLIK = b"BALONDET\x01\x00\x00\x00\x06\x00\x00\x00"   # sürüm 1, 6 sütun
+IDX_BASLIK = b"BALONIDX\x01\x00\x00\x00\x18\x00\x00\x00"   # sürüm 1, 24 bayt kayıt
+SUTUN_SAYISI = 6
+INDEKS_TIPI = np.dtype([("zaman", "<f8"), ("ofset", "<i8"), ("sayi", "<i8")])
+VARSAYILAN_FPS = 30.0    # Video kaydında hız ölçülemezse
+IZ_BASLIGI = ["kare", "zaman", "sira", "kimlik", "X1", "Y1", "X2", "Y2", "guven", "hizX", "hizY"]
+
+
+def izSatirlari(balonSistemi, kare, zaman):
+    """Tracker durumunun IZ_BASLIGI sütunlarında CSV satırları - geçerli izler, sıralamaya göre"""
+    return [[kare, f"{zaman:.4f}", sira, balon.kimlik, balon.X1, balon.Y1, balon.X2, balon.Y2,
+             f"{balon.guvenSkoru:.1f}", f"{balon.hizVektoruX:.2f}", f"{balon.hizVektoruY:.2f}"]
+            for sira, balon in enumerate(balonSistemi.balonlar()) if balon.isValid(zaman)]
+
+
+def dosyaYollari(yol):
+    """Oturum adından .det ve .idx yolları"""
+    kok, uzanti = os.path.splitext(yol)
+    if uzanti not in (".det", ".idx"):
+        kok = yol
+    return kok + ".det", kok + ".idx"
+
+
+class TespitKaydedici:
+    """Kare başına detectionları arka plan thread'inde diske ekler
+
+    ekle() ana döngüyü hiç bekletmez: kuyruk doluysa kare düşürülür ve
+    dusurulen sayacı artar. kapat() kuyruğu boşaltıp dosyaları kapatır.
+    """
+    def __init__(self, yol, kuyrukBoyu=256):
+        self.detYolu, self.idxYolu = dosyaYollari(yol)
+        self._kuyruk = queue.Queue(maxsize=kuyrukBoyu)
+        self.yazilan = 0
+        self.dusurulen = 0
+
+        self._det = open(self.detYolu, "wb")
+        self._idx = open(self.idxYolu, "wb")
+        self._det.write(DET_BASLIK)
+        self._idx.write(IDX_BASLIK)
+        self._ofset = 0
+
+        self._thread = threading.Thread(target=self._yazici, name="tespit-kayit", daemon=True)
+        self._thread.start()
+
+    def ekle(self, zaman, satirlar):
+        """Bir karenin detectionlarını kuyruğa koy - asla bloklamaz"""
+        try:
+            self._kuyruk.put_nowait((zaman, satirlar))
+        except queue.Full:
+            self.dusurulen += 1
+
+    def _yazici(self):
+        while True:
+            oge = self._kuyruk.get()
+            if oge is None:
+                break
+            zaman, satirlar = oge
+            satirlar = np.ascontiguousarray(np.asarray(satirlar, dtype=np.float32).reshape(-1, SUTUN_SAYISI))
+            self._det.write(satirlar.tobytes())
+            kayit = np.array([(zaman, self._ofset, len(satirlar))], dtype=INDEKS_TIPI)
+            self._idx.write(kayit.tobytes())
+            self._ofset += len(satirlar)
+            self.yazilan += 1
+            if self._kuyruk.empty():
+                # Boşta iken diske it - kesilen oturumda kayıp az olsun
+                self._det.flush()
+                self._idx.flush()
+
+    def kapat(self):
+        """Kuyruktaki kareleri yaz ve dosyaları kapat"""
+        self._kuyruk.put(None)
+        self._thread.join()
+        self._det.close()
+        self._idx.close()
+
+
+class TespitKaydi:
+    """Kayıtlı oturumu memory-map ile okur - kareler sıfır kopyalı görünümler
+
+    Dosyalar RAM'e yüklenmez; kare(i) ilgili satırlara NumPy görünümü döner.
+    Yineleme (zaman, satirlar, None) üretir, tekrar.tekrarOynat ile uyumludur.
+    """
+    def __init__(self, yol):
+        self.detYolu, self.idxYolu = dosyaYollari(yol)
+        self.satirlar = self._harita(self.detYolu, DET_BASLIK, np.dtype("<f4"), SUTUN_SAYISI)
+        indeks = self._harita(self.idxYolu, IDX_BASLIK, INDEKS_TIPI, None)
+
+        # Satırları tam yazılmamış son kareleri at
+        tam = indeks["ofset"] + indeks["sayi"] <= len(self.satirlar)
+        self.indeks = indeks[:len(tam) if tam.all() else int(np.argmin(tam))]
+
+    @staticmethod
+    def _harita(yol, beklenenBaslik, tip, sutun):
+        with open(yol, "rb") as dosya:
+            baslik = dosya.read(BASLIK_BOYU)
+        if baslik != beklenenBaslik:
+            raise ValueError(f"Tanınmayan kayıt dosyası: {yol}")
+        kayitBoyu = tip.itemsize * (sutun or 1)
+        sayi = (os.path.getsize(yol) - BASLIK_BOYU) // kayitBoyu
+        if sayi == 0:
+            return np.zeros((0, sutun) if sutun else 0, dtype=tip)
+        sekil = (sayi, sutun) if sutun else (sayi,)
+        return np.memmap(yol, dtype=tip, mode="r", offset=BASLIK_BOYU, shape=sekil)
+
+    def __len__(self):
+        return len(self.indeks)
+
+    @property
+    def zamanlar(self):
+        return self.indeks["zaman"]
+
+    def kare(self, i):
+        """i'nci kare: (zaman, satirlar görünümü)"""
+        zaman, ofset, sayi = self.indeks[i]
+        return float(zaman), self.satirlar[ofset:ofset + sayi]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            zaman, satirlar = self.kare(i)
+            yield zaman, satirlar, None
+
+
+class VideoKaydedici:
+    """Kareleri arka plan thread'inde videoya, tracker durumunu CSV'ye yazar
+
+    Kareler önceden ayrılmış tampon halkasına kopyalanır; ekle() kodlama ve
+    disk beklemez. Her N karede biri kaydedilir (her), tamponlar doluyken en
+    eski bekleyen kare düşürülür. Tracker durumu <yol>.csv dosyasına, videodaki
+    kare sırasıyla yazılır (IZ_BASLIGI).
+
+    Video fps / her hızıyla açılır, böylece oynatma gerçek zamanlıdır. fps
+    verilmezse ekle()'ye gelen karelerin yakalama zamanlarından ölçülür (kamera
+    kendi hızını bildirmeyebilir, döngü de kare düşürebilir).
+    """
+    def __init__(self, yol, fps=None, tamponSayisi=8, her=1, fourcc="mp4v"):
+        self.yol = yol
+        self.csvYolu = os.path.splitext(yol)[0] + ".csv"
+        self.fps = fps
+        self.tamponSayisi = tamponSayisi
+        self.her = max(1, her)
+        self.fourcc = fourcc
+        self.yaziciFps = None    # Videonun açıldığı hız - ilk yazmada belirlenir
+        self._olcumKaresi = min(4, tamponSayisi)
+
+        self._tamponlar = None   # İlk karede kare boyutuyla ayrılır
+        self._durumlar = [None] * tamponSayisi
+        self._bos = list(range(tamponSayisi))
+        self._dolu = deque()
+        self._kosul = threading.Condition()
+        self._kapaniyor = False
+
+        self.gelen = 0
+        self.yazilan = 0
+        self.atlanan = 0      # Her N karede bir politikası
+        self.dusurulen = 0    # Tamponlar dolu
+
+        self._thread = threading.Thread(target=self._yazici, name="video-kayit", daemon=True)
+        self._thread.start()
+
+    def siradakiTutulurMu(self):
+        """Bir sonraki ekle() çağrısı her N politikasıyla atlanmayacak mı"""
+        return self.gelen % self.her == 0
+
+    def ekle(self, img, zaman, balonSistemi=None):
+        """Kareyi (ve varsa tracker durumunu) kuyruğa koy - asla bloklamaz"""
+        kare = self.gelen
+        self.gelen += 1
+        if kare % self.her:
+            self.atlanan += 1
+            return
+        with self._kosul:
+            if self._tamponlar is None:
+                self._tamponlar = np.empty((self.tamponSayisi,) + img.shape, dtype=img.dtype)
+            if self._bos:
+                yer = self._bos.pop()
+            else:
+                yer = self._dolu.popleft()
+                self.dusurulen += 1
+        # Kopya kilit dışında - yer artık yalnızca bu thread'e ait
+        np.copyto(self._tamponlar[yer], img)
+        self._durumlar[yer] = (kare, zaman, None if balonSistemi is None else izSatirlari(balonSistemi, kare, zaman))
+        with self._kosul:
+            self._dolu.append(yer)
+            self._kosul.notify()
+
+    def _yazici(self):
+        video = None
+        with open(self.csvYolu, "w", newline="") as dosya:
+            yaz = csv.writer(dosya)
+            yaz.writerow(IZ_BASLIGI)
+            while True:
+                with self._kosul:
+                    while not self._dolu and not self._kapaniyor:
+                        self._kosul.wait()
+                    if self.yaziciFps is None:
+                        # Hız ölçümü için birkaç kare birikmesini bekle
+                        while not self.fps and len(self._dolu) < self._olcumKaresi and not self._kapaniyor:
+                            self._kosul.wait()
+                        self.yaziciFps = self._yaziciFpsBul()
+                    if not self._dolu:
+                        break
+                    yer = self._dolu.popleft()
+                img = self._tamponlar[yer]
+                if video is None:
+                    import cv2
+                    video = cv2.VideoWriter(self.yol, cv2.VideoWriter_fourcc(*self.fourcc), self.yaziciFps,
+                                            (img.shape[1], img.shape[0]))
+                video.write(img)
+                _, _, satirlar = self._durumlar[yer]
+                if satirlar:
+                    yaz.writerows(satirlar)
+                with self._kosul:
+                    self._bos.append(yer)
+                self.yazilan += 1
+        if video is not None:
+            video.release()
+
+    def _yaziciFpsBul(self):
+        """Video hızı: kaynak hızı / her - kaynak hızı verilmemişse bekleyen karelerin zamanlarından"""
+        if self.fps:
+            return self.fps / self.her
+        durumlar = [self._durumlar[yer] for yer in self._dolu]
+        if len(durumlar) >= 2:
+            (ilkKare, ilkZaman, _), (sonKare, sonZaman, _) = durumlar[0], durumlar[-1]
+            if sonZaman > ilkZaman:
+                return (sonKare - ilkKare) / (sonZaman - ilkZaman) / self.her
+        return VARSAYILAN_FPS / self.her
+
+    def kapat(self):
+        """Bekleyen kareleri yaz, video ve CSV'yi kapat"""
+        with self._kosul:
+            self._kapaniyor = True
+            self._kosul.notify()
+        self._thread.join()
+
+    def ozet(self):
+        hiz = f"{self.yaziciFps:.1f} FPS, " if self.yaziciFps else ""
+        return (f"Video kaydı ({self.yol}): {hiz}{self.yazilan} kare yazıldı, {self.atlanan} atlandı "
+                f"(her {self.her}), {self.dusurulen} düşürüldü")
@@ -1,675 +1,1399 @@
-import cv2
-import numpy as np
-from ultralytics import YOLO
 import time
+BASLANGIC = time.perf_counter()
+
+import numpy as np
 import threading
-import math
+import argparse
+import csv
+import queue
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
 
-class Balon:
-    """Ultra kararlı balon düğümü"""
-    def __init__(self, X1, X2, Y1, Y2, guvenSkoru, tip="HEAD"):
-        self.X1 = X1
-        self.X2 = X2
-        self.Y1 = Y1
-        self.Y2 = Y2
-        self.guvenSkoru = guvenSkoru
-        self.tip = tip
-        self.zamanDamgasi = time.time()
-        self.sonGorulen = time.time()
-        
-        # Kararlılık için önemli değişkenler
-        self.olusturulmaZamani = time.time()
-        self.kilitliMi = False  # İlk 3 saniye kilitli kalacak
-        self.kilitSuresi = 2.0  # 2 saniye kilitlenme süresi
-        self.toplameHits = 0    # Toplam başarılı hit sayısı
-        self.stabiliteSkoru = 0  # Ne kadar stabil olduğu
-        
-        # Hareket takibi
-        self.oncekiKonumlar = []
-        self.hizVektoruX = 0
-        self.hizVektoruY = 0
-        self.tahminEdilenX = None
-        self.tahminEdilenY = None
-        
-        # Çok sıkı miss kontrolü
-        self.consecutiveMisses = 0
-        self.consecutiveHits = 0
-        self.maxMisses = 2  # Sadece 2 frame kaçırabilir
-        
-        # İlk konumu kaydet
-        merkezX, merkezY = self.ortaNokta()
-        self.oncekiKonumlar.append((merkezX, merkezY, time.time()))
-    
-    def ortaNokta(self):
-        """Balonun merkez koordinatı"""
-        return (self.X1 + self.X2) // 2, (self.Y1 + self.Y2) // 2
-    
-    def mesafe(self, digerBalon):
-        """İki balon arasındaki mesafe"""
-        x1, y1 = self.ortaNokta()
-        x2, y2 = digerBalon.ortaNokta()
-        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
-    
-    def isLocked(self):
-        """Bu balon kilitli mi? (İlk birkaç saniye değiştirilmemeli)"""
-        gecenSure = time.time() - self.olusturulmaZamani
-        return gecenSure < self.kilitSuresi or self.toplameHits > 15
-    
-    def guncelle(self, X1, X2, Y1, Y2, guvenSkoru):
-        """Daha responsive güncelleme"""
-        # Daha hızlı smoothing - daha iyi takip
-        smoothing = 0.6  # Daha hızlı adaptasyon
-        self.X1 = int(self.X1 * smoothing + X1 * (1 - smoothing))
-        self.Y1 = int(self.Y1 * smoothing + Y1 * (1 - smoothing))
-        self.X2 = int(self.X2 * smoothing + X2 * (1 - smoothing))
-        self.Y2 = int(self.Y2 * smoothing + Y2 * (1 - smoothing))
-        
-        # Güven skoru daha hızlı değişir
-        self.guvenSkoru = max(self.guvenSkoru * 0.8 + guvenSkoru * 0.2, guvenSkoru)
-        self.sonGorulen = time.time()
-        self.zamanDamgasi = time.time()
+from dedektor import (ARKA_UCLAR, BOS_TESPIT, VARSAYILAN_SUZGEC, TespitSuzgeci, modelYukle, tespitEt,
+                      tespitEtToplu)
+from kayit import IZ_BASLIGI, TespitKaydedici, VideoKaydedici, izSatirlari
+from nisan import NisanCikisi, kanalAc
+from olcum import OLCUMLER
+from takip import IzDeposu, KayipIzHavuzu, SimuleSaat, UltraKararliUcBalonSistemi, iouMatrisi
+
+class SonKareYuvasi:
+    """Tek elemanlı 'son gelen kazanır' yuvası - eski kareler düşürülür"""
+    def __init__(self):
+        self._kosul = threading.Condition()
+        self._veri = None
+        self.kapali = False
+        self.dusurulen = 0  # Okunmadan üzerine yazılan kare sayısı
+    
+    def koy(self, veri):
+        """Yeni veriyi koy, okunmamış eski veri varsa at"""
+        with self._kosul:
+            if self._veri is not None:
+                self.dusurulen += 1
+            self._veri = veri
+            self._kosul.notify()
+    
+    def al(self, zamanAsimi=0.1):
+        """En son veriyi al - yoksa zamanAsimi kadar bekle, sonra None"""
+        with self._kosul:
+            if self._veri is None and not self.kapali:
+                self._kosul.wait(zamanAsimi)
+            veri, self._veri = self._veri, None
+            return veri
+    
+    def kapat(self):
+        """Bekleyen okuyucuları uyandır"""
+        with self._kosul:
+            self.kapali = True
+            self._kosul.notify_all()
+
+class GecikmeIstatistigi:
+    """Yakalama -> çizim ve gösterim sonu uçtan uca gecikme takibi (son N kare)"""
+    def __init__(self, pencere=120):
+        self.ornekler = deque(maxlen=pencere)
+        self.toplamKare = 0
+        self.baslangic = time.time()
+    
+    def ekle(self, gecikme):
+        self.ornekler.append(gecikme)
+        self.toplamKare += 1
+    
+    def ortalama(self):
+        return sum(self.ornekler) / len(self.ornekler) if self.ornekler else 0.0
+    
+    def yuzdelik(self, oran):
+        if not self.ornekler:
+            return 0.0
+        sirali = sorted(self.ornekler)
+        return sirali[min(len(sirali) - 1, int(oran * len(sirali)))]
+    
+    def ozet(self):
+        gecen = time.time() - self.baslangic
+        verim = self.toplamKare / gecen if gecen > 0 else 0.0
+        return (f"Kare: {self.toplamKare} | Verim: {verim:.1f} FPS | "
+                f"Gecikme ort: {self.ortalama() * 1000:.1f} ms, p95: {self.yuzdelik(0.95) * 1000:.1f} ms")
+
+def kameraAc(kaynak=0, genislik=640, yukseklik=480):
+    """Kamera kurulumu (canlı görüntü) - kameranın verdiği gerçek boyutu döndürür"""
+    import cv2
+    cap = cv2.VideoCapture(kaynak)
+    
+    kamera_fps = float(cap.get(5))
+    print(f"Kamera FPS: {kamera_fps:.2f}")
+    
+    # Kamera optimizasyonu
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, genislik)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, yukseklik)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    
+    genislik = int(cap.get(3))
+    yukseklik = int(cap.get(4))
+    return cap, genislik, yukseklik
+
+def modelIsit(model, genislik=640, yukseklik=480, roiBoyutu=None, batch=1, tekrar=2):
+    """Boş karelerle ilk çağrı maliyetini (bellek ayırma, çekirdek seçimi) önceden öde"""
+    bos = np.zeros((yukseklik, genislik, 3), dtype=np.uint8)
+    for _ in range(tekrar):
+        model(bos if batch == 1 else [bos] * batch, verbose=False)
+        if roiBoyutu:
+            model([bos[:roiBoyutu, :roiBoyutu]] * 2, verbose=False, imgsz=roiBoyutu)
+
+def nmsUygula(tespitler, esik=0.5, kucugeGore=False):
+    """Çakışan detectionlardan güveni yüksek olanı tut (açgözlü NMS)
+    
+    kucugeGore: IoU yerine kesişim / küçük kutu alanı - karo kenarında
+    kesilmiş parça kutular büyük kutunun içinde kaldığı için elenir.
+    """
+    if len(tespitler) < 2:
+        return tespitler
+    sira = np.argsort(-tespitler[:, 4])
+    tespitler = tespitler[sira]
+    if kucugeGore:
+        kutular = tespitler[:, :4].astype(np.float64)
+        genislik = np.clip(np.minimum(kutular[:, None, 2], kutular[None, :, 2])
+                           - np.maximum(kutular[:, None, 0], kutular[None, :, 0]), 0, None)
+        yukseklik = np.clip(np.minimum(kutular[:, None, 3], kutular[None, :, 3])
+                            - np.maximum(kutular[:, None, 1], kutular[None, :, 1]), 0, None)
+        alan = (kutular[:, 2] - kutular[:, 0]) * (kutular[:, 3] - kutular[:, 1])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            iou = np.nan_to_num(genislik * yukseklik / np.minimum(alan[:, None], alan[None, :]))
+    else:
+        iou = iouMatrisi(tespitler[:, :4], tespitler[:, :4])
+    tut = np.ones(len(tespitler), dtype=bool)
+    for i in range(len(tespitler)):
+        if tut[i]:
+            tut[i + 1:] &= iou[i, i + 1:] < esik
+    return tespitler[tut]
+
+def kirpimlariBirlestir(bolgeler, sonuclar, ekler=(), kucugeGore=False):
+    """Kırpım detectionlarını kare koordinatlarına taşı, eklerle birlikte NMS ile birleştir
+
+    Kaydırma yeni diziye yazılır: tespitDizisi'nin döndürdüğü dizi modelin
+    kendi sonuç tensörüne bakan sıfır kopyalı görünümdür, yerinde değişmez.
+    """
+    parcalar = list(ekler)
+    for (x1, y1, _, _), tespitler in zip(bolgeler, sonuclar):
+        if len(tespitler):
+            parcalar.append(tespitler + np.array([x1, y1, x1, y1, 0, 0], dtype=np.float32))
+    if not parcalar:
+        return BOS_TESPIT
+    return nmsUygula(np.vstack(parcalar), kucugeGore=kucugeGore)
+
+def renkImzalari(img, kutular, tonKovasi=8, doygunlukKovasi=4):
+    """Kutu kırpıntılarının ton-doygunluk histogramları - (n, ton*doygunluk) float32, L1 normalize
+    
+    Kayıp iz havuzunun görünüm imzası: parlaklıktan bağımsız, kutu kareden
+    taşıyorsa kırpılır, boş kırpıntı düzgün dağılım alır.
+    """
+    import cv2
+    yukseklik, genislik = img.shape[:2]
+    boyut = tonKovasi * doygunlukKovasi
+    imzalar = np.full((len(kutular), boyut), 1.0 / boyut, dtype=np.float32)
+    for i, (x1, y1, x2, y2) in enumerate(np.asarray(kutular, dtype=np.int64).tolist()):
+        x1, x2 = max(x1, 0), min(x2, genislik)
+        y1, y2 = max(y1, 0), min(y2, yukseklik)
+        if x2 <= x1 or y2 <= y1:
+            continue
+        hsv = cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2HSV)
+        histogram = cv2.calcHist([hsv], [0, 1], None, [tonKovasi, doygunlukKovasi], [0, 180, 0, 256]).ravel()
+        toplam = histogram.sum()
+        if toplam > 0:
+            imzalar[i] = histogram / toplam
+    return imzalar
+
+class RoiTespitci:
+    """İzlerin tahmin edilen konumları etrafında bölgesel (ROI) tespit
+    
+    Geçerli her iz için kutusu ve tahmin kayması kadar genişletilmiş bir bölge
+    kesilir, bölgeler tek batch'te küçük girdi boyutuyla modele verilir ve
+    kutular kare koordinatlarına taşınır. Her tamKareAraligi karede bir, hiç
+    geçerli iz yokken veya bir iz kaybolduğunda tam kare çalıştırılır - yeni
+    hedefler yalnızca tam karede bulunur.
+    """
+    roiGirdiBoyutu = 256  # ROI çağrılarında imgsz (32'nin katı)
+    
+    def __init__(self, model, balonSistemi, tamKareAraligi=10, roiGirdiBoyutu=None, genisletme=0.75, minBoyut=96):
+        self.model = model
+        self.balonSistemi = balonSistemi
+        self.tamKareAraligi = tamKareAraligi
+        if roiGirdiBoyutu is not None:
+            self.roiGirdiBoyutu = roiGirdiBoyutu
+        self.genisletme = genisletme          # Kutu boyutuna göre kenar payı
+        self.minBoyut = minBoyut
         
-        # Hit sayaçları
-        self.consecutiveHits += 1
-        self.consecutiveMisses = 0
-        self.toplameHits += 1
+        self.kareSayaci = 0
+        self.tamKareSayisi = 0
+        self.roiKareSayisi = 0
+        self.oncekiKimlikler = set()
+    
+    def bolgeler(self, genislik, yukseklik, simdi):
+        """Geçerli izler için kırpma bölgeleri - (n, 4) int [x1,y1,x2,y2], çakışanlar birleşik"""
+        depo = self.balonSistemi.depo
+        izler = np.flatnonzero(depo.gecerliMaske(simdi))
+        if len(izler) == 0:
+            return np.zeros((0, 4), dtype=np.int64)
+        kutular = depo.kutular[izler].astype(np.float64)
+        merkezler = (kutular[:, :2] + kutular[:, 2:]) / 2
+        tahminler = depo.tahmin[izler]
+        kayma = np.where(np.isnan(tahminler), 0.0, tahminler - merkezler)
         
-        # Stabilite skoru artır
-        self.stabiliteSkoru = min(self.stabiliteSkoru + 1, 100)
+        # Kutu + tahmin edilen konuma kaydırılmış kutu, boyuta göre pay
+        boyut = np.maximum(kutular[:, 2] - kutular[:, 0], kutular[:, 3] - kutular[:, 1])
+        pay = np.maximum(boyut * self.genisletme, (self.minBoyut - boyut) / 2)[:, None]
+        alt = np.minimum(kutular[:, :2], kutular[:, :2] + kayma) - pay
+        ust = np.maximum(kutular[:, 2:], kutular[:, 2:] + kayma) + pay
+        bolgeler = np.hstack([alt, ust])
+        bolgeler = np.clip(bolgeler, 0, [genislik, yukseklik, genislik, yukseklik]).astype(np.int64)
         
-        # Hız vektörünü güncelle
-        self.hizVektoruGuncelle()
-    
-    def missedFrame(self):
-        """Frame kaçırıldığında - çok yavaş düşürme"""
-        self.consecutiveMisses += 1
-        self.consecutiveHits = 0
-        # Güven skorunu çok az düşür
-        self.guvenSkoru *= 0.95  # Çok yavaş düşüş
-        # Stabilite skorunu düşür
-        self.stabiliteSkoru = max(0, self.stabiliteSkoru - 2)
-    
-    def hizVektoruGuncelle(self):
-        """Gelişmiş hız hesaplama ve tahmin"""
-        merkezX, merkezY = self.ortaNokta()
-        suankiZaman = time.time()
-        self.oncekiKonumlar.append((merkezX, merkezY, suankiZaman))
+        # Çakışan bölgeleri birleştir - aynı piksel iki kez çıkarıma girmesin
+        birlesik = []
+        for bolge in bolgeler:
+            bolge = bolge.copy()
+            degisti = True
+            while degisti:
+                degisti = False
+                for i, diger in enumerate(birlesik):
+                    if bolge[0] < diger[2] and diger[0] < bolge[2] and bolge[1] < diger[3] and diger[1] < bolge[3]:
+                        bolge[:2] = np.minimum(bolge[:2], diger[:2])
+                        bolge[2:] = np.maximum(bolge[2:], diger[2:])
+                        del birlesik[i]
+                        degisti = True
+                        break
+            birlesik.append(bolge)
+        return np.array(birlesik, dtype=np.int64)
+    
+    def tamKareGerekli(self, simdi):
+        """Periyot doldu, geçerli iz yok veya bir iz kayboldu mu"""
+        depo = self.balonSistemi.depo
+        kimlikler = set(depo.kimlik[depo.gecerliMaske(simdi)].tolist())
+        kayip = bool(self.oncekiKimlikler - kimlikler)
+        self.oncekiKimlikler = kimlikler
+        return not kimlikler or kayip or self.kareSayaci % self.tamKareAraligi == 0
+    
+    def tespitEt(self, img, simdi):
+        """Bir kare için detectionlar - tam kare veya ROI'ler"""
+        yukseklik, genislik = img.shape[:2]
+        tamKare = self.tamKareGerekli(simdi)
+        self.kareSayaci += 1
+        bolgeler = None if tamKare else self.bolgeler(genislik, yukseklik, simdi)
+        if bolgeler is None or len(bolgeler) == 0:
+            self.tamKareSayisi += 1
+            return tespitEt(self.model, img)
         
-        # Daha fazla konum sakla - daha iyi hız hesabı
-        if len(self.oncekiKonumlar) > 8:
-            self.oncekiKonumlar.pop(0)
+        self.roiKareSayisi += 1
+        kirpimlar = [img[y1:y2, x1:x2] for x1, y1, x2, y2 in bolgeler]
+        sonuclar = tespitEtToplu(self.model, kirpimlar, imgsz=self.roiGirdiBoyutu)
+        return kirpimlariBirlestir(bolgeler, sonuclar)
+    
+    def ozet(self):
+        toplam = max(self.tamKareSayisi + self.roiKareSayisi, 1)
+        return f"ROI modu: {self.roiKareSayisi} ROI kare, {self.tamKareSayisi} tam kare (%{100 * self.roiKareSayisi / toplam:.0f} ROI)"
+
+class KaroTespitci:
+    """Yüksek çözünürlüklü karede örtüşen karolarla küçük/uzak hedef tespiti
+    
+    Her karede tüm görüntü model boyutuna küçültülerek bir kez taranır (büyük
+    hedefler), yanında tam çözünürlüklü karolardan en çok maksKaro tanesi aynı
+    batch'te modele verilir. Büyük (en uzun kenarı buyukHedef pikselden fazla)
+    bir izin değdiği karolar atlanır; kalanlar sırayla dolaşılır, böylece maliyet
+    karo sayısıyla doğrusal artmaz. Sonuçlar karolar arası NMS ile birleşir.
+    """
+    def __init__(self, model, balonSistemi, karoBoyutu=640, ortusme=0.2, maksKaro=4, buyukHedef=96, girdiBoyutu=640):
+        self.model = model
+        self.balonSistemi = balonSistemi
+        self.karoBoyutu = karoBoyutu
+        self.ortusme = ortusme
+        self.maksKaro = maksKaro
+        self.buyukHedef = buyukHedef
+        self.girdiBoyutu = girdiBoyutu
         
-        # Çoklu nokta kullanarak daha stabil hız hesapla
-        if len(self.oncekiKonumlar) >= 3:
-            # Son 3 noktanın ortalamasını al
-            toplamDx = 0
-            toplamDy = 0
-            toplamDt = 0
-            validSayac = 0
+        self._karolar = None
+        self._boyut = None
+        self._siradaki = 0
+        self.kareSayisi = 0
+        self.islenenKaro = 0
+        self.atlananKaro = 0
+    
+    def karolar(self, genislik, yukseklik):
+        """Kareyi örten örtüşmeli karolar - (n, 4) [x1,y1,x2,y2], boyuta göre önbellekli"""
+        if self._boyut != (genislik, yukseklik):
+            adim = max(1, int(self.karoBoyutu * (1 - self.ortusme)))
             
-            for i in range(len(self.oncekiKonumlar) - 1):
-                nokta1 = self.oncekiKonumlar[i]
-                nokta2 = self.oncekiKonumlar[i + 1]
-                
-                dx = nokta2[0] - nokta1[0]
-                dy = nokta2[1] - nokta1[1]
-                dt = nokta2[2] - nokta1[2]
-                
-                if dt > 0:
-                    toplamDx += dx
-                    toplamDy += dy
-                    toplamDt += dt
-                    validSayac += 1
+            def baslangiclar(uzunluk):
+                if uzunluk <= self.karoBoyutu:
+                    return [0]
+                noktalar = list(range(0, uzunluk - self.karoBoyutu, adim))
+                return noktalar + [uzunluk - self.karoBoyutu]
             
-            if validSayac > 0 and toplamDt > 0:
-                # Ortalama hız
-                self.hizVektoruX = toplamDx / toplamDt
-                self.hizVektoruY = toplamDy / toplamDt
-                
-                # Daha uzun tahmin süresi - gelecekteki konumu daha iyi tahmin et
-                tahminZamani = 0.15  # 150ms ilerisini tahmin et
-                tahminCarpani = 40   # Daha agresif tahmin
-                
-                self.tahminEdilenX = merkezX + (self.hizVektoruX * tahminZamani * tahminCarpani)
-                self.tahminEdilenY = merkezY + (self.hizVektoruY * tahminZamani * tahminCarpani)
-    
-    def gecenSure(self):
-        """Son görülmeden geçen süre"""
-        return time.time() - self.sonGorulen
-    
-    def kalitePuani(self):
-        """Bu balonun toplam kalite puanı"""
-        zamanBonus = min(self.toplameHits * 2, 50)  # Uzun süre tracking bonusu
-        stabiliteBinus = self.stabiliteSkoru
-        guvenBonus = max(0, self.guvenSkoru - 50)
-        kilitBonus = 100 if self.isLocked() else 0
+            self._karolar = np.array([(x, y, min(x + self.karoBoyutu, genislik), min(y + self.karoBoyutu, yukseklik))
+                                      for y in baslangiclar(yukseklik) for x in baslangiclar(genislik)], dtype=np.int64)
+            self._boyut = (genislik, yukseklik)
+            self._siradaki = 0
+        return self._karolar
+    
+    def seciliKarolar(self, genislik, yukseklik, simdi):
+        """Bu karede işlenecek karolar - büyük izli karolar hariç, sırayla en çok maksKaro"""
+        karolar = self.karolar(genislik, yukseklik)
+        if len(karolar) <= 1:
+            return karolar[:0]
+        depo = self.balonSistemi.depo
+        izler = np.flatnonzero(depo.gecerliMaske(simdi))
+        kutular = depo.kutular[izler]
+        buyukler = kutular[np.maximum(kutular[:, 2] - kutular[:, 0], kutular[:, 3] - kutular[:, 1]) >= self.buyukHedef]
+        dolu = ((karolar[:, None, 0] < buyukler[None, :, 2]) & (buyukler[None, :, 0] < karolar[:, None, 2]) &
+                (karolar[:, None, 1] < buyukler[None, :, 3]) & (buyukler[None, :, 1] < karolar[:, None, 3])).any(axis=1)
+        bos = np.flatnonzero(~dolu)
+        self.atlananKaro += int(np.count_nonzero(dolu))
+        if len(bos) == 0:
+            return karolar[:0]
+        # Sıradaki karodan başlayarak döngüsel seç
+        bos = np.roll(bos, -int(np.searchsorted(bos, self._siradaki)))[:self.maksKaro]
+        self._siradaki = (int(bos[-1]) + 1) % len(karolar)
+        return karolar[bos]
+    
+    def tespitEt(self, img, simdi):
+        """Küçültülmüş tam kare + seçili karolar tek batch'te, NMS ile birleşik"""
+        yukseklik, genislik = img.shape[:2]
+        secilen = self.seciliKarolar(genislik, yukseklik, simdi)
+        self.kareSayisi += 1
+        self.islenenKaro += len(secilen)
+        girdiler = [img] + [img[y1:y2, x1:x2] for x1, y1, x2, y2 in secilen]
+        sonuclar = tespitEtToplu(self.model, girdiler, imgsz=self.girdiBoyutu)
+        return kirpimlariBirlestir(secilen, sonuclar[1:], [sonuclar[0]], kucugeGore=True)
+    
+    def ozet(self):
+        kare = max(self.kareSayisi, 1)
+        return (f"Karo modu: {len(self._karolar) if self._karolar is not None else 0} karo, "
+                f"kare başına {self.islenenKaro / kare:.1f} işlendi, {self.atlananKaro / kare:.1f} büyük iz nedeniyle atlandı")
+
+class TespitZamanlayici:
+    """Detector'ın hangi karelerde çalışacağına karar verir
+    
+    HEAD kararlıyken (kaçırma yok, stabilite eşiğin üstünde) detector bazı
+    karelerde atlanır, bu karelerde izler hareket modeliyle kaydırılır.
+    Art arda atlanabilecek kare sayısı üç sınırın en küçüğüdür:
+      - maksKayma: kullanıcı sınırı
+      - gecikme bütçesi: ölçülen çıkarım süresi hedefFps'in kare süresini
+        kaç kare aşıyorsa o kadar (hızlı donanımda hiç atlanmaz)
+      - hız: en hızlı geçerli iz maksPikselKayma'dan fazla yol almadan
+    """
+    def __init__(self, hedefFps=30.0, maksKayma=3, stabiliteEsigi=10, maksPikselKayma=40.0):
+        self.hedefFps = hedefFps
+        self.maksKayma = maksKayma
+        self.stabiliteEsigi = stabiliteEsigi
+        self.maksPikselKayma = maksPikselKayma
+        
+        self.cikarimSuresi = 0.0  # Çıkarım süresi üstel ortalaması (s)
+        self.kayma = 0            # Art arda atlanan kare
+        self.tespitSayisi = 0
+        self.kaymaSayisi = 0
+    
+    def izinliKayma(self, balonSistemi, simdi):
+        """Şu anki durumda art arda atlanabilecek kare sayısı"""
+        head = balonSistemi.headBalon
+        if (head is None or not head.isValid(simdi) or head.consecutiveMisses > 0
+                or head.stabiliteSkoru < self.stabiliteEsigi):
+            return 0
+        butce = int(np.ceil(self.cikarimSuresi * self.hedefFps)) - 1
         
-        return zamanBonus + stabiliteBinus + guvenBonus + kilitBonus
+        depo = balonSistemi.depo
+        hizlar = np.hypot(*depo.hiz[depo.gecerliMaske(simdi)].T)
+        kareBasinaYol = hizlar.max() / self.hedefFps if len(hizlar) else 0.0
+        hizSiniri = int(self.maksPikselKayma / kareBasinaYol) if kareBasinaYol > 0 else self.maksKayma
+        return max(0, min(self.maksKayma, butce, hizSiniri))
     
-    def isValid(self):
-        """Daha esnek geçerlilik kontrolü"""
-        if self.consecutiveMisses >= self.maxMisses:
+    def tespitGerekli(self, balonSistemi, simdi, img=None):
+        """Bu karede detector çalışsın mı - False ise kare kaydırılır (img: HareketKapisi ile aynı arayüz)"""
+        if self.kayma < self.izinliKayma(balonSistemi, simdi):
+            self.kayma += 1
+            self.kaymaSayisi += 1
             return False
-        if self.guvenSkoru < 30:  # Çok düşük threshold
+        self.kayma = 0
+        self.tespitSayisi += 1
+        return True
+    
+    def cikarimOlc(self, sure):
+        self.cikarimSuresi = sure if self.cikarimSuresi == 0 else 0.8 * self.cikarimSuresi + 0.2 * sure
+    
+    def ozet(self):
+        toplam = max(self.tespitSayisi + self.kaymaSayisi, 1)
+        return (f"Zamanlayıcı: {self.tespitSayisi} tespit, {self.kaymaSayisi} kaydırılan kare "
+                f"(%{100 * self.kaymaSayisi / toplam:.0f}), çıkarım ort: {self.cikarimSuresi * 1000:.1f} ms")
+
+class HareketKapisi:
+    """Ucuz kare farkı ile detector'ı hareket yokken bekletir
+    
+    Kare gri tonda olcekGenislik genişliğe küçültülür ve yavaş güncellenen
+    arka plan ortalamasından farkı eşiklenir. Detector şu durumlarda çalışır:
+      - son tespitten beri maksAralik saniye geçtiyse (zorunlu tarama)
+      - bir izin (genisletme oranında büyütülmüş) kutusunda en az
+        yakinPiksel hareketli piksel varsa
+      - karenin herhangi bir yerinde en az minPiksel hareketli piksel varsa
+    Aksi halde kare atlanır, izler hareket modeliyle kaydırılır. zamanlayici
+    (TespitZamanlayici) verilirse tespit gereken karelerde son kararı o verir.
+    """
+    def __init__(self, maksAralik=1.0, olcekGenislik=160, esik=12, minPiksel=3, yakinPiksel=1,
+                 genisletme=0.5, ogrenmeOrani=0.05, zamanlayici=None):
+        self.maksAralik = maksAralik
+        self.olcekGenislik = olcekGenislik
+        self.esik = esik
+        self.minPiksel = minPiksel
+        self.yakinPiksel = yakinPiksel
+        self.genisletme = genisletme
+        self.ogrenmeOrani = ogrenmeOrani
+        self.zamanlayici = zamanlayici
+        
+        self._arkaPlan = None
+        self._sonTespit = None
+        self.nedenler = {"aralik": 0, "iz": 0, "hareket": 0}
+        self.atlanan = 0
+    
+    def hareketMaskesi(self, img):
+        """Küçültülmüş hareket maskesi (0/1) ve ölçek - arka planı da günceller"""
+        import cv2
+        olcek = self.olcekGenislik / img.shape[1]
+        kucuk = cv2.resize(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), None, fx=olcek, fy=olcek,
+                           interpolation=cv2.INTER_AREA).astype(np.float32)
+        if self._arkaPlan is None or self._arkaPlan.shape != kucuk.shape:
+            self._arkaPlan = kucuk.copy()
+        maske = (cv2.absdiff(kucuk, self._arkaPlan) > self.esik).astype(np.uint8)
+        cv2.accumulateWeighted(kucuk, self._arkaPlan, self.ogrenmeOrani)
+        return maske, olcek
+    
+    def izYakinindaHareket(self, balonSistemi, simdi, maske, olcek):
+        """Herhangi bir geçerli izin çevresinde yeterli hareket var mı"""
+        import cv2
+        depo = balonSistemi.depo
+        kutular = depo.kutular[depo.gecerliMaske(simdi)]
+        if len(kutular) == 0:
+            return False
+        pay = (kutular[:, 2:] - kutular[:, :2]) * self.genisletme
+        yukseklik, genislik = maske.shape
+        x1, y1 = (np.floor((kutular[:, :2] - pay) * olcek).astype(np.int64).clip(0, (genislik, yukseklik))).T
+        x2, y2 = (np.ceil((kutular[:, 2:] + pay) * olcek).astype(np.int64).clip(0, (genislik, yukseklik))).T
+        # İntegral görüntü ile tüm kutuların hareketli piksel sayısı tek seferde
+        integral = cv2.integral(maske)
+        sayilar = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+        return bool((sayilar >= self.yakinPiksel).any())
+    
+    def tespitGerekli(self, balonSistemi, simdi, img=None):
+        """Bu karede detector çalışsın mı - False ise kare kaydırılır"""
+        neden = None
+        if img is not None:
+            maske, olcek = self.hareketMaskesi(img)
+        if img is None or self._sonTespit is None or simdi - self._sonTespit >= self.maksAralik:
+            neden = "aralik"
+        elif self.izYakinindaHareket(balonSistemi, simdi, maske, olcek):
+            neden = "iz"
+        elif np.count_nonzero(maske) >= self.minPiksel:
+            neden = "hareket"
+        if neden is None:
+            self.atlanan += 1
             return False
-        if self.gecenSure() > 2.0:  # 2 saniye timeout
+        if self.zamanlayici is not None and not self.zamanlayici.tespitGerekli(balonSistemi, simdi, img):
             return False
+        self.nedenler[neden] += 1
+        self._sonTespit = simdi
         return True
+    
+    def cikarimOlc(self, sure):
+        if self.zamanlayici is not None:
+            self.zamanlayici.cikarimOlc(sure)
+    
+    def ozet(self):
+        tespit = sum(self.nedenler.values())
+        toplam = max(tespit + self.atlanan, 1)
+        satir = (f"Hareket kapısı: {tespit} tespit (aralık {self.nedenler['aralik']}, iz yakını {self.nedenler['iz']}, "
+                 f"hareket {self.nedenler['hareket']}), {self.atlanan} hareketsiz kare atlandı "
+                 f"(%{100 * self.atlanan / toplam:.0f})")
+        if self.zamanlayici is not None:
+            satir += "\n" + self.zamanlayici.ozet()
+        return satir
 
-class UltraKararliUcBalonSistemi:
-    """Ultra kararlı 3 balon sistemi - HEAD, 1. balon, 2. balon"""
+class OptikAkis:
+    """Seyrek piramidal Lucas-Kanade ile kareler arası iz takibi ve kamera hareketi kestirimi
     
-    def __init__(self):
-        self.headBalon = None
-        self.birinciBalon = None
-        self.ikinciBalon = None  # 2. balon eklendi
-        self.sonKontrolZamani = time.time()
-        self.kontrolAraligi = 5.0  # 5 saniyede bir büyük kontrol
-        self.mesafeThreshold = 150  # Daha geniş arama alanı
-        self.frame_count = 0
+    Her karede iz kutularındaki ızgara noktaları ve arka plan köşeleri önceki
+    kareden bu kareye tek calcOpticalFlowPyrLK çağrısıyla izlenir. Arka plan
+    noktalarının medyan kayması kamera (taret) hareketidir; tüm izler bu
+    kaymayla yeni kare koordinatlarına taşınır, böylece geçmişten hesaplanan
+    hızlar kameradan bağımsız kalır. İz noktalarının medyan kaymasından kamera
+    hareketi çıkarılınca izin kendi kayması bulunur; detection atlanan veya izi
+    ıskalayan karelerde iz bu kaymayla taşınır.
+    """
+    def __init__(self, izIzgarasi=4, arkaPlanNoktasi=60, minNokta=3, pencere=15, seviye=2, maksHata=30.0):
+        self.izIzgarasi = izIzgarasi
+        self.arkaPlanNoktasi = arkaPlanNoktasi
+        self.minNokta = minNokta
+        self.pencere = (pencere, pencere)
+        self.seviye = seviye
+        self.maksHata = maksHata
         
-        # Kararlılık için ekstra değişkenler
-        self.sonDeğişiklikZamani = time.time()
-        self.minDeğişiklikAraligi = 2.0  # En az 2 saniye bekle
-        self.beklemedekiYeniBalon = None
-        self.beklemeSayaci = 0
-        self.degisiklikThreshold = 20  # Daha dengeli threshold
-    
-    def IoUHesapla(self, box1, box2):
-        """Hızlı IoU hesaplama"""
-        x1_min, y1_min, x1_max, y1_max = box1
-        x2_min, y2_min, x2_max, y2_max = box2
-        
-        if x1_max <= x2_min or x2_max <= x1_min or y1_max <= y2_min or y2_max <= y1_min:
-            return 0.0
-        
-        kesisimX1 = max(x1_min, x2_min)
-        kesisimY1 = max(y1_min, y2_min)
-        kesisimX2 = min(x1_max, x2_max)
-        kesisimY2 = min(y1_max, y2_max)
-        
-        kesisimAlani = (kesisimX2 - kesisimX1) * (kesisimY2 - kesisimY1)
-        alan1 = (x1_max - x1_min) * (y1_max - y1_min)
-        alan2 = (x2_max - x2_min) * (y2_max - y2_min)
-        birlesimAlani = alan1 + alan2 - kesisimAlani
-        
-        return kesisimAlani / birlesimAlani if birlesimAlani > 0 else 0.0
+        self._oncekiGri = None
+        self._arkaNoktalar = np.zeros((0, 1, 2), dtype=np.float32)
+        self._egoBirikim = np.zeros(2)   # Piksel altı kamera kayması
+        self._izBirikim = {}             # kimlik -> piksel altı iz kayması
+        self._izler = np.zeros(0, dtype=np.int64)
+        self._kimlikler = np.zeros(0, dtype=np.int64)
+        self._kaymalar = np.zeros((0, 2))
+        self.ego = np.zeros(2)           # Son karenin kamera kayması (px)
+        self.kareSayisi = 0
+        self.egoToplam = 0.0
+        self.tasinan = 0                 # Detection atlanan karede akışla taşınan iz
+        self.koprulenen = 0              # Iskalanıp akışla köprülenen iz
     
-    def enIyiEslestirme(self, X1, X2, Y1, Y2, guvenSkoru):
-        """Çok konservativ eşleştirme - 3 balon desteği"""
-        yeniMerkezX, yeniMerkezY = (X1 + X2) // 2, (Y1 + Y2) // 2
-        
-        headSkor = 0
-        birinciSkor = 0
-        ikinciSkor = 0
-        
-        # HEAD balon kontrolü - çok geniş tolerans
-        if self.headBalon and self.headBalon.isValid():
-            headMerkezX, headMerkezY = self.headBalon.ortaNokta()
-            headMesafe = math.sqrt((headMerkezX - yeniMerkezX) ** 2 + 
-                                 (headMerkezY - yeniMerkezY) ** 2)
-            
-            if headMesafe < self.mesafeThreshold:
-                iou = self.IoUHesapla((self.headBalon.X1, self.headBalon.Y1, 
-                                     self.headBalon.X2, self.headBalon.Y2),
-                                    (X1, Y1, X2, Y2))
-                
-                mesafeSkor = 1.0 - (headMesafe / self.mesafeThreshold)
-                
-                # Kilitli bonusu
-                kilitBonus = 0.5 if self.headBalon.isLocked() else 0
-                
-                # Güçlendirilmiş tahmin skoru
-                tahminSkor = 0
-                if self.headBalon.tahminEdilenX and self.headBalon.tahminEdilenY:
-                    tahminMesafe = math.sqrt((self.headBalon.tahminEdilenX - yeniMerkezX) ** 2 + 
-                                           (self.headBalon.tahminEdilenY - yeniMerkezY) ** 2)
-                    if tahminMesafe < self.mesafeThreshold:
-                        # Tahmin mesafesi ne kadar yakınsa o kadar bonus
-                        tahminNormalize = 1.0 - (tahminMesafe / self.mesafeThreshold)
-                        tahminSkor = 0.6 * tahminNormalize  # Daha yüksek bonus
-                
-                headSkor = mesafeSkor * 0.3 + iou * 0.4 + kilitBonus + tahminSkor
-        
-        # 1. BALON kontrolü
-        if self.birinciBalon and self.birinciBalon.isValid():
-            birinciMerkezX, birinciMerkezY = self.birinciBalon.ortaNokta()
-            birinciMesafe = math.sqrt((birinciMerkezX - yeniMerkezX) ** 2 + 
-                                    (birinciMerkezY - yeniMerkezY) ** 2)
-            
-            if birinciMesafe < self.mesafeThreshold:
-                iou = self.IoUHesapla((self.birinciBalon.X1, self.birinciBalon.Y1,
-                                     self.birinciBalon.X2, self.birinciBalon.Y2),
-                                    (X1, Y1, X2, Y2))
-                
-                mesafeSkor = 1.0 - (birinciMesafe / self.mesafeThreshold)
-                kilitBonus = 0.5 if self.birinciBalon.isLocked() else 0
-                
-                tahminSkor = 0
-                if self.birinciBalon.tahminEdilenX and self.birinciBalon.tahminEdilenY:
-                    tahminMesafe = math.sqrt((self.birinciBalon.tahminEdilenX - yeniMerkezX) ** 2 + 
-                                           (self.birinciBalon.tahminEdilenY - yeniMerkezY) ** 2)
-                    if tahminMesafe < self.mesafeThreshold:
-                        tahminNormalize = 1.0 - (tahminMesafe / self.mesafeThreshold)
-                        tahminSkor = 0.6 * tahminNormalize
-                
-                birinciSkor = mesafeSkor * 0.3 + iou * 0.4 + kilitBonus + tahminSkor
-        
-        # 2. BALON kontrolü
-        if self.ikinciBalon and self.ikinciBalon.isValid():
-            ikinciMerkezX, ikinciMerkezY = self.ikinciBalon.ortaNokta()
-            ikinciMesafe = math.sqrt((ikinciMerkezX - yeniMerkezX) ** 2 + 
-                                    (ikinciMerkezY - yeniMerkezY) ** 2)
-            
-            if ikinciMesafe < self.mesafeThreshold:
-                iou = self.IoUHesapla((self.ikinciBalon.X1, self.ikinciBalon.Y1,
-                                     self.ikinciBalon.X2, self.ikinciBalon.Y2),
-                                    (X1, Y1, X2, Y2))
-                
-                mesafeSkor = 1.0 - (ikinciMesafe / self.mesafeThreshold)
-                kilitBonus = 0.5 if self.ikinciBalon.isLocked() else 0
-                
-                tahminSkor = 0
-                if self.ikinciBalon.tahminEdilenX and self.ikinciBalon.tahminEdilenY:
-                    tahminMesafe = math.sqrt((self.ikinciBalon.tahminEdilenX - yeniMerkezX) ** 2 + 
-                                           (self.ikinciBalon.tahminEdilenY - yeniMerkezY) ** 2)
-                    if tahminMesafe < self.mesafeThreshold:
-                        tahminNormalize = 1.0 - (tahminMesafe / self.mesafeThreshold)
-                        tahminSkor = 0.6 * tahminNormalize
-                
-                ikinciSkor = mesafeSkor * 0.3 + iou * 0.4 + kilitBonus + tahminSkor
-        
-        # Düşük threshold - kolay algılama (3 balon için)
-        skorlar = [("HEAD", headSkor), ("BIRINCI", birinciSkor), ("IKINCI", ikinciSkor)]
-        enIyi = max(skorlar, key=lambda x: x[1])
-        
-        if enIyi[1] > 0.2:
-            return enIyi[0], enIyi[1]
-        else:
-            return None, 0
-    
-    def degisiklikYapilabilirMi(self):
-        """Değişiklik yapılabilir mi kontrol et"""
-        gecenSure = time.time() - self.sonDeğişiklikZamani
-        return gecenSure >= self.minDeğişiklikAraligi
-    
-    def tumDetectionlariIsle(self, detectionlar):
-        """Basitleştirilmiş ve fix edilmiş detection işleme - 3 balon desteği"""
-        if len(detectionlar) == 0:
-            # Hiç detection yok - missed frame
-            if self.headBalon:
-                self.headBalon.missedFrame()
-            if self.birinciBalon:
-                self.birinciBalon.missedFrame()
-            if self.ikinciBalon:
-                self.ikinciBalon.missedFrame()
+    def izNoktalari(self, kutular):
+        """Kutuların iç %80'inde izIzgarasi x izIzgarasi nokta ve her noktanın iz sırası"""
+        n = self.izIzgarasi
+        oran = 0.1 + 0.8 * (np.arange(n) + 0.5) / n
+        xler = kutular[:, 0, None] + (kutular[:, 2] - kutular[:, 0])[:, None] * oran
+        yler = kutular[:, 1, None] + (kutular[:, 3] - kutular[:, 1])[:, None] * oran
+        noktalar = np.stack(np.broadcast_arrays(xler[:, None, :], yler[:, :, None]), axis=-1)
+        return noktalar.reshape(-1, 1, 2).astype(np.float32), np.repeat(np.arange(len(kutular)), n * n)
+    
+    def arkaPlanNoktalari(self, gri, kutular):
+        """İzlenmeye devam eden arka plan noktaları - yarıdan aza düşünce iz dışından yeniden seçilir"""
+        import cv2
+        if len(self._arkaNoktalar) >= self.arkaPlanNoktasi // 2:
+            return self._arkaNoktalar
+        maske = np.full(gri.shape, 255, dtype=np.uint8)
+        for x1, y1, x2, y2 in np.clip(kutular, 0, None).tolist():
+            maske[y1:y2, x1:x2] = 0
+        koseler = cv2.goodFeaturesToTrack(gri, self.arkaPlanNoktasi, 0.01, 20, mask=maske)
+        return np.zeros((0, 1, 2), dtype=np.float32) if koseler is None else koseler
+    
+    def izle(self, img, balonSistemi, simdi):
+        """Önceki kareden bu kareye akış - kamera kaymasını izlere uygula, iz kaymalarını hazırla"""
+        import cv2
+        gri = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        onceki, self._oncekiGri = self._oncekiGri, gri
+        self._izler = self._izler[:0]
+        if onceki is None or onceki.shape != gri.shape:
+            self._arkaNoktalar = self._arkaNoktalar[:0]
             return
-        
-        # Güncellemeleri takip et
-        headGuncellendi = False
-        birinciGuncellendi = False
-        ikinciGuncellendi = False
-        kullanilmisDetectionlar = set()
-        
-        # Önce mevcut balonları güncellemeye çalış
-        for i, tespit in enumerate(detectionlar):
-            X1, Y1, X2, Y2, guvenSkoru, _ = tespit
-            X1, Y1, X2, Y2 = int(X1), int(Y1), int(X2), int(Y2)
-            
-            if guvenSkoru * 100 < 40:  # Çok düşük güven skip
-                continue
-            
-            # HEAD balon için kontrol
-            if self.headBalon and self.headBalon.isValid() and not headGuncellendi:
-                eslestirme, skor = self.enIyiEslestirme(X1, X2, Y1, Y2, guvenSkoru * 100)
-                if eslestirme == "HEAD" and skor > 0.3:
-                    self.headBalon.guncelle(X1, X2, Y1, Y2, guvenSkoru * 100)
-                    headGuncellendi = True
-                    kullanilmisDetectionlar.add(i)
-                    continue
-            
-            # BIRINCI balon için kontrol
-            if self.birinciBalon and self.birinciBalon.isValid() and not birinciGuncellendi and i not in kullanilmisDetectionlar:
-                eslestirme, skor = self.enIyiEslestirme(X1, X2, Y1, Y2, guvenSkoru * 100)
-                if eslestirme == "BIRINCI" and skor > 0.3:
-                    self.birinciBalon.guncelle(X1, X2, Y1, Y2, guvenSkoru * 100)
-                    birinciGuncellendi = True
-                    kullanilmisDetectionlar.add(i)
-                    continue
-            
-            # IKINCI balon için kontrol
-            if self.ikinciBalon and self.ikinciBalon.isValid() and not ikinciGuncellendi and i not in kullanilmisDetectionlar:
-                eslestirme, skor = self.enIyiEslestirme(X1, X2, Y1, Y2, guvenSkoru * 100)
-                if eslestirme == "IKINCI" and skor > 0.3:
-                    self.ikinciBalon.guncelle(X1, X2, Y1, Y2, guvenSkoru * 100)
-                    ikinciGuncellendi = True
-                    kullanilmisDetectionlar.add(i)
-                    continue
-        
-        # Yeni balon ekleme - 3 balon için
-        for i, tespit in enumerate(detectionlar):
-            if i in kullanilmisDetectionlar:
-                continue
-                
-            X1, Y1, X2, Y2, guvenSkoru, _ = tespit
-            X1, Y1, X2, Y2 = int(X1), int(Y1), int(X2), int(Y2)
-            
-            if guvenSkoru * 100 < 40:  # Minimum güven
-                continue
-            
-            yeniMerkez = ((X1 + X2) // 2, (Y1 + Y2) // 2)
-            
-            # HEAD yoksa veya geçersizse, direkt ekle
-            if self.headBalon is None or not self.headBalon.isValid():
-                self.headBalon = Balon(X1, X2, Y1, Y2, guvenSkoru * 100, "HEAD")
-                self.sonDeğişiklikZamani = time.time()
-                headGuncellendi = True
-                kullanilmisDetectionlar.add(i)
-                continue
-            
-            # BIRINCI yoksa veya geçersizse, HEAD'den farklıysa ekle
-            if self.birinciBalon is None or not self.birinciBalon.isValid():
-                # HEAD'den minimum mesafe kontrolü
-                headMerkez = self.headBalon.ortaNokta()
-                mesafe = math.sqrt((headMerkez[0] - yeniMerkez[0]) ** 2 + (headMerkez[1] - yeniMerkez[1]) ** 2)
-                
-                if mesafe > 30:  # Daha düşük mesafe threshold
-                    self.birinciBalon = Balon(X1, X2, Y1, Y2, guvenSkoru * 100, "BIRINCI")
-                    self.sonDeğişiklikZamani = time.time()
-                    birinciGuncellendi = True
-                    kullanilmisDetectionlar.add(i)
-                    continue
-            
-            # IKINCI yoksa veya geçersizse, HEAD ve BIRINCI'den farklıysa ekle
-            if self.ikinciBalon is None or not self.ikinciBalon.isValid():
-                # HEAD ve BIRINCI'den minimum mesafe kontrolü
-                headMerkez = self.headBalon.ortaNokta()
-                mesafeHead = math.sqrt((headMerkez[0] - yeniMerkez[0]) ** 2 + (headMerkez[1] - yeniMerkez[1]) ** 2)
-                
-                mesafeBirinci = 999  # Varsayılan büyük değer
-                if self.birinciBalon and self.birinciBalon.isValid():
-                    birinciMerkez = self.birinciBalon.ortaNokta()
-                    mesafeBirinci = math.sqrt((birinciMerkez[0] - yeniMerkez[0]) ** 2 + (birinciMerkez[1] - yeniMerkez[1]) ** 2)
-                
-                if mesafeHead > 30 and mesafeBirinci > 30:
-                    self.ikinciBalon = Balon(X1, X2, Y1, Y2, guvenSkoru * 100, "IKINCI")
-                    self.sonDeğişiklikZamani = time.time()
-                    ikinciGuncellendi = True
-                    kullanilmisDetectionlar.add(i)
-                    continue
-        
-        # ÖZEL DURUM: HEAD yoksa terfi sistemi
-        if self.headBalon is None and self.birinciBalon and self.birinciBalon.isValid():
-            self.birinciBalon.tip = "HEAD"
-            self.headBalon = self.birinciBalon
-            self.birinciBalon = self.ikinciBalon  # 2. balon 1.'ye terfi
-            self.ikinciBalon = None
-            if self.birinciBalon:
-                self.birinciBalon.tip = "BIRINCI"
-            headGuncellendi = True
-            print("BIRINCI BALON HEAD'e otomatik terfi etti!")
-        
-        # ÖZEL DURUM: BIRINCI yoksa IKINCI terfi etsin
-        if self.birinciBalon is None and self.ikinciBalon and self.ikinciBalon.isValid():
-            self.ikinciBalon.tip = "BIRINCI"
-            self.birinciBalon = self.ikinciBalon
-            self.ikinciBalon = None
-            birinciGuncellendi = True
-            print("IKINCI BALON BIRINCI'ye otomatik terfi etti!")
-        
-        # Güncellenmeyenlere missed frame
-        if not headGuncellendi and self.headBalon:
-            self.headBalon.missedFrame()
-        if not birinciGuncellendi and self.birinciBalon:
-            self.birinciBalon.missedFrame()
-        if not ikinciGuncellendi and self.ikinciBalon:
-            self.ikinciBalon.missedFrame()
-        
-        # HEAD'e en yakın balon 1. balon olsun
-        self.mesafeKontrolVeYenidenSirala()
-    
-    def balonEkleveyaGuncelle(self, X1, X2, Y1, Y2, guvenSkoru):
-        """Tekil detection işleme - KULLANILMIYOR ARTIK"""
-        # Bu fonksiyon artık kullanılmıyor
-        # Tüm detectionlar tumDetectionlariIsle() ile işleniyor
-        pass
-    
-    def mesafeKontrolVeYenidenSirala(self):
-        """HEAD'e en yakın balon 1. balon olacak şekilde sırala"""
-        if not self.headBalon or not self.headBalon.isValid():
+        depo = balonSistemi.depo
+        izler = np.flatnonzero(depo.gecerliMaske(simdi))
+        kutular = depo.kutular[izler]
+        izNoktalari, sahipler = self.izNoktalari(kutular)
+        noktalar = np.concatenate((izNoktalari, self.arkaPlanNoktalari(onceki, kutular)))
+        if len(noktalar) == 0:
             return
+        self.kareSayisi += 1
+        yeni, durum, hata = cv2.calcOpticalFlowPyrLK(onceki, gri, noktalar, None, winSize=self.pencere,
+                                                     maxLevel=self.seviye)
+        iyi = (durum.ravel() == 1) & (hata.ravel() < self.maksHata)
+        kaymalar = (yeni - noktalar).reshape(-1, 2)
+        k = len(izNoktalari)
         
-        headMerkez = self.headBalon.ortaNokta()
-        
-        # Her iki balon da varsa mesafe kontrolü yap
-        if (self.birinciBalon and self.birinciBalon.isValid() and 
-            self.ikinciBalon and self.ikinciBalon.isValid()):
-            
-            birinciMerkez = self.birinciBalon.ortaNokta()
-            ikinciMerkez = self.ikinciBalon.ortaNokta()
-            
-            mesafeBirinci = math.sqrt((headMerkez[0] - birinciMerkez[0]) ** 2 + 
-                                     (headMerkez[1] - birinciMerkez[1]) ** 2)
-            mesafeIkinci = math.sqrt((headMerkez[0] - ikinciMerkez[0]) ** 2 + 
-                                    (headMerkez[1] - ikinciMerkez[1]) ** 2)
-            
-            # Eğer 2. balon HEAD'e daha yakınsa, yer değiştir
-            if mesafeIkinci < mesafeBirinci:
-                # Balonları yer değiştir
-                self.birinciBalon.tip = "IKINCI"
-                self.ikinciBalon.tip = "BIRINCI"
-                self.birinciBalon, self.ikinciBalon = self.ikinciBalon, self.birinciBalon
-                print(f"Balonlar yer değiştirdi! 1.balon HEAD'e daha yakın ({mesafeIkinci:.0f} < {mesafeBirinci:.0f})")
-    
-    def optimize_kontrol(self):
-        """Her frame hızlı kontrol + Otomatik terfi sistemi - 3 balon"""
-        # HEAD geçersizse 1.BALON'u HEAD yap
-        if self.headBalon and not self.headBalon.isValid():
-            if self.birinciBalon and self.birinciBalon.isValid():
-                # 1.BALON'u HEAD'e terfi ettir
-                self.birinciBalon.tip = "HEAD"
-                self.headBalon = self.birinciBalon
-                # 2.BALON'u 1.BALON'a terfi ettir
-                if self.ikinciBalon and self.ikinciBalon.isValid():
-                    self.ikinciBalon.tip = "BIRINCI"
-                    self.birinciBalon = self.ikinciBalon
-                    self.ikinciBalon = None
-                else:
-                    self.birinciBalon = None
-                self.sonDeğişiklikZamani = time.time()
-                print("1. BALON HEAD'e terfi etti!")
-            else:
-                self.headBalon = None
-            
-        # 1.BALON geçersizse 2.BALON'u terfi ettir
-        if self.birinciBalon and not self.birinciBalon.isValid():
-            if self.ikinciBalon and self.ikinciBalon.isValid():
-                self.ikinciBalon.tip = "BIRINCI"
-                self.birinciBalon = self.ikinciBalon
-                self.ikinciBalon = None
-                print("2. BALON 1. BALON'a terfi etti!")
-            else:
-                self.birinciBalon = None
-        
-        # 2.BALON geçersizse sadece sil
-        if self.ikinciBalon and not self.ikinciBalon.isValid():
-            self.ikinciBalon = None
+        # Kamera kayması: arka plan noktalarının medyanı, tamsayı kısmı izlere uygulanır
+        arkaIyi = iyi[k:]
+        self._arkaNoktalar = yeni[k:][arkaIyi]
+        self.ego = np.median(kaymalar[k:][arkaIyi], axis=0) if arkaIyi.sum() >= self.minNokta else np.zeros(2)
+        self.egoToplam += float(np.hypot(*self.ego))
+        self._egoBirikim += self.ego
+        tam = np.rint(self._egoBirikim)
+        self._egoBirikim -= tam
+        if tam.any():
+            balonSistemi.egoKaydir(tam)
         
-        # HEAD'e en yakın balon 1. balon olsun
-        self.mesafeKontrolVeYenidenSirala()
+        # İzin kendi kayması: nokta medyanı - kamera kayması
+        izIyi = iyi[:k]
+        destekli = np.flatnonzero(np.bincount(sahipler[izIyi], minlength=len(izler)) >= self.minNokta)
+        self._kaymalar = np.array([np.median(kaymalar[:k][izIyi & (sahipler == j)], axis=0)
+                                   for j in destekli]).reshape(-1, 2) - self.ego
+        self._izler = izler[destekli]
+        self._kimlikler = depo.kimlik[self._izler]
     
-    def beslikliBalonKontrolu(self):
-        """5 saniyede bir kontrol - ÇOK SINIRLI"""
-        simdikiZaman = time.time()
+    def tasi(self, balonSistemi, simdi, kopru=False):
+        """Akışı olan izleri kendi kaymalarıyla taşı
         
-        if simdikiZaman - self.sonKontrolZamani >= self.kontrolAraligi:
-            # Sadece KİLİTLİ OLMAYAN balonlar için kontrol
-            if (self.birinciBalon and self.headBalon and 
-                not self.birinciBalon.isLocked() and 
-                not self.headBalon.isLocked() and
-                self.degisiklikYapilabilirMi()):
-                
-                # Kalite farkı ÇOK büyükse değiştir
-                headKalite = self.headBalon.kalitePuani()
-                birinciKalite = self.birinciBalon.kalitePuani()
-                
-                if birinciKalite > headKalite + 30:  # Büyük fark gerekli
-                    # Yer değiştir
-                    self.headBalon.tip = "BIRINCI"
-                    self.birinciBalon.tip = "HEAD"
-                    self.headBalon, self.birinciBalon = self.birinciBalon, self.headBalon
-                    self.sonDeğişiklikZamani = time.time()
-            
-            self.sonKontrolZamani = simdikiZaman
-    
-    def aktifBalonSayisi(self):
-        """Aktif balon sayısını döndür"""
-        sayisi = 0
-        if self.headBalon and self.headBalon.isValid(): sayisi += 1
-        if self.birinciBalon and self.birinciBalon.isValid(): sayisi += 1
-        if self.ikinciBalon and self.ikinciBalon.isValid(): sayisi += 1
-        return sayisi
-
-# Kamera kurulumu (canlı görüntü)
-cap = cv2.VideoCapture(0)
-
-genislik = int(cap.get(3))
-yukseklik = int(cap.get(4))
-kamera_fps = float(cap.get(5))
-print(f"Kamera FPS: {kamera_fps:.2f}")
-
-# Kamera optimizasyonu
-cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-cap.set(cv2.CAP_PROP_FPS, 30)
-cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-
-# Model ve sistem
-model = YOLO("/Users/aliyilmaz/Desktop/HAVASAVUNMASİSTEMLERİ/best.pt") # Model Yolu
-balonSistemi = UltraKararliUcBalonSistemi()
-
-# FPS takibi
-onceki_zaman = time.time()
-frame_sayaci = 0
-
-while True:
-    kameraBasarili, img = cap.read()
-    if not kameraBasarili:
-        print("Kamera bulunamadı veya okunamadı")
-        break
-
-    simdiki_zaman = time.time()
-    gecen_sure = simdiki_zaman - onceki_zaman
-    fps = 1 / (gecen_sure + 1e-8)
-    onceki_zaman = simdiki_zaman
-    
-    # Her frame detection yap - YENİ ÇAKIŞMA ÖNLEYİCİ SİSTEM
-    frame_sayaci += 1
-    sonuclar = model(img, verbose=False)[0]
-    tespitler = np.array(sonuclar.boxes.data.tolist() if sonuclar.boxes is not None else [])
+        kopru=False: detection atlanan kare - akışı olmayan izler hareket modeliyle kaydırılır
+        kopru=True: detection sonrası - yalnızca ıskalanan izler taşınır, miss geri alınır
+        """
+        depo = balonSistemi.depo
+        ayni = depo.kimlik[self._izler] == self._kimlikler
+        izler, kimlikler = self._izler[ayni], self._kimlikler[ayni]
+        birikim = self._kaymalar[ayni] + np.array([self._izBirikim.get(k, (0.0, 0.0)) for k in kimlikler.tolist()],
+                                                  dtype=np.float64).reshape(-1, 2)
+        tam = np.rint(birikim)
+        tasinan = balonSistemi.akisIleTasi(izler, tam, simdi, kopru)
+        secilen = np.isin(izler, tasinan)
+        self._izBirikim = dict(zip(kimlikler[secilen].tolist(), (birikim - tam)[secilen].tolist()))
+        if kopru:
+            self.koprulenen += len(tasinan)
+        else:
+            self.tasinan += len(tasinan)
+            gecerli = depo.gecerliMaske(simdi)
+            gecerli[tasinan] = False
+            depo.kaydir(np.flatnonzero(gecerli), simdi)
+    
+    def ozet(self):
+        return (f"Optik akış: {self.kareSayisi} kare, kamera kayması ort. {self.egoToplam / max(self.kareSayisi, 1):.2f} "
+                f"px/kare, atlanan karelerde {self.tasinan} iz taşındı, {self.koprulenen} ıskalama köprülendi")
 
+def takipAdimi(balonSistemi, tespitler, zaman, optikAkis=None, img=None):
+    """Detectionları tracker'a ver + her frame ve periyodik kontroller
+    
+    zaman: karenin yakalama zamanı - tüm takip adımları aynı damgayı kullanır
+    optikAkis: ıskalanan izler bakımdan önce akışla köprülenir
+    img: kayıp iz havuzu açıksa renk imzaları bu kareden çıkarılır
+    """
+    imzaci = None
+    if img is not None and balonSistemi.kayipHavuzu is not None:
+        imzaci = lambda kutular: renkImzalari(img, kutular)
+    
     # Tüm detectionları bir arada işle - çakışmayı önle
-    balonSistemi.tumDetectionlariIsle(tespitler)
+    with OLCUMLER.olc("eslestirme"):
+        balonSistemi.tumDetectionlariIsle(tespitler, zaman, imzaci)
+        if optikAkis is not None:
+            optikAkis.tasi(balonSistemi, zaman, kopru=True)
     
     # Her frame hızlı kontrol
-    balonSistemi.optimize_kontrol()
+    with OLCUMLER.olc("bakim"):
+        balonSistemi.optimize_kontrol(zaman)
     
     # Periyodik kontrol
-    balonSistemi.beslikliBalonKontrolu()
+    with OLCUMLER.olc("periyodik"):
+        balonSistemi.beslikliBalonKontrolu(zaman)
+
+# Sıralamadaki yere göre etiket ve renk: HEAD yeşil, 1. turuncu, 2. mor, diğerleri sarı
+CIZIM_TABLOSU = [("HEAD", (0, 255, 0)), ("1. balon", (0, 165, 255)), ("2. balon", (255, 0, 255))]
+DIGER_RENK = (0, 255, 255)
+
+def kareyiCiz(img, balonSistemi, genislik, yukseklik, fps, gecikme=None):
+    """Sıralamadaki tüm balonlar + performans bilgisi çizimi
     
-    # HEAD balon çizimi
-    if balonSistemi.headBalon and balonSistemi.headBalon.isValid():
-        fx, fy = balonSistemi.headBalon.ortaNokta()
-        dogruluk = balonSistemi.headBalon.guvenSkoru
-        
-        # HEAD için yeşil renk
-        renk = (0, 255, 0)
+    Çizilecek değerler depo dizilerinden tek seferde hesaplanır, ardından
+    sıralama üzerinde tek geçişte CIZIM_TABLOSU'na göre çizilir.
+    """
+    import cv2
+    depo = balonSistemi.depo
+    izler = balonSistemi.siralama
+    gecerli = depo.gecerliMaske(balonSistemi.saat())[izler]
+    kutular = depo.kutular[izler].astype(np.int64)
+    merkezler = (kutular[:, :2] + kutular[:, 2:]) // 2
+    hizlar = depo.hiz[izler]
+    hizUclari = (merkezler + hizlar * 30).astype(np.int64)
+    hareketli = (hizlar != 0).any(axis=1)
+    tahminler = depo.tahmin[izler]
+    tahminVar = ~np.isnan(tahminler).any(axis=1) & (tahminler != 0).all(axis=1)
+    tahminler = np.where(tahminVar[:, None], tahminler, 0).astype(np.int64)
+    
+    for sira, (gec, (fx, fy), dogruluk, hareket, hizUcu, tVar, tahmin) in enumerate(zip(
+            gecerli.tolist(), merkezler.tolist(), depo.guven[izler].tolist(), hareketli.tolist(),
+            hizUclari.tolist(), tahminVar.tolist(), tahminler.tolist())):
+        if not gec:
+            continue
+        etiket, renk = CIZIM_TABLOSU[sira] if sira < len(CIZIM_TABLOSU) else (f"{sira}. balon", DIGER_RENK)
         
         # Çizimler
         cv2.circle(img, (fx, fy), 100, renk, 2)
         cv2.circle(img, (fx, fy), 15, renk, -1)
-        cv2.putText(img, "HEAD", (fx + 15, fy - 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
-        cv2.putText(img, str(f"{dogruluk:.1f}"), (fx, fy + 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
+        cv2.putText(img, etiket, (fx + 15, fy - 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
+        cv2.putText(img, f"{dogruluk:.1f}", (fx, fy + 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
         
         # Hız vektörü
-        if balonSistemi.headBalon.hizVektoruX != 0 or balonSistemi.headBalon.hizVektoruY != 0:
-            hizX = int(fx + balonSistemi.headBalon.hizVektoruX * 30)
-            hizY = int(fy + balonSistemi.headBalon.hizVektoruY * 30)
-            cv2.arrowedLine(img, (fx, fy), (hizX, hizY), (255, 255, 0), 2)
+        if hareket:
+            cv2.arrowedLine(img, (fx, fy), tuple(hizUcu), (255, 255, 0), 2)
         
         # Tahmin edilen konum
-        if balonSistemi.headBalon.tahminEdilenX and balonSistemi.headBalon.tahminEdilenY:
-            tahminX = int(balonSistemi.headBalon.tahminEdilenX)
-            tahminY = int(balonSistemi.headBalon.tahminEdilenY)
-            cv2.circle(img, (tahminX, tahminY), 30, (255, 255, 255), 2)
-        
-        # Koordinat çizgileri
-        cv2.line(img, (0, fy), (genislik, fy), (0, 0, 0), 1)
-        cv2.line(img, (fx, yukseklik), (fx, 0), (0, 0, 0), 1)
+        if tVar:
+            cv2.circle(img, tuple(tahmin), 30, (255, 255, 255), 2)
         
-        # Koordinat bilgisi
-        konum = f"({fx}, {fy})"
-        cv2.putText(img, konum, (fx + 15, fy - 15), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
-    
-    # 1. BALON çizimi
-    if balonSistemi.birinciBalon and balonSistemi.birinciBalon.isValid():
-        fx, fy = balonSistemi.birinciBalon.ortaNokta()
-        dogruluk = balonSistemi.birinciBalon.guvenSkoru
-        
-        # 1. BALON için turuncu renk
-        renk = (0, 165, 255)
-        
-        # Çizimler
-        cv2.circle(img, (fx, fy), 100, renk, 2)
-        cv2.circle(img, (fx, fy), 15, renk, -1)
-        cv2.putText(img, "1. balon", (fx + 15, fy - 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
-        cv2.putText(img, str(f"{dogruluk:.1f}"), (fx, fy + 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
+        if sira == 0:
+            # Koordinat çizgileri
+            cv2.line(img, (0, fy), (genislik, fy), (0, 0, 0), 1)
+            cv2.line(img, (fx, yukseklik), (fx, 0), (0, 0, 0), 1)
+            
+            # Koordinat bilgisi
+            konum = f"({fx}, {fy})"
+            cv2.putText(img, konum, (fx + 15, fy - 15), cv2.FONT_HERSHEY_PLAIN, 2, (255, 0, 0), 2)
+    
+    # Performance bilgileri
+    cv2.putText(img,f"FPS: {fps:.1f}",(10,30),cv2.FONT_HERSHEY_SIMPLEX, 1,(0,255,0),2)
+    cv2.putText(img,f"Dugum: {int(np.count_nonzero(gecerli))}",(10,60),cv2.FONT_HERSHEY_SIMPLEX, 1,(0,255,0),2)
+    if gecikme is not None:
+        cv2.putText(img,f"Gecikme: {gecikme * 1000:.0f} ms",(10,90),cv2.FONT_HERSHEY_SIMPLEX, 1,(0,255,0),2)
+
+class Cizici:
+    """Ekran çıktısı - başsız modda hiç çizmez, ekran modunda takipten seyrek çizer
+    
+    cizimHz: saniyede en fazla ekran güncellemesi (0 = her kare)
+    basliksiz: çizim ve pencere yok - cizimKayit verilmişse yalnızca onun
+    tutacağı kareler çizilir
+    """
+    def __init__(self, genislik, yukseklik, cizimHz=0.0, basliksiz=False, cizimKayit=None,
+                 pencere="Canli Takip", saat=time.time):
+        self.genislik = genislik
+        self.yukseklik = yukseklik
+        self.minAralik = 1.0 / cizimHz if cizimHz > 0 else 0.0
+        self.basliksiz = basliksiz
+        self.kayit = cizimKayit
+        self.pencere = pencere
+        self.saat = saat
+        self._sonGosterim = float("-inf")
+        self.gosterilen = 0
+        self.atlanan = 0
+    
+    @property
+    def aktif(self):
+        """Tracker anlık kopyasına ihtiyaç var mı (pipeline modu)"""
+        return not self.basliksiz or self.kayit is not None
+    
+    def kare(self, img, balonSistemi, zaman, fps, gecikme=None):
+        """Kareyi gerekiyorsa çiz, göster ve kaydet - çıkış istendiyse ('q') True"""
+        import cv2
+        simdi = self.saat()
+        goster = not self.basliksiz and simdi - self._sonGosterim >= self.minAralik
+        kaydet = self.kayit is not None and self.kayit.siradakiTutulurMu()
+        if goster or kaydet:
+            with OLCUMLER.olc("cizim"):
+                kareyiCiz(img, balonSistemi, self.genislik, self.yukseklik, fps, gecikme)
+        if self.kayit is not None:
+            self.kayit.ekle(img, zaman, balonSistemi)
+        if not goster:
+            self.atlanan += 1
+            return False
+        self._sonGosterim = simdi
+        self.gosterilen += 1
+        cv2.imshow(self.pencere, img)
+        return cv2.waitKey(1) & 0xFF == ord('q')
+    
+    def kapat(self):
+        if not self.basliksiz:
+            import cv2
+            cv2.destroyAllWindows()
+    
+    def ozet(self):
+        if self.basliksiz:
+            return "Çizim: başsız mod"
+        return f"Çizim: {self.gosterilen} kare gösterildi, {self.atlanan} seyreltildi"
+
+class KareIsleyici:
+    """Kare başına iş birlikçiler - tüm döngüler kareyi adim ile işler, ciz ile gösterir
+    
+    Tespit (model veya roi), zamanlayıcı, süzgeç, tespit kaydı, optik akış,
+    takip, nişan çıkışı ve ham kayıt adim içinde sırayla çalışır; yeni bir
+    kare çıktısı yalnızca buraya eklenir. ozet açık bileşenlerin özetlerini
+    verir, kapat kanal, kayıt ve pencereleri kapatır.
+    olcumAdi: verilirse uçtan uca gecikme OLCUMLER'e bu aşama adıyla da eklenir
+    """
+    def __init__(self, balonSistemi, model=None, suzgec=VARSAYILAN_SUZGEC, kaydedici=None, roi=None,
+                 zamanlayici=None, optikAkis=None, nisan=None, hamKayit=None, cizici=None, olcumAdi=None):
+        self.balonSistemi = balonSistemi
+        self.model = model
+        self.suzgec = suzgec
+        self.kaydedici = kaydedici
+        self.roi = roi
+        self.zamanlayici = zamanlayici
+        self.optikAkis = optikAkis
+        self.nisan = nisan
+        self.hamKayit = hamKayit
+        self.cizici = cizici
+        self.olcumAdi = olcumAdi
+        self.istatistik = GecikmeIstatistigi()
+        self._oncekiCizim = time.time()
+    
+    def adim(self, img, zaman, tespitler=None):
+        """Bir kare için tespit + takip + kare çıktıları
         
-        # Hız vektörü
-        if balonSistemi.birinciBalon.hizVektoruX != 0 or balonSistemi.birinciBalon.hizVektoruY != 0:
-            hizX = int(fx + balonSistemi.birinciBalon.hizVektoruX * 30)
-            hizY = int(fy + balonSistemi.birinciBalon.hizVektoruY * 30)
-            cv2.arrowedLine(img, (fx, fy), (hizX, hizY), (255, 255, 0), 2)
+        tespitler: dışarıda (toplu çağrıda / ayrı süreçte) alınmış model çıktısı -
+        verilmezse model veya roi çağrılır; zamanlayıcı izin vermezse tespit
+        atlanır ve izler yalnızca kaydırılır
+        """
+        balonSistemi = self.balonSistemi
+        if self.optikAkis is not None:
+            with OLCUMLER.olc("akis"):
+                self.optikAkis.izle(img, balonSistemi, zaman)
+        if tespitler is None:
+            tespitler = self.kareTespiti(img, zaman)
+        if tespitler is not None:
+            tespitler = self.suzgec(tespitler, img.shape[1], img.shape[0])
+            if self.kaydedici is not None:
+                self.kaydedici.ekle(zaman, tespitler)
+            takipAdimi(balonSistemi, tespitler, zaman, self.optikAkis, img)
+        if self.nisan is not None:
+            self.nisan.yayinla(balonSistemi, zaman)
+        if self.hamKayit is not None:
+            self.hamKayit.ekle(img, zaman, balonSistemi)
+    
+    def kareTespiti(self, img, zaman):
+        """Tam kare veya bölgesel tespit - zamanlayıcı atlatırsa izleri kaydırıp None döndürür"""
+        if self.zamanlayici is not None and not self.zamanlayici.tespitGerekli(self.balonSistemi, zaman, img):
+            if self.optikAkis is not None:
+                self.optikAkis.tasi(self.balonSistemi, zaman)
+            else:
+                self.balonSistemi.kaydir(zaman)
+            return None
+        baslangic = time.perf_counter()
+        tespitler = self.roi.tespitEt(img, zaman) if self.roi is not None else tespitEt(self.model, img)
+        if self.zamanlayici is not None:
+            self.zamanlayici.cikarimOlc(time.perf_counter() - baslangic)
+        return tespitler
+    
+    def ciz(self, img, zaman, balonSistemi=None):
+        """Kareyi çizici ile çiz/göster, uçtan uca gecikmeyi kaydet - çıkış istendiyse True
         
-        # Tahmin edilen konum
-        if balonSistemi.birinciBalon.tahminEdilenX and balonSistemi.birinciBalon.tahminEdilenY:
-            tahminX = int(balonSistemi.birinciBalon.tahminEdilenX)
-            tahminY = int(balonSistemi.birinciBalon.tahminEdilenY)
-            cv2.circle(img, (tahminX, tahminY), 30, (255, 255, 255), 2)
-    
-    # 2. BALON çizimi
-    if balonSistemi.ikinciBalon and balonSistemi.ikinciBalon.isValid():
-        fx, fy = balonSistemi.ikinciBalon.ortaNokta()
-        dogruluk = balonSistemi.ikinciBalon.guvenSkoru
+        balonSistemi: pipeline modunda tracker'ın anlık kopyası (None ise tracker'ın kendisi)
+        """
+        simdi = time.time()
+        fps = 1 / (simdi - self._oncekiCizim + 1e-8)
+        self._oncekiCizim = simdi
+        if balonSistemi is None:
+            balonSistemi = self.balonSistemi
+        # Ekrandaki gecikme çizim öncesidir; istatistiğe çizim ve gösterim dahil eklenir
+        cikis = self.cizici.kare(img, balonSistemi, zaman, fps, time.time() - zaman)
+        gecikme = time.time() - zaman
+        self.istatistik.ekle(gecikme)
+        if self.olcumAdi is not None:
+            OLCUMLER.ekle(self.olcumAdi, gecikme)
+        return cikis
+    
+    def ozet(self):
+        """Gecikme istatistiği (kare çizildiyse) ve açık bileşenlerin özetleri, satır satır"""
+        bilesenler = [self.istatistik] if self.istatistik.toplamKare else []
+        bilesenler += [self.roi, self.zamanlayici, self.optikAkis, self.balonSistemi.kayipHavuzu, self.nisan,
+                       self.hamKayit]
+        if self.cizici is not None:
+            bilesenler += [self.cizici, self.cizici.kayit]
+        return "\n".join(bilesen.ozet() for bilesen in bilesenler if bilesen is not None)
+    
+    def kapat(self):
+        """Nişan kanalı, video kayıtları, tespit kaydı ve pencereleri kapat"""
+        if self.nisan is not None:
+            self.nisan.kanal.kapat()
+        kayitlar = [self.hamKayit, self.kaydedici]
+        if self.cizici is not None:
+            kayitlar.append(self.cizici.kayit)
+        for kayit in kayitlar:
+            if kayit is not None:
+                kayit.kapat()
+        if self.cizici is not None:
+            self.cizici.kapat()
+
+def senkronDongu(cap, isleyici):
+    """Klasik tek thread döngü: yakala -> tespit -> takip -> çiz
+    
+    Kare başına tespit, takip ve çıktılar (roi, zamanlayıcı, nişan, kayıtlar)
+    isleyici'dedir (KareIsleyici).
+    """
+    while True:
+        with OLCUMLER.olc("yakalama"):
+            kameraBasarili, img = cap.read()
+        yakalamaZamani = time.time()
+        if not kameraBasarili:
+            print("Kamera bulunamadı veya okunamadı")
+            break
         
-        # 2. BALON için mor renk
-        renk = (255, 0, 255)
+        isleyici.adim(img, yakalamaZamani)
+        if isleyici.ciz(img, yakalamaZamani):
+            break
+    
+    print(isleyici.ozet())
+
+def pipelineDongu(cap, isleyici):
+    """3 thread'li pipeline: yakalama -> tespit+takip -> çizim
+    
+    Aşamalar arası 'son gelen kazanır' yuvaları ile bağlanır, bayat kareler
+    düşürülür. Çizim ana thread'de kalır (cv2.imshow gereksinimi); başsız
+    modda tracker kopyası alınmaz, ana thread yalnızca gecikmeyi ölçer.
+    """
+    durdur = threading.Event()
+    kameraYuvasi = SonKareYuvasi()
+    cizimYuvasi = SonKareYuvasi()
+    
+    def yakalamaIsci():
+        while not durdur.is_set():
+            with OLCUMLER.olc("yakalama"):
+                kameraBasarili, img = cap.read()
+            yakalamaZamani = time.time()
+            if not kameraBasarili:
+                print("Kamera bulunamadı veya okunamadı")
+                durdur.set()
+                break
+            kameraYuvasi.koy((img, yakalamaZamani))
+        kameraYuvasi.kapat()
+    
+    def cikarimIsci():
+        while not durdur.is_set():
+            veri = kameraYuvasi.al()
+            if veri is None:
+                continue
+            img, yakalamaZamani = veri
+            isleyici.adim(img, yakalamaZamani)
+            # Çizim thread'i tracker'ı değil, anlık kopyasını okur
+            anlikSistem = isleyici.balonSistemi.kopya() if isleyici.cizici.aktif else None
+            cizimYuvasi.koy((img, yakalamaZamani, anlikSistem))
+        cizimYuvasi.kapat()
+    
+    isciler = [threading.Thread(target=yakalamaIsci, name="yakalama", daemon=True),
+               threading.Thread(target=cikarimIsci, name="cikarim", daemon=True)]
+    for isci in isciler:
+        isci.start()
+    
+    try:
+        while not durdur.is_set():
+            veri = cizimYuvasi.al()
+            if veri is None:
+                continue
+            img, yakalamaZamani, anlikSistem = veri
+            if anlikSistem is None:
+                # Başsız mod: çizici tracker'ı okumaz, yalnızca gecikme ölçülür
+                anlikSistem = isleyici.balonSistemi
+            if isleyici.ciz(img, yakalamaZamani, anlikSistem):
+                break
+    finally:
+        durdur.set()
+        for isci in isciler:
+            isci.join(timeout=1.0)
+    
+    print(isleyici.ozet())
+    print(f"Düşürülen kare - yakalama: {kameraYuvasi.dusurulen}, çizim: {cizimYuvasi.dusurulen}")
+
+class KameraAkisi:
+    """Çoklu kamera modunda tek kaynak: yakalama thread'i, son kare yuvası ve kendi tracker'ının kare işleyicisi"""
+    def __init__(self, ad, cap, isleyici):
+        self.ad = ad
+        self.cap = cap
+        self.isleyici = isleyici
+        self.yuva = SonKareYuvasi()
+        self.bitti = False
+    
+    def yakalamaIsci(self, durdur, yeniKare):
+        while not durdur.is_set():
+            with OLCUMLER.olc("yakalama"):
+                kameraBasarili, img = self.cap.read()
+            yakalamaZamani = time.time()
+            if not kameraBasarili:
+                print(f"Kamera {self.ad} okunamadı")
+                break
+            self.yuva.koy((img, yakalamaZamani))
+            yeniKare.set()
+        self.bitti = True
+        self.yuva.kapat()
+        yeniKare.set()
+    
+    def ozet(self):
+        satirlar = self.isleyici.ozet().splitlines()
+        return "\n".join([f"Kamera {self.ad}: Düşürülen: {self.yuva.dusurulen}"] + [f"  {satir}" for satir in satirlar])
+
+def cokluKameraDongu(akislar, model):
+    """Her kamerada ayrı yakalama thread'i ve tracker, tek batch'li ortak çıkarım
+    
+    Çıkarım thread'i hazır olan kameraların en son karelerini toplayıp tek
+    model çağrısına verir, sonuçları kendi kare işleyicilerine dağıtır. Kare
+    üretmeyen (yavaş/kopan) kamera batch'e girmez, diğerlerini bekletmez.
+    """
+    durdur = threading.Event()
+    yeniKare = threading.Event()
+    isciler = [threading.Thread(target=akis.yakalamaIsci, args=(durdur, yeniKare), name=f"yakalama-{akis.ad}",
+                                daemon=True) for akis in akislar]
+    for isci in isciler:
+        isci.start()
+    
+    try:
+        while not all(akis.bitti for akis in akislar):
+            yeniKare.wait(0.1)
+            yeniKare.clear()
+            hazirlar = []
+            for akis in akislar:
+                veri = akis.yuva.al(zamanAsimi=0)
+                if veri is not None:
+                    hazirlar.append((akis, veri))
+            if not hazirlar:
+                continue
+            
+            tespitListesi = tespitEtToplu(model, [img for _, (img, _) in hazirlar])
+            cikis = False
+            for (akis, (img, yakalamaZamani)), tespitler in zip(hazirlar, tespitListesi):
+                akis.isleyici.adim(img, yakalamaZamani, tespitler)
+                cikis |= akis.isleyici.ciz(img, yakalamaZamani)
+            if cikis:
+                break
+    finally:
+        durdur.set()
+        for isci in isciler:
+            isci.join(timeout=1.0)
+    
+    for akis in akislar:
+        print(akis.ozet())
+
+def yuvaDizileri(bellek, yuvaSayisi, sekil):
+    """Paylaşılan bellek üzerinde (yuvaSayisi, Y, G, 3) uint8 kare halkası - kopyasız görünüm"""
+    return np.ndarray((yuvaSayisi,) + tuple(sekil), dtype=np.uint8, buffer=bellek.buf)
+
+def yakalamaSureci(kaynak, bellekAdi, yuvaSayisi, sekil, bosYuvalar, kareKuyrugu, durdur, dusurulen):
+    """Kamera süreci: kareyi doğrudan boş bir paylaşılan yuvaya okur, yalnızca yuva indeksini gönderir"""
+    import cv2
+    bellek = shared_memory.SharedMemory(name=bellekAdi)
+    yuvalar = yuvaDizileri(bellek, yuvaSayisi, sekil)
+    cap, _, _ = kameraAc(kaynak, sekil[1], sekil[0])
+    try:
+        while not durdur.is_set():
+            try:
+                yuva = bosYuvalar.get_nowait()
+            except queue.Empty:
+                # Tüm yuvalar kullanımda - kamera tamponu bayatlamasın diye kareyi at
+                if not cap.grab():
+                    print("Kamera bulunamadı veya okunamadı")
+                    break
+                with dusurulen.get_lock():
+                    dusurulen.value += 1
+                continue
+            t0 = time.perf_counter()
+            kameraBasarili, img = cap.read(yuvalar[yuva])
+            yakalamaZamani = time.time()
+            if not kameraBasarili:
+                print("Kamera bulunamadı veya okunamadı")
+                break
+            if img.shape != yuvalar[yuva].shape:
+                cv2.resize(img, (sekil[1], sekil[0]), dst=yuvalar[yuva])
+            elif img.ctypes.data != yuvalar[yuva].ctypes.data:
+                yuvalar[yuva] = img
+            kareKuyrugu.put((yuva, yakalamaZamani, time.perf_counter() - t0))
+    finally:
+        kareKuyrugu.put(None)
+        cap.release()
+        del yuvalar
+        bellek.close()
+
+def cikarimSureci(modelYolu, arkaUc, bellekAdi, yuvaSayisi, sekil, bosYuvalar, kareKuyrugu, sonucKuyrugu, durdur):
+    """Çıkarım süreci: en yeni yuvayı modele verir, bayat yuvaları boşa iade eder, detectionları gönderir"""
+    bellek = shared_memory.SharedMemory(name=bellekAdi)
+    yuvalar = yuvaDizileri(bellek, yuvaSayisi, sekil)
+    model = modelYukle(modelYolu, arkaUc)
+    modelIsit(model, sekil[1], sekil[0])
+    try:
+        while not durdur.is_set():
+            try:
+                oge = kareKuyrugu.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            # Kuyrukta birikenlerden yalnızca en yenisi işlenir
+            while oge is not None:
+                try:
+                    yeni = kareKuyrugu.get_nowait()
+                except queue.Empty:
+                    break
+                bosYuvalar.put(oge[0])
+                oge = yeni
+            if oge is None:
+                break
+            yuva, yakalamaZamani, yakalamaSuresi = oge
+            t0 = time.perf_counter()
+            tespitler = tespitEt(model, yuvalar[yuva])
+            sonucKuyrugu.put((yuva, yakalamaZamani, tespitler, yakalamaSuresi, time.perf_counter() - t0))
+    finally:
+        sonucKuyrugu.put(None)
+        del yuvalar
+        bellek.close()
+
+def surecliDongu(kaynak, modelYolu, arkaUc, isleyici, genislik, yukseklik, yuvaSayisi=4):
+    """Çok süreçli pipeline: yakalama süreci -> çıkarım süreci -> takip + çizim (bu süreç)
+    
+    Kareler yuvaSayisi elemanlı paylaşılan bellek halkasında yaşar; süreçler
+    arasında yalnızca yuva indeksleri ve detection dizileri taşınır, kare
+    yakalamadan sonra kopyalanmaz. Yuva sırası: boş -> yakalama -> çıkarım ->
+    takip/çizim -> boş. Yuva kalmazsa yakalama kareyi atar, çıkarım yalnızca
+    en yeni kareyi işler. Model çıkarım sürecinde yüklenir, GIL'i tracker ile
+    paylaşmaz. Süzgeç, takip ve kare çıktıları bu süreçte isleyici.adim ile
+    çalışır.
+    """
+    sekil = (yukseklik, genislik, 3)
+    bellek = shared_memory.SharedMemory(create=True, size=yuvaSayisi * yukseklik * genislik * 3)
+    yuvalar = yuvaDizileri(bellek, yuvaSayisi, sekil)
+    baglam = multiprocessing.get_context("spawn")
+    durdur = baglam.Event()
+    dusurulen = baglam.Value("q", 0)
+    bosYuvalar, kareKuyrugu, sonucKuyrugu = baglam.Queue(), baglam.Queue(), baglam.Queue()
+    for yuva in range(yuvaSayisi):
+        bosYuvalar.put(yuva)
+    
+    surecler = [baglam.Process(target=yakalamaSureci, name="yakalama", daemon=True,
+                               args=(kaynak, bellek.name, yuvaSayisi, sekil, bosYuvalar, kareKuyrugu, durdur,
+                                     dusurulen)),
+                baglam.Process(target=cikarimSureci, name="cikarim", daemon=True,
+                               args=(modelYolu, arkaUc, bellek.name, yuvaSayisi, sekil, bosYuvalar, kareKuyrugu,
+                                     sonucKuyrugu, durdur))]
+    for surec in surecler:
+        surec.start()
+    
+    img = None
+    try:
+        while True:
+            try:
+                oge = sonucKuyrugu.get(timeout=0.1)
+            except queue.Empty:
+                if not all(surec.is_alive() for surec in surecler):
+                    break
+                continue
+            if oge is None:
+                break
+            yuva, yakalamaZamani, tespitler, yakalamaSuresi, cikarimSuresi = oge
+            OLCUMLER.ekle("yakalama", yakalamaSuresi)
+            OLCUMLER.ekle("cikarim", cikarimSuresi)
+            img = yuvalar[yuva]
+            
+            isleyici.adim(img, yakalamaZamani, tespitler)
+            cikis = isleyici.ciz(img, yakalamaZamani)
+            bosYuvalar.put(yuva)
+            if cikis:
+                break
+    finally:
+        durdur.set()
+        for surec in surecler:
+            surec.join(timeout=2.0)
+            if surec.is_alive():
+                surec.terminate()
+        del img, yuvalar
+        bellek.close()
+        bellek.unlink()
+    
+    print(isleyici.ozet())
+    print(f"Düşürülen kare - yakalama (yuva yok): {dusurulen.value}")
+
+def videoIsle(videoYolu, isleyici, saat, batch=8, ciktiYolu=None, izYolu=None):
+    """Kayıtlı video dosyasını toplu (batch) çıkarımla işle
+    
+    Okuma ayrı thread'de yapılır. Kareler batch halinde modele verilir,
+    sonuçlar tracker'dan kare sırasıyla geçer. Zaman video zamanıdır
+    (kare / video FPS), saat bu zamana ayarlanır. İsteğe bağlı olarak çizimli
+    video ve kare başına iz CSV'si yazılır. Model ve tracker isleyici'dedir
+    (KareIsleyici).
+    """
+    import cv2
+    cap = cv2.VideoCapture(videoYolu)
+    if not cap.isOpened():
+        print(f"Video açılamadı: {videoYolu}")
+        return
+    videoFps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    genislik = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    yukseklik = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    
+    okumaKuyrugu = queue.Queue(maxsize=batch * 4)
+    
+    def okuyucu():
+        sira = 0
+        while True:
+            with OLCUMLER.olc("yakalama"):
+                basarili, img = cap.read()
+            if not basarili:
+                break
+            okumaKuyrugu.put((sira, img))
+            sira += 1
+        okumaKuyrugu.put(None)
+    
+    threading.Thread(target=okuyucu, name="video-okuma", daemon=True).start()
+    
+    yazici = None
+    if ciktiYolu:
+        yazici = cv2.VideoWriter(ciktiYolu, cv2.VideoWriter_fourcc(*"mp4v"), videoFps, (genislik, yukseklik))
+    izDosyasi = open(izYolu, "w", newline="") if izYolu else None
+    izYazici = None
+    if izDosyasi:
+        izYazici = csv.writer(izDosyasi)
+        izYazici.writerow(IZ_BASLIGI)
+    
+    balonSistemi = isleyici.balonSistemi
+    baslangic = time.perf_counter()
+    cikarimSuresi = 0.0
+    kareSayisi = 0
+    bitti = False
+    while not bitti:
+        # Batch topla - video bitince eksik batch ile devam
+        parti = []
+        while len(parti) < batch:
+            oge = okumaKuyrugu.get()
+            if oge is None:
+                bitti = True
+                break
+            parti.append(oge)
+        if not parti:
+            break
         
-        # Çizimler
-        cv2.circle(img, (fx, fy), 100, renk, 2)
-        cv2.circle(img, (fx, fy), 15, renk, -1)
-        cv2.putText(img, "2. balon", (fx + 15, fy - 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
-        cv2.putText(img, str(f"{dogruluk:.1f}"), (fx, fy + 50), cv2.FONT_HERSHEY_PLAIN, 2, renk, 2)
+        t0 = time.perf_counter()
+        tespitListesi = tespitEtToplu(isleyici.model, [img for _, img in parti])
+        cikarimSuresi += time.perf_counter() - t0
         
-        # Hız vektörü
-        if balonSistemi.ikinciBalon.hizVektoruX != 0 or balonSistemi.ikinciBalon.hizVektoruY != 0:
-            hizX = int(fx + balonSistemi.ikinciBalon.hizVektoruX * 30)
-            hizY = int(fy + balonSistemi.ikinciBalon.hizVektoruY * 30)
-            cv2.arrowedLine(img, (fx, fy), (hizX, hizY), (255, 255, 0), 2)
+        for (sira, img), tespitler in zip(parti, tespitListesi):
+            zaman = sira / videoFps
+            saat.zaman = zaman
+            isleyici.adim(img, zaman, tespitler)
+            
+            if izYazici:
+                izYazici.writerows(izSatirlari(balonSistemi, sira, zaman))
+            if yazici:
+                gecen = time.perf_counter() - baslangic
+                with OLCUMLER.olc("cizim"):
+                    kareyiCiz(img, balonSistemi, genislik, yukseklik, (kareSayisi + 1) / (gecen + 1e-8))
+                yazici.write(img)
+            kareSayisi += 1
         
-        # Tahmin edilen konum
-        if balonSistemi.ikinciBalon.tahminEdilenX and balonSistemi.ikinciBalon.tahminEdilenY:
-            tahminX = int(balonSistemi.ikinciBalon.tahminEdilenX)
-            tahminY = int(balonSistemi.ikinciBalon.tahminEdilenY)
-            cv2.circle(img, (tahminX, tahminY), 30, (255, 255, 255), 2)
-    
-    # Performance bilgileri
-    cv2.putText(img,f"FPS: {fps:.1f}",(10,30),cv2.FONT_HERSHEY_SIMPLEX, 1,(0,255,0),2)
-    cv2.putText(img,f"Dugum: {balonSistemi.aktifBalonSayisi()}",(10,60),cv2.FONT_HERSHEY_SIMPLEX, 1,(0,255,0),2)
+        gecen = time.perf_counter() - baslangic
+        print(f"\r{kareSayisi} kare | {kareSayisi / gecen:.1f} FPS | "
+              f"çıkarım {cikarimSuresi / kareSayisi * 1000:.1f} ms/kare", end="", flush=True)
     
-    cv2.imshow("Canli Takip", img)
-    if cv2.waitKey(1) & 0xFF == ord('q'):
-        break
+    gecen = time.perf_counter() - baslangic
+    print(f"\nToplam: {kareSayisi} kare, {gecen:.1f} s, {kareSayisi / (gecen + 1e-8):.1f} FPS (batch={batch})")
+    ozet = isleyici.ozet()
+    if ozet:
+        print(ozet)
+    cap.release()
+    if yazici:
+        yazici.release()
+    if izDosyasi:
+        izDosyasi.close()
 
-cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Balon takip sistemi")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Yakalama, tespit+takip ve çizimi ayrı thread'lerde çalıştır")
+    parser.add_argument("--surecler", action="store_true",
+                        help="Yakalama, çıkarım ve takibi ayrı süreçlerde çalıştır (kareler paylaşılan bellekte)")
+    parser.add_argument("--yuva-sayisi", type=int, default=4, help="--surecler modunda paylaşılan kare yuvası sayısı")
+    parser.add_argument("--maks-iz", type=int, default=3,
+                        help="Aynı anda takip edilecek en fazla balon sayısı")
+    parser.add_argument("--hareket-modeli", choices=sorted(IzDeposu.hareketModelleri), default="hiz",
+                        help="Tahmin modeli: hız ortalaması veya sabit hız/ivme Kalman filtresi")
+    parser.add_argument("--kayit", metavar="YOL",
+                        help="Detectionları YOL.det / YOL.idx dosyalarına kaydet (tekrar.py ile oynatılır)")
+    parser.add_argument("--basliksiz", action="store_true",
+                        help="Ekran yok: çizim ve pencere tamamen kapalı (çıkış için Ctrl+C)")
+    parser.add_argument("--cizim-hz", type=float, default=0, metavar="HZ",
+                        help="Ekranı saniyede en fazla HZ kez güncelle (0 = her kare)")
+    parser.add_argument("--ham-kayit", metavar="DOSYA",
+                        help="Ham kareleri arka planda videoya, iz durumunu DOSYA.csv'ye kaydet")
+    parser.add_argument("--cizim-kayit", metavar="DOSYA", help="Çizimli 'Canli Takip' çıktısını videoya kaydet")
+    parser.add_argument("--kayit-her", type=int, default=1, metavar="N", help="Video kaydında her N karede birini tut")
+    parser.add_argument("--kayit-tampon", type=int, default=8, metavar="N",
+                        help="Video kaydı tampon sayısı - dolunca en eski kare düşer")
+    parser.add_argument("--video", metavar="DOSYA",
+                        help="Kamera yerine video dosyası işle (toplu çıkarım, ekran yok)")
+    parser.add_argument("--batch", type=int, default=8, help="Video modunda model çağrısı başına kare")
+    parser.add_argument("--cikti", metavar="DOSYA", help="Video modunda çizimli çıktı videosu (.mp4)")
+    parser.add_argument("--iz-dosyasi", metavar="DOSYA", help="Video modunda kare başına iz CSV'si")
+    parser.add_argument("--roi", type=int, metavar="N", default=0,
+                        help="Tespiti iz bölgelerinde yap, her N karede bir tam kare (0 = kapalı)")
+    parser.add_argument("--karo", type=int, metavar="N", default=0,
+                        help="Yüksek çözünürlükte karo tespiti, karede en çok N karo (0 = kapalı)")
+    parser.add_argument("--cozunurluk", default="640x480", metavar="GxY",
+                        help="Kamera çözünürlüğü (karo modunda ör. 1920x1080)")
+    parser.add_argument("--hedef-fps", type=float, default=0,
+                        help="Kararlı kilitte detector'ı atlayıp bu çıkış hızını hedefle (0 = her kare tespit)")
+    parser.add_argument("--maks-kayma", type=int, default=3,
+                        help="Detector'sız art arda en fazla kare (--hedef-fps ile)")
+    parser.add_argument("--hareket-kapisi", type=float, default=0, metavar="SANIYE",
+                        help="Görüntüde hareket yokken detector'ı beklet, en geç SANIYE'de bir tara (0 = kapalı)")
+    parser.add_argument("--optik-akis", action="store_true",
+                        help="LK optik akışla kamera hareketini çıkar, atlanan/ıskalanan karelerde izleri akışla taşı")
+    parser.add_argument("--kayip-havuzu", type=int, default=0, metavar="N",
+                        help="Kaybolan son N izi renk imzasıyla sakla, geri gelen hedefe eski kimliği ver (0 = kapalı)")
+    parser.add_argument("--kayip-suresi", type=float, default=3.0, metavar="SANIYE",
+                        help="Kayıp iz havuzunda en uzun bekleme süresi")
+    parser.add_argument("--siniflar", type=int, nargs="+", metavar="SINIF",
+                        help="Yalnızca bu sınıf numaralarındaki detectionları takip et")
+    parser.add_argument("--model", default="best.pt",
+                        help="Model dosyası (.pt; onnxruntime/openvino için .onnx)")
+    parser.add_argument("--kamera", type=int, default=0, help="Kamera indeksi")
+    parser.add_argument("--kameralar", type=int, nargs="+", metavar="INDEKS",
+                        help="Çoklu kamera: her kameraya ayrı tracker, tek batch'li ortak çıkarım")
+    parser.add_argument("--arka-uc", choices=ARKA_UCLAR, default="ultralytics",
+                        help="Çıkarım arka ucu (dedektor.py disa-aktar / nicemle ile .onnx üretilir)")
+    parser.add_argument("--nisan", metavar="KANAL",
+                        help="HEAD nişan noktasını gönder: udp:HOST:PORT, seri:/dev/ttyUSB0[:BAUD] veya dongu")
+    parser.add_argument("--nisan-hz", type=float, default=100.0, help="Saniyede en fazla nişan paketi")
+    parser.add_argument("--nisan-iz", type=int, default=1, help="Pakette HEAD dahil iz sayısı")
+    parser.add_argument("--eyleyici-gecikmesi", type=float, default=0.0,
+                        help="Ölçülen gecikmeye eklenecek taret gecikmesi (s)")
+    parser.add_argument("--olcum-portu", type=int, metavar="PORT",
+                        help="Aşama gecikme yüzdeliklerini http://127.0.0.1:PORT/ adresinden sun")
+    parser.add_argument("--olcum-csv", metavar="DOSYA", help="Aşama gecikme yüzdeliklerini 5 sn'de bir CSV'ye ekle")
+    args = parser.parse_args()
+    if args.roi > 0 and args.karo > 0:
+        parser.error("--roi ve --karo birlikte kullanılamaz")
+    if args.surecler and (args.pipeline or args.roi or args.karo or args.hedef_fps or args.hareket_kapisi
+                          or args.kameralar or args.video):
+        parser.error("--surecler ile --pipeline, --roi, --karo, --hedef-fps, --hareket-kapisi, --kameralar "
+                     "ve --video kullanılamaz")
+    kaynaklar = args.kameralar or [args.kamera]
+    cokluKamera = len(kaynaklar) > 1
+    if cokluKamera and (args.pipeline or args.roi or args.karo or args.hedef_fps or args.hareket_kapisi
+                        or args.optik_akis or args.nisan or args.kayit or args.ham_kayit or args.cizim_kayit or args.video):
+        parser.error("--kameralar yalnızca --maks-iz, --hareket-modeli, --siniflar, --kayip-havuzu, --basliksiz, "
+                     "--cizim-hz ve ölçüm seçenekleriyle kullanılabilir")
+    kameraGenislik, kameraYukseklik = (int(v) for v in args.cozunurluk.lower().split("x"))
+    sureler = {"import": time.perf_counter() - BASLANGIC}
+    
+    if args.olcum_portu:
+        OLCUMLER.httpBaslat(args.olcum_portu)
+    if args.olcum_csv:
+        OLCUMLER.csvBaslat(args.olcum_csv)
+    
+    # Kameralar model yüklenirken paralel açılır (--surecler modunda ikisi de kendi süreçlerinde)
+    kamera = {}
+    kameraIsciler = []
+    if not args.video and not args.surecler:
+        def kameraAcIsci(kaynak):
+            t0 = time.perf_counter()
+            kamera[kaynak] = kameraAc(kaynak, kameraGenislik, kameraYukseklik)
+            sureler["kamera"] = max(sureler.get("kamera", 0.0), time.perf_counter() - t0)
+        kameraIsciler = [threading.Thread(target=kameraAcIsci, args=(kaynak,), name=f"kamera-ac-{kaynak}")
+                         for kaynak in kaynaklar]
+        for kameraIsci in kameraIsciler:
+            kameraIsci.start()
+    
+    # Model ve sistem
+    model = None
+    if not args.surecler:
+        t0 = time.perf_counter()
+        model = modelYukle(args.model, args.arka_uc)
+        sureler["model"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        # Isınma --cozunurluk boyutunda - kamera açılışıyla paralel kalsın diye istenen boyut kullanılır
+        modelIsit(model, kameraGenislik, kameraYukseklik,
+                  roiBoyutu=RoiTespitci.roiGirdiBoyutu if args.roi > 0 else None,
+                  batch=max(args.karo + 1, len(kaynaklar)))
+        sureler["isinma"] = time.perf_counter() - t0
+    for kameraIsci in kameraIsciler:
+        kameraIsci.join()
+    sureler["toplam"] = time.perf_counter() - BASLANGIC
+    print("Soğuk başlangıç: " + " | ".join(f"{ad} {sure * 1000:.0f} ms" for ad, sure in sureler.items()))
+    
+    kaydedici = TespitKaydedici(args.kayit) if args.kayit else None
+    suzgec = TespitSuzgeci(siniflar=args.siniflar)
+    
+    def kayipHavuzu():
+        """Her tracker kendi havuzunu alır"""
+        return KayipIzHavuzu(kapasite=args.kayip_havuzu, maksYas=args.kayip_suresi) if args.kayip_havuzu > 0 else None
+    
+    if args.video:
+        # Video zamanı ile çalışan tracker
+        saat = SimuleSaat()
+        balonSistemi = UltraKararliUcBalonSistemi(maksIz=args.maks_iz, hareketModeli=args.hareket_modeli,
+                                                  saat=saat, ayrintili=False, kayipHavuzu=kayipHavuzu())
+        isleyici = KareIsleyici(balonSistemi, model, suzgec, kaydedici)
+        videoIsle(args.video, isleyici, saat, args.batch, args.cikti, args.iz_dosyasi)
+        isleyici.kapat()
+        print(OLCUMLER.ozet())
+        raise SystemExit
+    
+    if cokluKamera:
+        akislar = []
+        for kaynak in kaynaklar:
+            cap, genislik, yukseklik = kamera[kaynak]
+            akislar.append(KameraAkisi(kaynak, cap, KareIsleyici(
+                UltraKararliUcBalonSistemi(maksIz=args.maks_iz, hareketModeli=args.hareket_modeli, ayrintili=False,
+                                           kayipHavuzu=kayipHavuzu()),
+                model, suzgec, cizici=Cizici(genislik, yukseklik, cizimHz=args.cizim_hz, basliksiz=args.basliksiz,
+                                             pencere=f"Canli Takip {kaynak}"),
+                olcumAdi=f"akis{kaynak}")))
+        try:
+            cokluKameraDongu(akislar, model)
+        except KeyboardInterrupt:
+            print("\nDurduruldu")
+        print(OLCUMLER.ozet())
+        for akis in akislar:
+            akis.cap.release()
+            akis.isleyici.kapat()
+        raise SystemExit
+    
+    if args.surecler:
+        cap, genislik, yukseklik = None, kameraGenislik, kameraYukseklik
+    else:
+        cap, genislik, yukseklik = kamera[kaynaklar[0]]
+    balonSistemi = UltraKararliUcBalonSistemi(maksIz=args.maks_iz, hareketModeli=args.hareket_modeli,
+                                              kayipHavuzu=kayipHavuzu())
+    roi = RoiTespitci(model, balonSistemi, tamKareAraligi=args.roi) if args.roi > 0 else None
+    if args.karo > 0:
+        roi = KaroTespitci(model, balonSistemi, maksKaro=args.karo)
+    zamanlayici = (TespitZamanlayici(hedefFps=args.hedef_fps, maksKayma=args.maks_kayma)
+                   if args.hedef_fps > 0 else None)
+    if args.hareket_kapisi > 0:
+        zamanlayici = HareketKapisi(maksAralik=args.hareket_kapisi, zamanlayici=zamanlayici)
+    nisan = (NisanCikisi(kanalAc(args.nisan), izSayisi=args.nisan_iz, hizSiniri=args.nisan_hz,
+                         ekGecikme=args.eyleyici_gecikmesi) if args.nisan else None)
+    
+    hamKayit, cizimKayit = (VideoKaydedici(yol, tamponSayisi=args.kayit_tampon, her=args.kayit_her) if yol else None
+                            for yol in (args.ham_kayit, args.cizim_kayit))
+    cizici = Cizici(genislik, yukseklik, cizimHz=args.cizim_hz, basliksiz=args.basliksiz, cizimKayit=cizimKayit)
+    optikAkis = OptikAkis() if args.optik_akis else None
+    isleyici = KareIsleyici(balonSistemi, model, suzgec, kaydedici, roi, zamanlayici, optikAkis, nisan, hamKayit,
+                            cizici)
+    
+    try:
+        if args.surecler:
+            surecliDongu(args.kamera, args.model, args.arka_uc, isleyici, genislik, yukseklik, args.yuva_sayisi)
+        elif args.pipeline:
+            pipelineDongu(cap, isleyici)
+        else:
+            senkronDongu(cap, isleyici)
+    except KeyboardInterrupt:
+        print("\nDurduruldu")
+    isleyici.kapat()
+    if kaydedici is not None:
+        print(f"Kayıt: {kaydedici.yazilan} kare yazıldı, {kaydedici.dusurulen} kare düşürüldü")
+    
+    print(OLCUMLER.ozet())
+    if cap is not None:
+        cap.release()
@@ -0,0 +1,182 @@
+"""Nişan noktası çıkışı - gecikme telafili, sabit boyutlu ikili paketler
+
+HEAD'in (istenirse sıradaki izlerin de) nişan noktası UDP, seri port veya
+testler için bellek içi döngü kanalına yazılır. Nişan noktası, yakalamadan
+gönderime kadar ölçülen gecikme (+ isteğe bağlı eyleyici gecikmesi) kadar
+izin hızıyla ileri taşınır.
+
+Paket (little-endian, boyut izSayisi ile sabit):
+    başlık  "BLN1" | sıra u32 | yakalama f64 | gönderim f64 | geçerli kayıt u8 | boş 3 bayt
+    kayıt   kimlik u32 | sıra u8 | boş 3 bayt | x f32 | y f32 | vx f32 | vy f32 | güven f32
+Kayıtlardaki sıra alanı izin sıralamadaki yeridir (0 = HEAD); kullanılmayan
+kayıtlar sıfırdır.
+
+Gönderim hiç bloklamaz: hız sınırını aşan çağrılar atlanır, kanal meşgulse
+paket düşürülür.
+"""
+import socket
+import struct
+import time
+from collections import deque
+
+BASLIK = struct.Struct("<4sIddB3x")
+KAYIT = struct.Struct("<IB3xfffff")
+SIHIR = b"BLN1"
+
+
+def paketBoyu(izSayisi):
+    return BASLIK.size + izSayisi * KAYIT.size
+
+
+def paketCoz(paket):
+    """Paketi (sıra, yakalama, gönderim, [(kimlik, sıra, x, y, vx, vy, güven)]) olarak çöz"""
+    sihir, sira, yakalama, gonderim, gecerli = BASLIK.unpack_from(paket)
+    if sihir != SIHIR:
+        raise ValueError("Tanınmayan nişan paketi")
+    kayitlar = [KAYIT.unpack_from(paket, BASLIK.size + i * KAYIT.size) for i in range(gecerli)]
+    return sira, yakalama, gonderim, kayitlar
+
+
+class UdpKanal:
+    """Bloklamayan UDP gönderici"""
+    def __init__(self, adres, port):
+        self.hedef = (adres, port)
+        self.soket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.soket.setblocking(False)
+
+    def gonder(self, paket):
+        try:
+            self.soket.sendto(paket, self.hedef)
+            return True
+        except (BlockingIOError, OSError):
+            return False
+
+    def kapat(self):
+        self.soket.close()
+
+
+class SeriKanal:
+    """Seri port gönderici (pyserial) - çıkış tamponu doluysa paket düşer
+
+    Bloklamayan yazma paketin yalnızca bir kısmını yazabilir. Akış sabit
+    boyutlu paketlerden oluştuğu için kalan kısım atılmaz (alıcı çerçeveyi
+    kaybederdi): saklanır ve sonraki çağrıda yeni paketten önce tamamlanır.
+    Böyle bir paket gönderilmiş sayılır (True), yalnızca yarimYazma'da
+    görünür. Kalan tamamlanamazsa yeni paket düşer.
+    """
+    def __init__(self, port, baud=115200):
+        import serial
+        self.port = serial.Serial(port, baud, timeout=0, write_timeout=0)
+        self._kalan = b""
+        self.yarimYazma = 0   # Kısmen yazılıp sonradan tamamlanan paketler
+
+    def _yaz(self, veri):
+        """Yazılabildiği kadarını yaz, yazılmayan kısmı döndür"""
+        import serial
+        try:
+            yazilan = self.port.write(veri) or 0
+        except serial.SerialTimeoutException:
+            yazilan = 0
+        return veri[yazilan:]
+
+    def gonder(self, paket):
+        if self._kalan:
+            self._kalan = self._yaz(self._kalan)
+            if self._kalan:
+                return False
+        kalan = self._yaz(bytes(paket))
+        if not kalan:
+            return True
+        if len(kalan) == len(paket):
+            return False
+        # Paketin başı gitti - çerçeve bozulmasın diye sonu sonra tamamlanır
+        self._kalan = kalan
+        self.yarimYazma += 1
+        return True
+
+    def kapat(self):
+        self.port.close()
+
+
+class DonguKanal:
+    """Bellek içi kanal - testlerde gerçek bağlantının yerine geçer"""
+    def __init__(self, kapasite=1024):
+        self.paketler = deque(maxlen=kapasite)
+
+    def gonder(self, paket):
+        self.paketler.append(bytes(paket))
+        return True
+
+    def oku(self):
+        return paketCoz(self.paketler.popleft()) if self.paketler else None
+
+    def kapat(self):
+        pass
+
+
+def kanalAc(tanim):
+    """'udp:HOST:PORT', 'seri:/dev/ttyUSB0[:BAUD]' veya 'dongu' tanımından kanal"""
+    tur, _, geri = tanim.partition(":")
+    if tur == "udp":
+        adres, _, port = geri.rpartition(":")
+        return UdpKanal(adres or "127.0.0.1", int(port))
+    if tur == "seri":
+        port, _, baud = geri.partition(":")
+        return SeriKanal(port, int(baud) if baud else 115200)
+    if tur == "dongu":
+        return DonguKanal()
+    raise ValueError(f"Bilinmeyen nişan kanalı: {tanim}")
+
+
+class NisanCikisi:
+    """Tracker durumundan nişan paketi üretip kanala yazar
+
+    izSayisi: pakette HEAD dahil kaç iz olacağı (1 = yalnızca HEAD)
+    hizSiniri: saniyede en fazla paket
+    ekGecikme: ölçülen gecikmeye eklenecek sabit eyleyici gecikmesi (s)
+    """
+    def __init__(self, kanal, izSayisi=1, hizSiniri=100.0, ekGecikme=0.0, saat=time.time):
+        self.kanal = kanal
+        self.izSayisi = izSayisi
+        self.minAralik = 1.0 / hizSiniri if hizSiniri > 0 else 0.0
+        self.ekGecikme = ekGecikme
+        self.saat = saat
+        self._tampon = bytearray(paketBoyu(izSayisi))
+        self._bos = bytes(len(self._tampon))
+        self._sonGonderim = float("-inf")
+        self.sira = 0
+        self.gonderilen = 0
+        self.atlanan = 0     # Hız sınırı
+        self.dusurulen = 0   # Kanal meşgul
+
+    def yayinla(self, balonSistemi, yakalamaZamani):
+        """Bu karenin nişan paketini gönder - gönderildiyse True"""
+        simdi = self.saat()
+        if simdi - self._sonGonderim < self.minAralik:
+            self.atlanan += 1
+            return False
+        ileri = simdi - yakalamaZamani + self.ekGecikme
+
+        tampon = self._tampon
+        tampon[:] = self._bos
+        gecerli = 0
+        for sira, balon in enumerate(balonSistemi.balonlar()[:self.izSayisi]):
+            if not balon.isValid(yakalamaZamani):
+                continue
+            x, y = balon.ortaNokta()
+            vx, vy = balon.hizVektoruX, balon.hizVektoruY
+            KAYIT.pack_into(tampon, BASLIK.size + gecerli * KAYIT.size, balon.kimlik, sira,
+                            x + vx * ileri, y + vy * ileri, vx, vy, balon.guvenSkoru)
+            gecerli += 1
+        BASLIK.pack_into(tampon, 0, SIHIR, self.sira & 0xFFFFFFFF, yakalamaZamani, simdi, gecerli)
+
+        self._sonGonderim = simdi
+        self.sira += 1
+        if self.kanal.gonder(tampon):
+            self.gonderilen += 1
+            return True
+        self.dusurulen += 1
+        return False
+
+    def ozet(self):
+        return f"Nişan çıkışı: {self.gonderilen} gönderildi, {self.atlanan} hız sınırı, {self.dusurulen} düşürüldü"
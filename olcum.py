@@ -0,0 +1,158 @@
+"""Aşama bazlı gecikme ölçümü - sabit bellekli kayan histogramlar
+
+Her aşama (yakalama, ön işleme, çıkarım, eşleştirme, bakım, çizim) için
+süreler logaritmik kovalı bir histograma eklenir. Histogram birkaç zaman
+dilimine bölünür; en eski dilim sıfırlanarak döner, böylece yüzdelikler son
+dilimSuresi * dilimSayisi saniyeyi yansıtır ve bellek sabit kalır.
+
+Kullanım:
+    with OLCUMLER.olc("eslestirme"):
+        ...
+    OLCUMLER.ekle("cikarim", sure)
+
+Değerler ozet() ile metin, csvBaslat() ile periyodik CSV, httpBaslat() ile
+yerel HTTP uç noktası (GET /) üzerinden okunur.
+"""
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+# Kova sınırları: 10 µs - 10 s, logaritmik (~%5 çözünürlük)
+KOVA_SINIRLARI = np.geomspace(1e-5, 10.0, 281)
+ASAMALAR = ("yakalama", "onisleme", "cikarim", "sonisleme", "eslestirme", "bakim", "periyodik", "cizim")
+
+
+class KayanHistogram:
+    """Son dilimSayisi x dilimSuresi saniyenin süre histogramı"""
+    def __init__(self, dilimSayisi=6, dilimSuresi=10.0, saat=time.monotonic):
+        self.dilimler = np.zeros((dilimSayisi, len(KOVA_SINIRLARI) + 1), dtype=np.int64)
+        self.dilimMaks = np.zeros(dilimSayisi)   # Dilim başına en büyük süre - pencereyle birlikte döner
+        self.dilimSuresi = dilimSuresi
+        self.saat = saat
+        self.dilim = 0
+        self.dilimBaslangici = saat()
+        self.toplamSayi = 0
+        self.enBuyuk = 0.0
+
+    def _dondur(self):
+        simdi = self.saat()
+        adim = int((simdi - self.dilimBaslangici) // self.dilimSuresi)
+        if adim <= 0:
+            return
+        for _ in range(min(adim, len(self.dilimler))):
+            self.dilim = (self.dilim + 1) % len(self.dilimler)
+            self.dilimler[self.dilim] = 0
+            self.dilimMaks[self.dilim] = 0.0
+        self.dilimBaslangici += adim * self.dilimSuresi
+
+    def ekle(self, sure):
+        self._dondur()
+        self.dilimler[self.dilim, np.searchsorted(KOVA_SINIRLARI, sure)] += 1
+        self.toplamSayi += 1
+        self.enBuyuk = max(self.enBuyuk, sure)
+        self.dilimMaks[self.dilim] = max(self.dilimMaks[self.dilim], sure)
+
+    def pencereMaks(self):
+        """Penceredeki en büyük süre (s)"""
+        self._dondur()
+        return float(self.dilimMaks.max())
+
+    def yuzdelikler(self, oranlar=(0.5, 0.95, 0.99)):
+        """Penceredeki örnek sayısı ve istenen yüzdelikler (s) - kova üst sınırı, pencere en büyüğüyle sınırlı"""
+        self._dondur()
+        sayilar = self.dilimler.sum(axis=0)
+        toplam = int(sayilar.sum())
+        if toplam == 0:
+            return 0, [0.0] * len(oranlar)
+        kumulatif = np.cumsum(sayilar)
+        kovalar = np.searchsorted(kumulatif, np.asarray(oranlar) * toplam)
+        sinirlar = np.append(KOVA_SINIRLARI, np.inf)
+        enBuyuk = self.dilimMaks.max()
+        return toplam, [float(min(sinirlar[k], enBuyuk)) for k in kovalar]
+
+
+class Olcumler:
+    """Aşama adı -> KayanHistogram, thread güvenli"""
+    def __init__(self, **histogramAyarlari):
+        self._kilit = threading.Lock()
+        self._histogramAyarlari = histogramAyarlari
+        self.histogramlar = {}
+        for asama in ASAMALAR:
+            self.histogramlar[asama] = KayanHistogram(**histogramAyarlari)
+
+    def ekle(self, asama, sure):
+        with self._kilit:
+            histogram = self.histogramlar.get(asama)
+            if histogram is None:
+                histogram = self.histogramlar[asama] = KayanHistogram(**self._histogramAyarlari)
+            histogram.ekle(sure)
+
+    @contextmanager
+    def olc(self, asama):
+        """with bloğunun süresini aşamaya ekle"""
+        baslangic = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.ekle(asama, time.perf_counter() - baslangic)
+
+    def satirlar(self):
+        """(aşama, sayı, p50, p95, p99, max) - süreler ms, hepsi kayan pencereden"""
+        with self._kilit:
+            sonuc = []
+            for asama, histogram in self.histogramlar.items():
+                sayi, (p50, p95, p99) = histogram.yuzdelikler()
+                sonuc.append((asama, sayi, p50 * 1000, p95 * 1000, p99 * 1000, histogram.pencereMaks() * 1000))
+            return sonuc
+
+    def ozet(self):
+        satirlar = [f"{'asama':<12}{'sayi':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for asama, sayi, p50, p95, p99, enBuyuk in self.satirlar():
+            satirlar.append(f"{asama:<12}{sayi:>8}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}{enBuyuk:>10.2f}")
+        return "\n".join(satirlar)
+
+    def csvBaslat(self, yol, aralik=5.0):
+        """Her aralik saniyede bir tüm aşamaları CSV'ye ekleyen arka plan thread'i"""
+        yeni = not os.path.exists(yol)
+
+        def yazici():
+            with open(yol, "a", newline="") as dosya:
+                yaz = csv.writer(dosya)
+                if yeni:
+                    yaz.writerow(["zaman", "asama", "sayi", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+                while True:
+                    time.sleep(aralik)
+                    zaman = f"{time.time():.3f}"
+                    for satir in self.satirlar():
+                        yaz.writerow([zaman, satir[0], satir[1]] + [f"{v:.3f}" for v in satir[2:]])
+                    dosya.flush()
+
+        threading.Thread(target=yazici, name="olcum-csv", daemon=True).start()
+
+    def httpBaslat(self, port, adres="127.0.0.1"):
+        """GET isteğine ozet() metnini dönen yerel HTTP sunucusu - sunucuyu döndürür"""
+        olcumler = self
+
+        class Isleyici(BaseHTTPRequestHandler):
+            def do_GET(self):
+                govde = olcumler.ozet().encode("utf-8") + b"\n"
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(govde)))
+                self.end_headers()
+                self.wfile.write(govde)
+
+            def log_message(self, *args):
+                pass
+
+        sunucu = ThreadingHTTPServer((adres, port), Isleyici)
+        threading.Thread(target=sunucu.serve_forever, name="olcum-http", daemon=True).start()
+        return sunucu
+
+
+OLCUMLER = Olcumler()
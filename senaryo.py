@@ -0,0 +1,101 @@
+"""Sentetik balon senaryoları - tracker'ı kamera ve model olmadan yüklemek için
+
+Hedefler sabit boyutlu kutulardır; yavaşça dönen hız vektörüyle hareket
+eder, kare kenarından seker (kalabalıkta yollar doğal olarak kesişir). Her
+karede kutu köşelerine Gauss gürültüsü eklenir, hedefler rastgele ıskalanır
+veya birkaç kare süren kesintiye girer, sahte tespitler (clutter) eklenir.
+
+Çıktı tekrar formatıdır: kare başına (zaman, satirlar, kimlikler), satirlar
+tumDetectionlariIsle'nin aldığı (n, 6) [x1,y1,x2,y2,conf,cls] float32,
+kimlikler gerçek hedef kimliği (-1 = sahte tespit). Aynı tohum her zaman
+aynı senaryoyu üretir.
+
+Çalıştırma:
+    python senaryo.py senaryo.npz [--hedef 10] [--kare 600] [--kacirma 0.1] [--sahte 0.5]
+    python tekrar.py senaryo.npz --maks-iz 10
+"""
+import argparse
+
+import numpy as np
+
+from tekrar import kayitKaydet
+
+
+def senaryoUret(hedefSayisi, kareSayisi=600, fps=30.0, genislik=640, yukseklik=480, hiz=80.0, donus=0.5,
+                boyut=(20, 60), gurultu=2.0, kacirma=0.1, kesinti=0.005, kesintiSuresi=(5, 20), sahte=0.5,
+                baslangic=1000.0, tohum=0):
+    """Senaryoyu (zaman, satirlar, kimlikler) listesi olarak üret
+
+    hiz: ortalama hedef hızı (piksel/s), hedef başına 0.5x - 1.5x
+    donus: hız yönünün saniyedeki rastgele dönüşü (radyan, std)
+    boyut: kutu kenarı aralığı (piksel)
+    gurultu: köşe koordinatlarındaki Gauss gürültüsü (piksel, std)
+    kacirma: hedefin tek bir karede tespit edilmeme olasılığı
+    kesinti: hedefin bir karede kesintiye (örtülme) girme olasılığı
+    kesintiSuresi: kesinti uzunluğu aralığı (kare)
+    sahte: kare başına ortalama sahte tespit sayısı (Poisson)
+    """
+    rng = np.random.default_rng(tohum)
+    kenar = rng.uniform(boyut[0], boyut[1], hedefSayisi)
+    yariKenar = kenar[:, None] / 2
+    enKucuk = yariKenar
+    enBuyuk = np.array([genislik, yukseklik]) - yariKenar
+    konum = rng.uniform(enKucuk, enBuyuk, (hedefSayisi, 2))
+    aci = rng.uniform(0, 2 * np.pi, hedefSayisi)
+    surat = hiz * rng.uniform(0.5, 1.5, hedefSayisi)
+    isaret = np.ones((hedefSayisi, 2))   # Kenardan sekme yönü
+    kalanKesinti = np.zeros(hedefSayisi, dtype=np.int64)
+    kimlikDizisi = np.arange(hedefSayisi)
+    dt = 1.0 / fps
+
+    kareler = []
+    for kare in range(kareSayisi):
+        aci += rng.normal(0, donus * np.sqrt(dt), hedefSayisi)
+        hizVektoru = isaret * np.stack((np.cos(aci), np.sin(aci)), axis=1) * surat[:, None]
+        konum += hizVektoru * dt
+        disari = (konum < enKucuk) | (konum > enBuyuk)
+        isaret[disari] *= -1
+        konum = np.clip(konum, enKucuk, enBuyuk)
+
+        # Kesintiler: yeni başlayanlar süre alır, devam edenler bir azalır
+        kalanKesinti = np.maximum(kalanKesinti - 1, 0)
+        yeni = (kalanKesinti == 0) & (rng.random(hedefSayisi) < kesinti)
+        kalanKesinti[yeni] = rng.integers(kesintiSuresi[0], kesintiSuresi[1] + 1, int(yeni.sum()))
+        gorunen = (kalanKesinti == 0) & (rng.random(hedefSayisi) >= kacirma)
+
+        kutular = np.concatenate((konum - yariKenar, konum + yariKenar), axis=1)[gorunen]
+        kutular += rng.normal(0, gurultu, kutular.shape)
+        guven = rng.uniform(0.5, 0.95, len(kutular))
+        gercek = np.column_stack((kutular, guven, np.zeros(len(kutular))))
+
+        sahteSayisi = rng.poisson(sahte)
+        sahteKenar = rng.uniform(boyut[0], boyut[1], (sahteSayisi, 1))
+        sahteMerkez = rng.uniform((0, 0), (genislik, yukseklik), (sahteSayisi, 2))
+        sahteSatirlar = np.column_stack((sahteMerkez - sahteKenar / 2, sahteMerkez + sahteKenar / 2,
+                                         rng.uniform(0.3, 0.7, sahteSayisi), np.zeros(sahteSayisi)))
+
+        # Tespit sırası modele bağlı değildir - karıştırılır
+        satirlar = np.concatenate((gercek, sahteSatirlar)).astype(np.float32)
+        kimlikler = np.concatenate((kimlikDizisi[gorunen], np.full(sahteSayisi, -1)))
+        sira = rng.permutation(len(satirlar))
+        kareler.append((baslangic + kare * dt, satirlar[sira], kimlikler[sira]))
+    return kareler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sentetik balon senaryosu üret (tekrar formatında .npz)")
+    parser.add_argument("cikti", help="Yazılacak .npz dosyası")
+    parser.add_argument("--hedef", type=int, default=3, help="Hedef sayısı")
+    parser.add_argument("--kare", type=int, default=600, help="Kare sayısı")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--gurultu", type=float, default=2.0, help="Köşe gürültüsü (piksel, std)")
+    parser.add_argument("--kacirma", type=float, default=0.1, help="Kare başına ıskalama olasılığı")
+    parser.add_argument("--kesinti", type=float, default=0.005, help="Kare başına kesintiye girme olasılığı")
+    parser.add_argument("--sahte", type=float, default=0.5, help="Kare başına ortalama sahte tespit")
+    parser.add_argument("--tohum", type=int, default=0)
+    args = parser.parse_args()
+
+    kareler = senaryoUret(args.hedef, args.kare, args.fps, gurultu=args.gurultu, kacirma=args.kacirma,
+                          kesinti=args.kesinti, sahte=args.sahte, tohum=args.tohum)
+    kayitKaydet(args.cikti, *zip(*kareler))
+    print(f"{args.cikti}: {len(kareler)} kare, {sum(len(satirlar) for _, satirlar, _ in kareler)} tespit")
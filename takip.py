@@ -0,0 +1,1373 @@
+"""Balon takip çekirdeği - yalnızca NumPy
+
+Kamera, model veya OpenCV gerektirmez; testler, tekrar oynatma ve diğer
+araçlar tracker'ı buradan içe aktarır. Canlı döngü main.py'dedir.
+"""
+import copy
+import math
+import time
+
+import numpy as np
+
+class SimuleSaat:
+    """Tracker'a enjekte edilen saat - zamanı çağıran döngü ilerletir"""
+    def __init__(self, baslangic=0.0):
+        self.zaman = baslangic
+
+    def __call__(self):
+        return self.zaman
+
+class IzDeposu:
+    """Structure-of-arrays iz deposu - tüm balonların durumu NumPy dizilerinde
+
+    Her iz bir satır indeksidir. Kimlik 0 olan satırlar boştur ve yeniden
+    kullanılır. Kapasite dolunca diziler iki katına büyütülür.
+
+    Güncellenen iz sayısı skalerSinir'dan azsa aynı hesap skaler yoldan
+    (guncelleTek) yürür: aynı dizilerin düz memoryview'larına eleman eleman
+    yazılır, NumPy çağrı yükü olmaz. Temsil tektir; yol her çağrıda seçilir.
+    """
+    kilitSuresi = 2.0   # 2 saniye kilitlenme süresi
+    maxMisses = 2       # Sadece 2 frame kaçırabilir
+    zamanAsimi = 2.0    # 2 saniye timeout
+    smoothing = 0.6     # Daha hızlı adaptasyon
+    gecmisBoyu = 8      # Daha fazla konum sakla - daha iyi hız hesabı
+    tahminZamani = 0.15 # 150ms ilerisini tahmin et
+    tahminCarpani = 40  # Daha agresif tahmin
+    skalerSinir = 20    # Bundan az iz güncelleniyorsa skaler yol (benchmarks/balon_guncelleme.py kesişimi)
+
+    # Skaler yolun eleman eriştiği diziler - _mv'de bu sırayla düz (1-D) memoryview
+    skalerAlanlar = ("kutular", "guven", "hiz", "tahmin", "toplamHits", "consecutiveHits",
+                     "consecutiveMisses", "stabilite", "sonGorulen", "konumZamani",
+                     "gecmis", "gecmisBas", "gecmisSayi", "farkToplami", "farkSayi")
+
+    # Kalman hareket modelleri: durum boyutu ve süreç gürültüsü (px^2/s^3 ve px^2/s^5)
+    hareketModelleri = {"hiz": 0, "kalman-cv": 4, "kalman-ca": 6}
+    surecGurultusu = {"kalman-cv": 1.2e4, "kalman-ca": 2.7e6}
+    olcumGurultusu = 25.0      # Detection merkezi varyansı (5 px std)
+    baslangicHizVaryansi = 300.0 ** 2
+    kapiEsigi = 9.21           # Mahalanobis^2 kapısı - 2 serbestlik derecesi, %99
+
+    def __init__(self, kapasite=8, hareketModeli="hiz", saat=time.time):
+        if hareketModeli not in self.hareketModelleri:
+            raise ValueError(f"Bilinmeyen hareket modeli: {hareketModeli}")
+        self.hareketModeli = hareketModeli
+        self.saat = saat  # Zaman damgası verilmeyen çağrılar için
+        self.kalmanBoyut = self.hareketModelleri[hareketModeli]
+        self.kapasite = 0
+        self.sonrakiKimlik = 1
+        self.kutular = np.zeros((0, 4), dtype=np.int64)  # X1, Y1, X2, Y2
+        self.guven = np.zeros(0)
+        self.hiz = np.zeros((0, 2))
+        self.tahmin = np.zeros((0, 2))                   # NaN = tahmin yok
+        self.toplamHits = np.zeros(0, dtype=np.int64)
+        self.consecutiveHits = np.zeros(0, dtype=np.int64)
+        self.consecutiveMisses = np.zeros(0, dtype=np.int64)
+        self.stabilite = np.zeros(0, dtype=np.int64)
+        self.olusturma = np.zeros(0)
+        self.sonGorulen = np.zeros(0)
+        self.konumZamani = np.zeros(0)                   # Kutunun ait olduğu zaman (kaydırmada ilerler)
+        self.kimlik = np.zeros(0, dtype=np.int64)        # 0 = boş satır
+
+        # Konum geçmişi halka tamponu: (x, y, t) + ardışık farkların toplamları
+        self.gecmis = np.zeros((0, self.gecmisBoyu, 3))
+        self.gecmisBas = np.zeros(0, dtype=np.int64)     # En eski kaydın yeri
+        self.gecmisSayi = np.zeros(0, dtype=np.int64)
+        self.farkToplami = np.zeros((0, 3))              # dt > 0 çiftlerin dx, dy, dt toplamı
+        self.farkSayi = np.zeros(0, dtype=np.int64)      # dt > 0 çift sayısı
+
+        # Kalman durumu [x, y, vx, vy(, ax, ay)], kovaryansı ve son tahmin zamanı
+        n = self.kalmanBoyut
+        self.kfDurum = np.zeros((0, n))
+        self.kfKovaryans = np.zeros((0, n, n))
+        self.kfZaman = np.zeros(0)
+        # Tek iz Kalman düzeltmesinin ara dizileri - güncelleme başına bellek ayrılmaz
+        self._kfSters = np.zeros((2, 2))
+        self._kfK = np.zeros((n, 2))
+        self._kfYenilik = np.zeros(2)
+        self._kfDuzeltme = np.zeros(n)
+        self._kfKP = np.zeros((n, n))
+        self.buyut(kapasite)
+
+    def buyut(self, kapasite):
+        """Dizileri yeni kapasiteye genişlet (mevcut satırlar korunur)"""
+        ek = kapasite - self.kapasite
+        if ek <= 0:
+            return
+        self.kutular = np.concatenate((self.kutular, np.zeros((ek, 4), dtype=np.int64)))
+        self.guven = np.concatenate((self.guven, np.zeros(ek)))
+        self.hiz = np.concatenate((self.hiz, np.zeros((ek, 2))))
+        self.tahmin = np.concatenate((self.tahmin, np.full((ek, 2), np.nan)))
+        for alan in ("toplamHits", "consecutiveHits", "consecutiveMisses", "stabilite", "kimlik"):
+            setattr(self, alan, np.concatenate((getattr(self, alan), np.zeros(ek, dtype=np.int64))))
+        self.olusturma = np.concatenate((self.olusturma, np.zeros(ek)))
+        self.sonGorulen = np.concatenate((self.sonGorulen, np.zeros(ek)))
+        self.konumZamani = np.concatenate((self.konumZamani, np.zeros(ek)))
+        self.gecmis = np.concatenate((self.gecmis, np.zeros((ek, self.gecmisBoyu, 3))))
+        self.gecmisBas = np.concatenate((self.gecmisBas, np.zeros(ek, dtype=np.int64)))
+        self.gecmisSayi = np.concatenate((self.gecmisSayi, np.zeros(ek, dtype=np.int64)))
+        self.farkToplami = np.concatenate((self.farkToplami, np.zeros((ek, 3))))
+        self.farkSayi = np.concatenate((self.farkSayi, np.zeros(ek, dtype=np.int64)))
+        n = self.kalmanBoyut
+        self.kfDurum = np.concatenate((self.kfDurum, np.zeros((ek, n))))
+        self.kfKovaryans = np.concatenate((self.kfKovaryans, np.zeros((ek, n, n))))
+        self.kfZaman = np.concatenate((self.kfZaman, np.zeros(ek)))
+        self.kapasite = kapasite
+        self.gorunumleriKur()
+
+    def gorunumleriKur(self):
+        """Skaler yolun memoryview'larını güncel dizilere bağla - diziler her değiştirildiğinde"""
+        self._mv = tuple(memoryview(getattr(self, alan).reshape(-1)) for alan in self.skalerAlanlar)
+
+    def kopya(self):
+        """Dizilerin bağımsız kopyası"""
+        yeni = copy.copy(self)
+        for alan, deger in vars(self).items():
+            if isinstance(deger, np.ndarray):
+                setattr(yeni, alan, deger.copy())
+        yeni.gorunumleriKur()
+        return yeni
+
+    def bosSatir(self):
+        """İlk boş satır - yoksa kapasite iki katına çıkar"""
+        bos = np.flatnonzero(self.kimlik == 0)
+        if len(bos) == 0:
+            indeks = self.kapasite
+            self.buyut(max(2 * self.kapasite, 1))
+            return indeks
+        return int(bos[0])
+
+    def ekle(self, X1, X2, Y1, Y2, guvenSkoru, simdi):
+        """Yeni iz ekle, satır indeksini döndür"""
+        indeks = self.bosSatir()
+
+        self.kutular[indeks] = (X1, Y1, X2, Y2)
+        self.guven[indeks] = guvenSkoru
+        self.hiz[indeks] = 0
+        self.tahmin[indeks] = np.nan
+        self.toplamHits[indeks] = 0
+        self.consecutiveHits[indeks] = 0
+        self.consecutiveMisses[indeks] = 0
+        self.stabilite[indeks] = 0
+        self.olusturma[indeks] = simdi
+        self.sonGorulen[indeks] = simdi
+        self.konumZamani[indeks] = simdi
+        self.kimlik[indeks] = self.sonrakiKimlik
+        self.sonrakiKimlik += 1
+
+        # İlk konumu kaydet
+        self.gecmisBas[indeks] = 0
+        self.gecmisSayi[indeks] = 1
+        self.gecmis[indeks, 0] = ((X1 + X2) // 2, (Y1 + Y2) // 2, simdi)
+        self.farkToplami[indeks] = 0
+        self.farkSayi[indeks] = 0
+
+        if self.kalmanBoyut:
+            self.kfDurum[indeks] = 0
+            self.kfDurum[indeks, :2] = self.gecmis[indeks, 0, :2]
+            varyans = np.full(self.kalmanBoyut, self.baslangicHizVaryansi)
+            varyans[:2] = self.olcumGurultusu
+            varyans[4:] = self.baslangicHizVaryansi * 10
+            self.kfKovaryans[indeks] = np.diag(varyans)
+            self.kfZaman[indeks] = simdi
+        return indeks
+
+    def sil(self, indeksler):
+        """İzleri boşalt - satırlar sonraki eklemelerde kullanılır"""
+        self.kimlik[indeksler] = 0
+
+    def satirAl(self, indeks):
+        """Bir izin tüm satır verisinin kopyası - geriYukle ile aynen geri yazılır"""
+        return {alan: deger[indeks].copy() for alan, deger in vars(self).items()
+                if isinstance(deger, np.ndarray) and len(deger) == self.kapasite}
+
+    def geriYukle(self, satir, X1, X2, Y1, Y2, guvenSkoru, simdi):
+        """Kaybolmuş izi kimliği, sayaçları ve geçmişiyle yeni detection üzerinde geri aç
+
+        Kutu (ve Kalman konumu) detectiona alınır, ardından normal bir
+        eşleşme gibi güncellenir: miss sıfırlanır, hit ve geçmiş devam eder.
+        """
+        indeks = self.bosSatir()
+        for alan, deger in satir.items():
+            getattr(self, alan)[indeks] = deger
+        self.kutular[indeks] = (X1, Y1, X2, Y2)
+        if self.kalmanBoyut:
+            self.kfDurum[indeks, :2] = ((X1 + X2) / 2, (Y1 + Y2) / 2)
+            self.kfZaman[indeks] = simdi
+        self.guncelleTek(indeks, X1, X2, Y1, Y2, guvenSkoru, simdi)
+        return indeks
+
+    def aktifIndeksler(self):
+        return np.flatnonzero(self.kimlik != 0)
+
+    def merkezler(self, indeksler):
+        kutular = self.kutular[indeksler]
+        return np.stack(((kutular[:, 0] + kutular[:, 2]) // 2,
+                         (kutular[:, 1] + kutular[:, 3]) // 2), axis=1)
+
+    def gecerliMaske(self, simdi):
+        """Daha esnek geçerlilik kontrolü - tüm satırlar için"""
+        return ((self.kimlik != 0) &
+                (self.consecutiveMisses < self.maxMisses) &
+                (self.guven >= 30) &                           # Çok düşük threshold
+                (simdi - self.sonGorulen <= self.zamanAsimi))
+
+    def kilitliMaske(self, simdi):
+        """İlk birkaç saniye veya 15+ hit - değiştirilmemeli"""
+        return (simdi - self.olusturma < self.kilitSuresi) | (self.toplamHits > 15)
+
+    def kalitePuanlari(self, simdi):
+        """Toplam kalite puanı - tüm satırlar için"""
+        zamanBonus = np.minimum(self.toplamHits * 2, 50)  # Uzun süre tracking bonusu
+        guvenBonus = np.maximum(0, self.guven - 50)
+        kilitBonus = np.where(self.kilitliMaske(simdi), 100, 0)
+        return zamanBonus + self.stabilite + guvenBonus + kilitBonus
+
+    def guncelle(self, indeksler, kutular, guvenSkorlari, simdi):
+        """Eşleşen izleri toptan güncelle - EMA smoothing + sayaçlar"""
+        if len(indeksler) < self.skalerSinir:
+            # Az iz için NumPy çağrı yükü hesaptan pahalı - aynı hesap skaler yolda
+            for indeks, (X1, Y1, X2, Y2), guvenSkoru in zip(np.asarray(indeksler).tolist(),
+                                                            np.asarray(kutular).tolist(),
+                                                            np.asarray(guvenSkorlari).tolist()):
+                self.guncelleTek(indeks, X1, X2, Y1, Y2, guvenSkoru, simdi)
+            return
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        s = self.smoothing
+        self.kutular[indeksler] = (self.kutular[indeksler] * s + kutular * (1 - s)).astype(np.int64)
+
+        # Güven skoru daha hızlı değişir
+        self.guven[indeksler] = np.maximum(self.guven[indeksler] * 0.8 + guvenSkorlari * 0.2, guvenSkorlari)
+        self.sonGorulen[indeksler] = simdi
+        self.konumZamani[indeksler] = simdi
+
+        # Hit sayaçları
+        self.consecutiveHits[indeksler] += 1
+        self.consecutiveMisses[indeksler] = 0
+        self.toplamHits[indeksler] += 1
+
+        # Stabilite skoru artır
+        self.stabilite[indeksler] = np.minimum(self.stabilite[indeksler] + 1, 100)
+
+        if self.kalmanBoyut:
+            self.kalmanGuncelle(indeksler, np.stack(((kutular[:, 0] + kutular[:, 2]) / 2,
+                                                     (kutular[:, 1] + kutular[:, 3]) / 2), axis=1))
+        self.hizVektoruGuncelle(indeksler, simdi)
+
+    def guncelleTek(self, indeks, X1, X2, Y1, Y2, guvenSkoru, simdi):
+        """Tek iz güncellemesi - guncelle + hizVektoruGuncelle ile aynı hesap, skaler değerlerle
+
+        Aynı dizilere düz memoryview'lar üzerinden eleman eleman yazılır.
+        """
+        kutu, guven, hiz, tahmin, toplamHits, consecutiveHits, consecutiveMisses, stabilite, sonGorulen, \
+            konumZamani, gecmis, gecmisBas, gecmisSayi, farkToplami, farkSayi = self._mv
+        k = 4 * indeks
+        s = self.smoothing
+        t = 1 - s
+        yeniX1 = int(kutu[k] * s + X1 * t)
+        yeniY1 = int(kutu[k + 1] * s + Y1 * t)
+        yeniX2 = int(kutu[k + 2] * s + X2 * t)
+        yeniY2 = int(kutu[k + 3] * s + Y2 * t)
+        if self.kalmanBoyut:
+            # Boyut EMA ile kalır, merkez filtrelenmiş konuma taşınır (kutulariTasi ile aynı)
+            merkezX, merkezY, hiz[2 * indeks], hiz[2 * indeks + 1] = self.kalmanGuncelleTek(
+                indeks, (X1 + X2) / 2, (Y1 + Y2) / 2)
+            yariGenislik, yariYukseklik = (yeniX2 - yeniX1) // 2, (yeniY2 - yeniY1) // 2
+            merkezX, merkezY = round(merkezX), round(merkezY)
+            yeniX1, yeniY1 = merkezX - yariGenislik, merkezY - yariYukseklik
+            yeniX2, yeniY2 = merkezX + yariGenislik, merkezY + yariYukseklik
+        kutu[k] = yeniX1
+        kutu[k + 1] = yeniY1
+        kutu[k + 2] = yeniX2
+        kutu[k + 3] = yeniY2
+
+        # Güven skoru daha hızlı değişir
+        yeniGuven = guven[indeks] * 0.8 + guvenSkoru * 0.2
+        guven[indeks] = yeniGuven if yeniGuven > guvenSkoru else guvenSkoru
+        sonGorulen[indeks] = simdi
+        konumZamani[indeks] = simdi
+
+        # Hit sayaçları + stabilite
+        consecutiveHits[indeks] += 1
+        consecutiveMisses[indeks] = 0
+        toplamHits[indeks] += 1
+        eski = stabilite[indeks]
+        stabilite[indeks] = eski + 1 if eski < 100 else 100
+
+        # Halka tamponu: son kayıtla yeni nokta arasındaki çift eklenir, tampon doluysa en eski çift düşer
+        merkezX, merkezY = (yeniX1 + yeniX2) // 2, (yeniY1 + yeniY2) // 2
+        boy = self.gecmisBoyu
+        satir = 3 * boy * indeks
+        bas, sayi = gecmisBas[indeks], gecmisSayi[indeks]
+        f = 3 * indeks
+        toplamX, toplamY, toplamT, ciftSayisi = farkToplami[f], farkToplami[f + 1], farkToplami[f + 2], farkSayi[indeks]
+        son = satir + 3 * ((bas + sayi - 1) % boy)
+        dt = simdi - gecmis[son + 2]
+        if sayi > 0 and dt > 0:
+            toplamX += merkezX - gecmis[son]
+            toplamY += merkezY - gecmis[son + 1]
+            toplamT += dt
+            ciftSayisi += 1
+        if sayi >= boy:
+            yer = satir + 3 * bas
+            sonraki = satir + 3 * ((bas + 1) % boy)
+            dt = gecmis[sonraki + 2] - gecmis[yer + 2]
+            if dt > 0:
+                toplamX -= gecmis[sonraki] - gecmis[yer]
+                toplamY -= gecmis[sonraki + 1] - gecmis[yer + 1]
+                toplamT -= dt
+                ciftSayisi -= 1
+            gecmisBas[indeks] = (bas + 1) % boy
+        else:
+            yer = satir + 3 * ((bas + sayi) % boy)
+            sayi += 1
+            gecmisSayi[indeks] = sayi
+        gecmis[yer] = merkezX
+        gecmis[yer + 1] = merkezY
+        gecmis[yer + 2] = simdi
+        farkToplami[f] = toplamX
+        farkToplami[f + 1] = toplamY
+        farkToplami[f + 2] = toplamT
+        farkSayi[indeks] = ciftSayisi
+
+        # Ortalama hız ve tahmin (Kalman modunda hız/tahmin filtreden gelir)
+        if not self.kalmanBoyut and sayi >= 3 and ciftSayisi > 0 and toplamT > 0:
+            hizX, hizY = toplamX / toplamT, toplamY / toplamT
+            hiz[2 * indeks] = hizX
+            hiz[2 * indeks + 1] = hizY
+            tahmin[2 * indeks] = merkezX + hizX * self.tahminZamani * self.tahminCarpani
+            tahmin[2 * indeks + 1] = merkezY + hizY * self.tahminZamani * self.tahminCarpani
+
+    def missedFrame(self, indeksler):
+        """Frame kaçırıldığında - çok yavaş düşürme"""
+        self.consecutiveMisses[indeksler] += 1
+        self.consecutiveHits[indeksler] = 0
+        # Güven skorunu çok az düşür
+        self.guven[indeksler] *= 0.95
+        # Stabilite skorunu düşür
+        self.stabilite[indeksler] = np.maximum(0, self.stabilite[indeksler] - 2)
+
+    def gecmisSirali(self, indeks):
+        """Bir izin konum geçmişi - eskiden yeniye (x, y, t) satırları"""
+        sira = (self.gecmisBas[indeks] + np.arange(self.gecmisSayi[indeks])) % self.gecmisBoyu
+        return self.gecmis[indeks, sira]
+
+    def hizVektoruGuncelle(self, indeksler, simdi):
+        """Gelişmiş hız hesaplama ve tahmin - iz başına O(1)
+
+        Hız, geçmişteki ardışık (dt > 0) farkların toplamından gelir. Toplamlar
+        halka tamponuna eklenen/çıkan çiftle güncellenir, geçmiş yeniden taranmaz.
+        """
+        boy = self.gecmisBoyu
+        kutular = self.kutular[indeksler]
+        yeni = np.empty((len(indeksler), 3))
+        yeni[:, 0] = (kutular[:, 0] + kutular[:, 2]) // 2
+        yeni[:, 1] = (kutular[:, 1] + kutular[:, 3]) // 2
+        yeni[:, 2] = simdi
+
+        bas = self.gecmisBas[indeksler]
+        sayi = self.gecmisSayi[indeksler]
+
+        # Son kayıt ile yeni nokta arasındaki çift eklenir
+        son = self.gecmis[indeksler, (bas + sayi - 1) % boy]
+        fark = yeni - son
+        gecerli = (sayi > 0) & (fark[:, 2] > 0)
+        self.farkToplami[indeksler] += np.where(gecerli[:, None], fark, 0.0)
+        self.farkSayi[indeksler] += gecerli
+
+        # Tampon doluysa en eski kayıt ile sonraki arasındaki çift düşer
+        dolu = sayi >= boy
+        cikan = self.gecmis[indeksler, (bas + 1) % boy] - self.gecmis[indeksler, bas]
+        cikanGecerli = dolu & (cikan[:, 2] > 0)
+        self.farkToplami[indeksler] -= np.where(cikanGecerli[:, None], cikan, 0.0)
+        self.farkSayi[indeksler] -= cikanGecerli
+
+        self.gecmis[indeksler, (bas + sayi) % boy] = yeni
+        self.gecmisBas[indeksler] = np.where(dolu, (bas + 1) % boy, bas)
+        self.gecmisSayi[indeksler] = np.minimum(sayi + 1, boy)
+
+        # Çoklu nokta kullanarak daha stabil hız hesapla
+        if self.kalmanBoyut:
+            return  # Hız ve tahmin Kalman filtresinden gelir
+        toplam = self.farkToplami[indeksler]
+        hesapla = (self.gecmisSayi[indeksler] >= 3) & (self.farkSayi[indeksler] > 0) & (toplam[:, 2] > 0)
+        if not hesapla.any():
+            return
+        hedef = indeksler[hesapla]
+
+        # Ortalama hız
+        hiz = toplam[hesapla, :2] / toplam[hesapla, 2:3]
+        self.hiz[hedef] = hiz
+
+        # Daha uzun tahmin süresi - gelecekteki konumu daha iyi tahmin et
+        self.tahmin[hedef] = yeni[hesapla, :2] + hiz * self.tahminZamani * self.tahminCarpani
+
+    def kalmanMatrisleri(self, dt):
+        """İz başına geçiş (F) ve süreç gürültüsü (Q) matrisleri - (k, n, n)
+
+        Eksen başına m türevli blok kurulur (CV: m=2, CA: m=3), en yüksek
+        türev sürekli beyaz gürültü alır. kron(blok, I2) ile [x, y, vx, vy, ...]
+        sırasına açılır.
+        """
+        m = self.kalmanBoyut // 2
+        faktoriyel = np.array([1.0, 1.0, 2.0])
+        dt = np.asarray(dt, dtype=np.float64)[:, None, None]
+
+        # F: j >= i için dt^(j-i) / (j-i)!
+        fark = np.arange(m)[None, :] - np.arange(m)[:, None]
+        us = np.maximum(fark, 0)
+        Fe = np.where(fark >= 0, dt ** us / faktoriyel[us], 0.0)
+
+        # Q: dt^(2m-1-i-j) / ((m-1-i)! (m-1-j)! (2m-1-i-j))
+        kalan = m - 1 - np.arange(m)
+        usQ = kalan[:, None] + kalan[None, :] + 1
+        Qe = dt ** usQ / (faktoriyel[kalan][:, None] * faktoriyel[kalan][None, :] * usQ)
+        Qe = Qe * self.surecGurultusu[self.hareketModeli]
+
+        n = self.kalmanBoyut
+        I2 = np.eye(2)
+        F = np.einsum("kab,ij->kaibj", Fe, I2).reshape(-1, n, n)
+        Q = np.einsum("kab,ij->kaibj", Qe, I2).reshape(-1, n, n)
+        return F, Q
+
+    def tahminEt(self, indeksler, simdi):
+        """Kalman tahmin adımı - detection olsun olmasın her kare çağrılır
+
+        Tahmin edilen konum ve hız tahmin/hiz dizilerine yazılır; kaçırılan
+        karelerde de hedef ilerlemeye devam eder. 'hiz' modelinde etkisizdir.
+        """
+        if not self.kalmanBoyut or len(indeksler) == 0:
+            return
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        dt = simdi - self.kfZaman[indeksler]
+        ilerle = dt > 0
+        indeksler, dt = indeksler[ilerle], dt[ilerle]
+        if len(indeksler) == 0:
+            return
+
+        F, Q = self.kalmanMatrisleri(dt)
+        self.kfDurum[indeksler] = np.einsum("kij,kj->ki", F, self.kfDurum[indeksler])
+        self.kfKovaryans[indeksler] = F @ self.kfKovaryans[indeksler] @ F.transpose(0, 2, 1) + Q
+        self.kfZaman[indeksler] = simdi
+        self.tahmin[indeksler] = self.kfDurum[indeksler, :2]
+        self.hiz[indeksler] = self.kfDurum[indeksler, 2:4]
+
+    def yenilikKovaryansi(self, indeksler):
+        """S = H P H^T + R - konum ölçümü için (k, 2, 2)"""
+        return self.kfKovaryans[indeksler, :2, :2] + self.olcumGurultusu * np.eye(2)
+
+    def kalmanGuncelleTek(self, indeks, olcumX, olcumY):
+        """Tek iz Kalman düzeltmesi - kalmanGuncelle ile aynı hesap, ara diziler önceden ayrılmış
+
+        S 2x2 olduğu için tersi kapalı formdadır. Filtrelenmiş merkezi ve hızı
+        döndürür; kutuyu taşımak ve hızı yazmak çağırana kalır.
+        """
+        P = self.kfKovaryans[indeks]
+        durum = self.kfDurum[indeks]
+        a = P.item(0, 0) + self.olcumGurultusu
+        b = P.item(0, 1)
+        d = P.item(1, 1) + self.olcumGurultusu
+        belirleyici = a * d - b * b
+        Sters = self._kfSters
+        Sters[0, 0], Sters[0, 1], Sters[1, 0], Sters[1, 1] = (d / belirleyici, -b / belirleyici,
+                                                              -b / belirleyici, a / belirleyici)
+        K = np.matmul(P[:, :2], Sters, out=self._kfK)
+        yenilik = self._kfYenilik
+        yenilik[0], yenilik[1] = olcumX - durum.item(0), olcumY - durum.item(1)
+        durum += np.matmul(K, yenilik, out=self._kfDuzeltme)
+        P -= np.matmul(K, P[:2], out=self._kfKP)
+        return durum.item(0), durum.item(1), durum.item(2), durum.item(3)
+
+    def kalmanGuncelle(self, indeksler, olcumler):
+        """Kalman düzeltme adımı - ölçüm: detection merkezi
+
+        Kutunun boyutu EMA ile kalır, merkezi filtrelenmiş konuma taşınır.
+        """
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        P = self.kfKovaryans[indeksler]
+        S = self.yenilikKovaryansi(indeksler)
+        K = P[:, :, :2] @ np.linalg.inv(S)                      # (k, n, 2)
+        yenilik = olcumler - self.kfDurum[indeksler, :2]
+        self.kfDurum[indeksler] += np.einsum("kij,kj->ki", K, yenilik)
+        self.kfKovaryans[indeksler] = P - K @ P[:, :2, :]
+        self.hiz[indeksler] = self.kfDurum[indeksler, 2:4]
+        self.kutulariTasi(indeksler, self.kfDurum[indeksler, :2])
+
+    def kutulariTasi(self, indeksler, merkezler):
+        """Kutuları boyutu koruyarak verilen merkezlere taşı"""
+        kutular = self.kutular[indeksler]
+        yariGenislik = (kutular[:, 2] - kutular[:, 0]) // 2
+        yariYukseklik = (kutular[:, 3] - kutular[:, 1]) // 2
+        merkez = np.rint(merkezler).astype(np.int64)
+        self.kutular[indeksler] = np.stack((merkez[:, 0] - yariGenislik, merkez[:, 1] - yariYukseklik,
+                                            merkez[:, 0] + yariGenislik, merkez[:, 1] + yariYukseklik), axis=1)
+
+    def kaydir(self, indeksler, simdi):
+        """Detection çalışmayan karede izleri hareket modeliyle ilerlet
+
+        Miss sayılmaz, sayaçlar ve geçmiş değişmez; yalnızca kutu (ve tahmin)
+        modelin verdiği konuma taşınır.
+        """
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        if len(indeksler) == 0:
+            return
+        if self.kalmanBoyut:
+            self.tahminEt(indeksler, simdi)
+            self.kutulariTasi(indeksler, self.kfDurum[indeksler, :2])
+        else:
+            dt = simdi - self.konumZamani[indeksler]
+            kayma = self.hiz[indeksler] * dt[:, None]
+            # Piksel altı kayma birikir: kutu kımıldamadıysa zaman ilerletilmez
+            kimildadi = (np.abs(np.rint(kayma)) >= 1).any(axis=1)
+            indeksler, kayma = indeksler[kimildadi], kayma[kimildadi]
+            if len(indeksler) == 0:
+                return
+            kutular = self.kutular[indeksler]
+            self.kutulariTasi(indeksler, (kutular[:, :2] + kutular[:, 2:]) / 2 + kayma)
+            hedef = indeksler[~np.isnan(self.tahmin[indeksler, 0])]
+            self.tahmin[hedef] = (self.merkezler(hedef)
+                                  + self.hiz[hedef] * self.tahminZamani * self.tahminCarpani)
+        self.konumZamani[indeksler] = simdi
+
+    def egoKaydir(self, kayma):
+        """Kamera hareketi: tüm aktif izleri aynı tamsayı piksel kaymasıyla yeni kare koordinatlarına taşı
+
+        Kutu, konum geçmişi, tahmin ve Kalman konumu birlikte kaydığı için
+        geçmişten hesaplanan hız kamera hareketinden arınmış olur.
+        """
+        aktif = self.aktifIndeksler()
+        if len(aktif) == 0:
+            return
+        kayma = np.asarray(kayma, dtype=np.int64)
+        self.kutular[aktif] += np.tile(kayma, 2)
+        self.gecmis[aktif, :, :2] += kayma
+        self.tahmin[aktif] += kayma
+        if self.kalmanBoyut:
+            self.kfDurum[aktif, :2] += kayma
+
+    def akisIleTasi(self, indeksler, kaymalar, simdi):
+        """Optik akışın ölçtüğü (kamera hareketi çıkarılmış) tamsayı kaymalarla izleri taşı
+
+        Detection olmadan konum güncellemesi: miss ve sayaçlar değişmez.
+        Kalman modunda durum bu kareye ilerletilir, konum akışın verdiği
+        konumla değiştirilir.
+        """
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        if len(indeksler) == 0:
+            return
+        kaymalar = np.asarray(kaymalar, dtype=np.int64).reshape(-1, 2)
+        self.kutular[indeksler] += np.tile(kaymalar, 2)
+        if self.kalmanBoyut:
+            self.tahminEt(indeksler, simdi)
+            self.kfDurum[indeksler, :2] = (self.kutular[indeksler, :2] + self.kutular[indeksler, 2:]) / 2
+            self.tahmin[indeksler] = self.kfDurum[indeksler, :2]
+        else:
+            hedef = indeksler[~np.isnan(self.tahmin[indeksler, 0])]
+            self.tahmin[hedef] = (self.merkezler(hedef)
+                                  + self.hiz[hedef] * self.tahminZamani * self.tahminCarpani)
+        self.konumZamani[indeksler] = simdi
+
+class Balon:
+    """Ultra kararlı balon düğümü - IzDeposu satırına bakan görünüm
+
+    Durum depoda tutulur; bu nesne sadece (depo, indeks) çiftidir. Tek başına
+    oluşturulursa kendi tek satırlık deposunu açar. Zaman alan metotlar
+    kare zaman damgasını (simdi) alır, verilmezse saate bakılır.
+    """
+    __slots__ = ("depo", "indeks", "kimlik", "tip")
+
+    def __init__(self, X1, X2, Y1, Y2, guvenSkoru, tip="HEAD", depo=None, indeks=None, simdi=None):
+        if depo is None:
+            depo = IzDeposu(1)
+            indeks = depo.ekle(X1, X2, Y1, Y2, guvenSkoru, depo.saat() if simdi is None else simdi)
+        self.depo = depo
+        self.indeks = indeks
+        self.kimlik = int(depo.kimlik[indeks])
+        self.tip = tip
+
+    @classmethod
+    def gorunum(cls, depo, indeks, tip):
+        """Depodaki mevcut bir ize görünüm aç"""
+        return cls(None, None, None, None, None, tip, depo, int(indeks))
+
+    X1 = property(lambda self: int(self.depo.kutular[self.indeks, 0]))
+    Y1 = property(lambda self: int(self.depo.kutular[self.indeks, 1]))
+    X2 = property(lambda self: int(self.depo.kutular[self.indeks, 2]))
+    Y2 = property(lambda self: int(self.depo.kutular[self.indeks, 3]))
+    guvenSkoru = property(lambda self: float(self.depo.guven[self.indeks]))
+    hizVektoruX = property(lambda self: float(self.depo.hiz[self.indeks, 0]))
+    hizVektoruY = property(lambda self: float(self.depo.hiz[self.indeks, 1]))
+    toplameHits = property(lambda self: int(self.depo.toplamHits[self.indeks]))
+    stabiliteSkoru = property(lambda self: int(self.depo.stabilite[self.indeks]))
+    consecutiveHits = property(lambda self: int(self.depo.consecutiveHits[self.indeks]))
+    consecutiveMisses = property(lambda self: int(self.depo.consecutiveMisses[self.indeks]))
+    olusturulmaZamani = property(lambda self: float(self.depo.olusturma[self.indeks]))
+    sonGorulen = property(lambda self: float(self.depo.sonGorulen[self.indeks]))
+    oncekiKonumlar = property(lambda self: self.depo.gecmisSirali(self.indeks))
+
+    @property
+    def tahminEdilenX(self):
+        deger = self.depo.tahmin[self.indeks, 0]
+        return None if np.isnan(deger) else float(deger)
+
+    @property
+    def tahminEdilenY(self):
+        deger = self.depo.tahmin[self.indeks, 1]
+        return None if np.isnan(deger) else float(deger)
+
+    def ortaNokta(self):
+        """Balonun merkez koordinatı"""
+        return (self.X1 + self.X2) // 2, (self.Y1 + self.Y2) // 2
+
+    def mesafe(self, digerBalon):
+        """İki balon arasındaki mesafe"""
+        x1, y1 = self.ortaNokta()
+        x2, y2 = digerBalon.ortaNokta()
+        return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+
+    def isLocked(self, simdi=None):
+        """Bu balon kilitli mi? (İlk birkaç saniye değiştirilmemeli)"""
+        gecenSure = (self.depo.saat() if simdi is None else simdi) - self.olusturulmaZamani
+        return gecenSure < self.depo.kilitSuresi or self.toplameHits > 15
+
+    def guncelle(self, X1, X2, Y1, Y2, guvenSkoru, simdi=None):
+        """Daha responsive güncelleme"""
+        self.depo.guncelleTek(self.indeks, X1, X2, Y1, Y2, guvenSkoru,
+                              self.depo.saat() if simdi is None else simdi)
+
+    def missedFrame(self):
+        """Frame kaçırıldığında - çok yavaş düşürme"""
+        self.depo.missedFrame([self.indeks])
+
+    def gecenSure(self, simdi=None):
+        """Son görülmeden geçen süre"""
+        return (self.depo.saat() if simdi is None else simdi) - self.sonGorulen
+
+    def kalitePuani(self, simdi=None):
+        """Bu balonun toplam kalite puanı"""
+        return float(self.depo.kalitePuanlari(self.depo.saat() if simdi is None else simdi)[self.indeks])
+
+    def isValid(self, simdi=None):
+        """Daha esnek geçerlilik kontrolü - silinen/yeniden kullanılan satır geçersiz"""
+        if self.depo.kimlik[self.indeks] != self.kimlik:
+            return False
+        return bool(self.depo.gecerliMaske(self.depo.saat() if simdi is None else simdi)[self.indeks])
+
+def iouMatrisi(kutular1, kutular2):
+    """Vektörize IoU - (N,4) x (M,4) kutu dizileri için (N,M) matris"""
+    kutular1 = np.asarray(kutular1, dtype=np.float64).reshape(-1, 4)
+    kutular2 = np.asarray(kutular2, dtype=np.float64).reshape(-1, 4)
+    
+    kesisimX1 = np.maximum(kutular1[:, None, 0], kutular2[None, :, 0])
+    kesisimY1 = np.maximum(kutular1[:, None, 1], kutular2[None, :, 1])
+    kesisimX2 = np.minimum(kutular1[:, None, 2], kutular2[None, :, 2])
+    kesisimY2 = np.minimum(kutular1[:, None, 3], kutular2[None, :, 3])
+    
+    kesisimAlani = np.clip(kesisimX2 - kesisimX1, 0, None) * np.clip(kesisimY2 - kesisimY1, 0, None)
+    alan1 = (kutular1[:, 2] - kutular1[:, 0]) * (kutular1[:, 3] - kutular1[:, 1])
+    alan2 = (kutular2[:, 2] - kutular2[:, 0]) * (kutular2[:, 3] - kutular2[:, 1])
+    birlesimAlani = alan1[:, None] + alan2[None, :] - kesisimAlani
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(birlesimAlani > 0, kesisimAlani / birlesimAlani, 0.0)
+
+def iouCiftleri(kutular1, kutular2):
+    """Eleman eleman IoU - (P,4) ve (P,4) kutu çiftleri için (P,)"""
+    kutular1 = np.asarray(kutular1, dtype=np.float64).reshape(-1, 4)
+    kutular2 = np.asarray(kutular2, dtype=np.float64).reshape(-1, 4)
+    kesisimGenislik = np.clip(np.minimum(kutular1[:, 2], kutular2[:, 2]) - np.maximum(kutular1[:, 0], kutular2[:, 0]), 0, None)
+    kesisimYukseklik = np.clip(np.minimum(kutular1[:, 3], kutular2[:, 3]) - np.maximum(kutular1[:, 1], kutular2[:, 1]), 0, None)
+    kesisimAlani = kesisimGenislik * kesisimYukseklik
+    alan1 = (kutular1[:, 2] - kutular1[:, 0]) * (kutular1[:, 3] - kutular1[:, 1])
+    alan2 = (kutular2[:, 2] - kutular2[:, 0]) * (kutular2[:, 3] - kutular2[:, 1])
+    birlesimAlani = alan1 + alan2 - kesisimAlani
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(birlesimAlani > 0, kesisimAlani / birlesimAlani, 0.0)
+
+def seyrekAtama(satirSira, sutunSira, skorlar):
+    """Seyrek çiftlerde maksimum toplam skorlu atama - (satır, sütun) çiftleri
+
+    Çiftlerin oluşturduğu iki parçalı çizge bağlı bileşenlere ayrılır, her
+    bileşen kendi küçük matrisinde çözülür. Birbirinden uzak hedefler ayrı
+    bileşen olduğundan kalabalıkta maliyet hedef sayısıyla doğrusala yakındır.
+    """
+    satirlar, satirSira = np.unique(satirSira, return_inverse=True)
+    sutunlar, sutunSira = np.unique(sutunSira, return_inverse=True)
+
+    # Etiket yayma: her düğüm bağlı olduğu en küçük etiketi alır
+    etiket = np.arange(len(satirlar) + len(sutunlar))
+    sutunDugum = sutunSira + len(satirlar)
+    while True:
+        kenar = np.minimum(etiket[satirSira], etiket[sutunDugum])
+        yeni = etiket.copy()
+        np.minimum.at(yeni, satirSira, kenar)
+        np.minimum.at(yeni, sutunDugum, kenar)
+        yeni = yeni[yeni]
+        if np.array_equal(yeni, etiket):
+            break
+        etiket = yeni
+
+    secilenSatir, secilenSutun = [], []
+    bilesen = etiket[satirSira]
+    sira = np.argsort(bilesen, kind="stable")
+    sinirlar = np.flatnonzero(np.diff(bilesen[sira])) + 1
+    for grup in np.split(sira, sinirlar):
+        if len(grup) == 1:
+            secilenSatir.append(satirSira[grup])
+            secilenSutun.append(sutunSira[grup])
+            continue
+        yerelSatir, satirYeri = np.unique(satirSira[grup], return_inverse=True)
+        yerelSutun, sutunYeri = np.unique(sutunSira[grup], return_inverse=True)
+        maliyet = np.zeros((len(yerelSatir), len(yerelSutun)))
+        maliyet[satirYeri, sutunYeri] = -skorlar[grup]
+        satirSec, sutunSec = macarAtama(maliyet)
+        tutan = maliyet[satirSec, sutunSec] < 0
+        secilenSatir.append(yerelSatir[satirSec[tutan]])
+        secilenSutun.append(yerelSutun[sutunSec[tutan]])
+    secilenSatir = np.concatenate(secilenSatir) if secilenSatir else np.zeros(0, dtype=np.int64)
+    secilenSutun = np.concatenate(secilenSutun) if secilenSutun else np.zeros(0, dtype=np.int64)
+    return satirlar[secilenSatir], sutunlar[secilenSutun]
+
+class UzaysalIzgara:
+    """Düzgün ızgara uzaysal indeks - her kare baştan kurulur
+
+    Her öğe (merkez ± yarıçap) kutusunun değdiği tüm hücrelere yazılır, sorgu
+    noktası yalnızca kendi hücresindeki öğeleri görür. Hücre boyu yarıçap
+    kadar seçilince öğe başına en çok 3x3 hücre yazılır. Hücreler sıralı
+    anahtar dizisinde tutulur, sorgular searchsorted ile toplu yapılır.
+    """
+    OFSET = 1 << 20  # Negatif hücre numaraları için
+
+    def __init__(self, hucreBoyutu):
+        self.hucreBoyutu = float(hucreBoyutu)
+        self.anahtarlar = np.zeros(0, dtype=np.int64)
+        self.ogeler = np.zeros(0, dtype=np.int64)
+
+    def _anahtar(self, hucreX, hucreY):
+        return (hucreY + self.OFSET) * (2 * self.OFSET) + hucreX + self.OFSET
+
+    def kur(self, merkezler, yaricaplar):
+        """merkezler (n, 2), yaricaplar (n,) veya skaler"""
+        merkezler = np.asarray(merkezler, dtype=np.float64).reshape(-1, 2)
+        yaricaplar = np.broadcast_to(np.asarray(yaricaplar, dtype=np.float64), (len(merkezler),))[:, None]
+        alt = np.floor((merkezler - yaricaplar) / self.hucreBoyutu).astype(np.int64)
+        ust = np.floor((merkezler + yaricaplar) / self.hucreBoyutu).astype(np.int64)
+        genislik = ust - alt + 1
+        sayi = genislik[:, 0] * genislik[:, 1]
+
+        # Öğe başına kapladığı hücre bloğunu aç
+        oge = np.repeat(np.arange(len(merkezler)), sayi)
+        yerel = np.arange(len(oge)) - np.repeat(np.cumsum(sayi) - sayi, sayi)
+        hucreX = alt[oge, 0] + yerel % genislik[oge, 0]
+        hucreY = alt[oge, 1] + yerel // genislik[oge, 0]
+        anahtar = self._anahtar(hucreX, hucreY)
+        sira = np.argsort(anahtar, kind="stable")
+        self.anahtarlar = anahtar[sira]
+        self.ogeler = oge[sira]
+        return self
+
+    def adaylar(self, noktalar):
+        """Noktaların hücrelerindeki öğeler - (ogeSira, noktaSira) çiftleri"""
+        noktalar = np.asarray(noktalar, dtype=np.float64).reshape(-1, 2)
+        hucre = np.floor(noktalar / self.hucreBoyutu).astype(np.int64)
+        anahtar = self._anahtar(hucre[:, 0], hucre[:, 1])
+        bas = np.searchsorted(self.anahtarlar, anahtar, side="left")
+        sayi = np.searchsorted(self.anahtarlar, anahtar, side="right") - bas
+        noktaSira = np.repeat(np.arange(len(noktalar)), sayi)
+        yerel = np.arange(len(noktaSira)) - np.repeat(np.cumsum(sayi) - sayi, sayi)
+        return self.ogeler[bas[noktaSira] + yerel], noktaSira
+
+def macarAtama(maliyet):
+    """Hungarian (Kuhn-Munkres) global atama - minimum toplam maliyet
+    
+    Dikdörtgen matrisleri de çözer. (satirIndeksleri, sutunIndeksleri) döner,
+    her satır/sütun en fazla bir kez kullanılır. O(n^2 m), iç döngü NumPy.
+    """
+    maliyet = np.asarray(maliyet, dtype=np.float64)
+    if maliyet.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    
+    # Algoritma satır <= sütun ister
+    transpoze = maliyet.shape[0] > maliyet.shape[1]
+    if transpoze:
+        maliyet = maliyet.T
+    n, m = maliyet.shape
+    
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    atanan = np.zeros(m + 1, dtype=np.int64)  # sütun -> satır (1 tabanlı, 0 = boş)
+    yol = np.zeros(m + 1, dtype=np.int64)
+    
+    for i in range(1, n + 1):
+        atanan[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        kullanildi = np.zeros(m + 1, dtype=bool)
+        while True:
+            kullanildi[j0] = True
+            i0 = atanan[j0]
+            serbest = ~kullanildi[1:]
+            indirgenmis = maliyet[i0 - 1] - u[i0] - v[1:]
+            iyilesen = serbest & (indirgenmis < minv[1:])
+            minv[1:][iyilesen] = indirgenmis[iyilesen]
+            yol[1:][iyilesen] = j0
+            
+            adaylar = np.where(serbest, minv[1:], np.inf)
+            j1 = int(np.argmin(adaylar)) + 1
+            delta = adaylar[j1 - 1]
+            
+            u[atanan[kullanildi]] += delta
+            v[kullanildi] -= delta
+            minv[1:][serbest] -= delta
+            
+            j0 = j1
+            if atanan[j0] == 0:
+                break
+        # Artıran yol boyunca atamaları kaydır
+        while j0:
+            j1 = yol[j0]
+            atanan[j0] = atanan[j1]
+            j0 = j1
+    
+    sutunlar = np.flatnonzero(atanan[1:])
+    satirlar = atanan[1:][sutunlar] - 1
+    if transpoze:
+        satirlar, sutunlar = sutunlar, satirlar
+    sira = np.argsort(satirlar)
+    return satirlar[sira], sutunlar[sira]
+
+class KayipIzHavuzu:
+    """Yakın zamanda kaybolan izlerin sınırlı, zamanla boşalan havuzu
+
+    Her kayıt izin depo satırının kopyası, son konumu/hızı ve iz yaşarken bir
+    kez hesaplanmış renk imzasıdır (L1 normalize histogram). Yeni detectionlar
+    havuzla tek matris işleminde karşılaştırılır: hızla ilerletilmiş son
+    konuma uzaklık kapısı + imza benzerliği (Bhattacharyya katsayısı).
+    Havuz doluysa en eski kayıt, maksYas saniyeden eski kayıtlar da düşer.
+    """
+    def __init__(self, kapasite=16, maksYas=3.0, kapiYaricapi=80.0, hizPayi=0.5, minBenzerlik=0.75):
+        self.kapasite = kapasite
+        self.maksYas = maksYas
+        self.kapiYaricapi = kapiYaricapi
+        self.hizPayi = hizPayi
+        self.minBenzerlik = minBenzerlik
+
+        self.dolu = np.zeros(kapasite, dtype=bool)
+        self.kayipZamani = np.zeros(kapasite)
+        self.konumZamani = np.zeros(kapasite)
+        self.merkez = np.zeros((kapasite, 2))
+        self.hiz = np.zeros((kapasite, 2))
+        self.imza = None                      # (kapasite, D) - ilk kayıtta ayrılır
+        self.satirlar = [None] * kapasite
+        self.eklenen = 0
+        self.geriAlinan = 0
+        self.dusen = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.dolu))
+
+    def temizle(self, simdi):
+        """maksYas'tan eski kayıtları at"""
+        yasli = np.flatnonzero(self.dolu & (simdi - self.kayipZamani > self.maksYas))
+        self.dolu[yasli] = False
+        for yer in yasli.tolist():
+            self.satirlar[yer] = None
+        self.dusen += len(yasli)
+
+    def ekle(self, depo, indeks, imza, simdi):
+        """Silinmek üzere olan izi havuza al"""
+        self.temizle(simdi)
+        if self.imza is None:
+            self.imza = np.zeros((self.kapasite, len(imza)), dtype=np.float32)
+        bos = np.flatnonzero(~self.dolu)
+        if len(bos):
+            yer = int(bos[0])
+        else:
+            yer = int(np.argmin(self.kayipZamani))
+            self.dusen += 1
+        self.dolu[yer] = True
+        self.kayipZamani[yer] = simdi
+        self.konumZamani[yer] = depo.konumZamani[indeks]
+        self.merkez[yer] = depo.merkezler([indeks])[0]
+        self.hiz[yer] = depo.hiz[indeks]
+        self.imza[yer] = imza
+        self.satirlar[yer] = depo.satirAl(indeks)
+        self.eklenen += 1
+
+    def eslestir(self, merkezler, imzalar, simdi):
+        """Detectionlarla havuz kayıtlarını eşle - (havuz yerleri, detection sıraları)"""
+        self.temizle(simdi)
+        yerler = np.flatnonzero(self.dolu)
+        bos = np.zeros(0, dtype=np.int64)
+        if len(yerler) == 0 or len(merkezler) == 0:
+            return bos, bos
+        dt = np.clip(simdi - self.konumZamani[yerler], 0, self.maksYas)
+        hiz = self.hiz[yerler]
+        tahmin = self.merkez[yerler] + hiz * dt[:, None]
+        kapi = self.kapiYaricapi + np.hypot(hiz[:, 0], hiz[:, 1]) * dt * self.hizPayi
+        mesafe = np.sqrt(((tahmin[:, None, :] - np.asarray(merkezler, dtype=np.float64)[None]) ** 2).sum(axis=2))
+        benzerlik = np.sqrt(self.imza[yerler]) @ np.sqrt(np.asarray(imzalar, dtype=np.float32)).T
+        kabul = (mesafe <= kapi[:, None]) & (benzerlik >= self.minBenzerlik)
+        if not kabul.any():
+            return bos, bos
+        skor = benzerlik - 0.5 * mesafe / kapi[:, None]
+        yerSira, detSira = macarAtama(np.where(kabul, -skor, 0.0))
+        tutan = kabul[yerSira, detSira]
+        return yerler[yerSira[tutan]], detSira[tutan]
+
+    def al(self, yer):
+        """Kaydı havuzdan çıkar - (satır, imza)"""
+        self.dolu[yer] = False
+        satir, self.satirlar[yer] = self.satirlar[yer], None
+        self.geriAlinan += 1
+        return satir, self.imza[yer].copy()
+
+    def ozet(self):
+        return (f"Kayıp iz havuzu: {self.eklenen} iz alındı, {self.geriAlinan} geri getirildi, "
+                f"{self.dusen} süre/yer nedeniyle düştü")
+
+class UltraKararliUcBalonSistemi:
+    """Ultra kararlı N balon sistemi - HEAD, 1. balon, 2. balon, ...
+
+    İz durumu IzDeposu'nda tutulur. HEAD kalite puanıyla seçilir ve kalıcıdır;
+    diğer balonlar HEAD'e uzaklığa göre sıralanır (en yakın = 1. balon).
+    hareketModeli: "hiz" (hız ortalaması) veya "kalman-cv" / "kalman-ca".
+    Zaman her zaman saat'ten (varsayılan time.time) veya verilen simdi'den okunur.
+    kayipHavuzu (KayipIzHavuzu) verilirse silinen izler havuza alınır ve yeni
+    detectionlar önce havuzdan geri getirilmeye çalışılır; bunun için
+    tumDetectionlariIsle'ye imzaci (kutular -> imzalar) verilmelidir.
+    """
+
+    def __init__(self, maksIz=3, hareketModeli="hiz", saat=time.time, ayrintili=True, kayipHavuzu=None):
+        self.saat = saat  # Tekrar oynatmada simüle saat verilir
+        self.ayrintili = ayrintili  # Terfi/yer değiştirme mesajları
+        self.depo = IzDeposu(maksIz, hareketModeli, saat)
+        self.maksIz = maksIz  # Aynı anda takip edilecek en fazla balon
+        self.headIndeks = -1
+        self.siralama = np.empty(0, dtype=np.int64)  # Depo indeksleri: HEAD, 1., 2., ...
+        self.sonKontrolZamani = saat()
+        self.kontrolAraligi = 5.0  # 5 saniyede bir büyük kontrol
+        self.mesafeThreshold = 150  # Daha geniş arama alanı
+        self.yeniIzMesafesi = 30  # Mevcut izlere bundan yakın detection yeni iz açmaz
+        # İz x detection çifti bundan fazlaysa uzaysal ızgara kullanılır. Altında yoğun
+        # matris daha ucuz (ızgara kurma maliyeti); kesişim benchmarks/izgara_esigi.py ile
+        # ~60 iz (640x480'de ~3000 çift, geniş sahnede daha erken) ölçüldü
+        self.izgaraEsigi = 3000
+        self.izgara = None  # Son karenin eşleştirme ızgarası
+        self.frame_count = 0
+        self.kayipHavuzu = kayipHavuzu
+        self.imzalar = {}  # kimlik -> renk imzası (havuz açıkken, iz imzaHit'e ulaşınca bir kez)
+        self.imzaHit = 5
+
+        # Kararlılık için ekstra değişkenler
+        self.sonDeğişiklikZamani = saat()
+        self.minDeğişiklikAraligi = 2.0  # En az 2 saniye bekle
+        self.beklemedekiYeniBalon = None
+        self.beklemeSayaci = 0
+        self.degisiklikThreshold = 20  # Daha dengeli threshold
+
+    @staticmethod
+    def tipEtiketi(sira):
+        """Sıralamadaki yerin etiketi"""
+        if sira < 3:
+            return ("HEAD", "BIRINCI", "IKINCI")[sira]
+        return f"{sira}."
+
+    def siraliBalon(self, sira):
+        """Sıralamanın sira'ncı balonu (0 = HEAD) - yoksa None"""
+        if sira >= len(self.siralama):
+            return None
+        return Balon.gorunum(self.depo, self.siralama[sira], self.tipEtiketi(sira))
+
+    @property
+    def headBalon(self):
+        return self.siraliBalon(0)
+
+    @property
+    def birinciBalon(self):
+        return self.siraliBalon(1)
+
+    @property
+    def ikinciBalon(self):
+        return self.siraliBalon(2)
+
+    def balonlar(self):
+        """Sıralamadaki tüm balonlar (HEAD önce)"""
+        return [self.siraliBalon(sira) for sira in range(len(self.siralama))]
+
+    def headGecerliMi(self, gecerli):
+        return self.headIndeks >= 0 and bool(gecerli[self.headIndeks])
+
+    def eslestirmeSkorMatrisi(self, izIndeksleri, kutular, simdi=None):
+        """Tüm izler x tüm detectionlar için skor matrisi - tek NumPy geçişi"""
+        izIndeksleri = np.asarray(izIndeksleri, dtype=np.int64)
+        izSayisi, detSayisi = len(izIndeksleri), len(kutular)
+        izSira = np.repeat(np.arange(izSayisi), detSayisi)
+        detSira = np.tile(np.arange(detSayisi), izSayisi)
+        return self.ciftSkorlari(izIndeksleri, kutular, izSira, detSira, simdi).reshape(izSayisi, detSayisi)
+
+    def ciftSkorlari(self, izIndeksleri, kutular, izSira, detSira, simdi=None):
+        """Seçili (iz, detection) çiftlerinin skorları - (P,)
+
+        Skorlar eski tekil hesapla aynı: 0.3 mesafe + 0.4 IoU + kilit bonusu
+        + 0.6 tahmin. mesafeThreshold dışındaki çiftler 0 skor alır. Kalman
+        modunda kapı ve tahmin skoru yenilik kovaryansıyla (Mahalanobis) hesaplanır.
+        """
+        simdi = self.saat() if simdi is None else simdi
+        izler = izIndeksleri[izSira]
+        detKutular = kutular[detSira]
+        izMerkez = self.depo.merkezler(izler)
+        yeniMerkez = np.stack(((detKutular[:, 0] + detKutular[:, 2]) // 2,
+                               (detKutular[:, 1] + detKutular[:, 3]) // 2), axis=1)
+
+        farklar = izMerkez - yeniMerkez
+        mesafeler = np.sqrt((farklar.astype(np.float64) ** 2).sum(axis=1))
+        kapi = mesafeler < self.mesafeThreshold
+
+        mesafeSkor = 1.0 - mesafeler / self.mesafeThreshold
+        iou = iouCiftleri(self.depo.kutular[izler], detKutular)
+        kilitBonus = np.where(self.depo.kilitliMaske(simdi)[izler], 0.5, 0.0)
+
+        if self.depo.kalmanBoyut:
+            # Kapı: tahmin edilen konuma Mahalanobis^2 < kapiEsigi
+            ters = np.linalg.inv(self.depo.yenilikKovaryansi(izIndeksleri))[izSira]
+            yenilik = yeniMerkez - self.depo.tahmin[izler]
+            mahalanobis = np.einsum("pi,pij,pj->p", yenilik, ters, yenilik)
+            kapi = mahalanobis < self.depo.kapiEsigi
+            tahminSkor = 0.6 * (1.0 - mahalanobis / self.depo.kapiEsigi)
+            skor = np.clip(mesafeSkor, 0.0, None) * 0.3 + iou * 0.4 + kilitBonus + tahminSkor
+            return np.where(kapi, skor, 0.0)
+
+        # Güçlendirilmiş tahmin skoru - tahmini olmayan izlerde NaN
+        tahminFark = self.depo.tahmin[izler] - yeniMerkez
+        tahminMesafe = np.sqrt((tahminFark ** 2).sum(axis=1))
+        with np.errstate(invalid="ignore"):
+            tahminKapi = tahminMesafe < self.mesafeThreshold
+        tahminSkor = np.where(tahminKapi, 0.6 * (1.0 - tahminMesafe / self.mesafeThreshold), 0.0)
+
+        skor = mesafeSkor * 0.3 + iou * 0.4 + kilitBonus + tahminSkor
+        return np.where(kapi, skor, 0.0)
+
+    def adayCiftleri(self, izIndeksleri, kutular):
+        """Kapıdan geçebilecek (iz, detection) çiftleri - uzaysal ızgara ile
+
+        Izgara hücresi mesafeThreshold boyundadır. Hız modelinde iz, merkezinin
+        mesafeThreshold çevresine; Kalman'da tahmininin kapı elipsini içine alan
+        çembere yazılır. Çemberi çok büyük izler (belirsizliği yüksek) tüm
+        detectionlarla eşlenir.
+        """
+        depo = self.depo
+        if depo.kalmanBoyut:
+            S = depo.yenilikKovaryansi(izIndeksleri)
+            yari = (S[:, 0, 0] + S[:, 1, 1]) / 2
+            enBuyukOzdeger = yari + np.sqrt(((S[:, 0, 0] - S[:, 1, 1]) / 2) ** 2 + S[:, 0, 1] ** 2)
+            yaricaplar = np.sqrt(depo.kapiEsigi * enBuyukOzdeger)
+            merkezler = depo.tahmin[izIndeksleri]
+            merkezler = np.where(np.isnan(merkezler), depo.merkezler(izIndeksleri), merkezler)
+        else:
+            yaricaplar = np.full(len(izIndeksleri), float(self.mesafeThreshold))
+            merkezler = depo.merkezler(izIndeksleri)
+
+        genis = yaricaplar > 3 * self.mesafeThreshold
+        dar = np.flatnonzero(~genis)
+        self.izgara = UzaysalIzgara(self.mesafeThreshold).kur(merkezler[dar], yaricaplar[dar])
+        detMerkez = (kutular[:, :2] + kutular[:, 2:]) // 2
+        izSira, detSira = self.izgara.adaylar(detMerkez)
+        izSira = dar[izSira]
+
+        genisler = np.flatnonzero(genis)
+        if len(genisler):
+            izSira = np.concatenate((izSira, np.repeat(genisler, len(kutular))))
+            detSira = np.concatenate((detSira, np.tile(np.arange(len(kutular)), len(genisler))))
+        return izSira, detSira
+
+    def enIyiEslestirme(self, X1, X2, Y1, Y2, guvenSkoru, simdi=None):
+        """Tek detection için en iyi iz - etiketi ve skoru"""
+        simdi = self.saat() if simdi is None else simdi
+        gecerli = self.depo.gecerliMaske(simdi)
+        izler = [i for i in self.siralama if gecerli[i]]
+        if not izler:
+            return None, 0
+
+        skorlar = self.eslestirmeSkorMatrisi(np.array(izler), np.array([[X1, Y1, X2, Y2]], dtype=np.int64), simdi)[:, 0]
+        enIyi = int(np.argmax(skorlar))
+
+        # Düşük threshold - kolay algılama
+        if skorlar[enIyi] > 0.2:
+            sira = int(np.flatnonzero(self.siralama == izler[enIyi])[0])
+            return self.tipEtiketi(sira), float(skorlar[enIyi])
+        else:
+            return None, 0
+
+    def degisiklikYapilabilirMi(self, simdi=None):
+        """Değişiklik yapılabilir mi kontrol et"""
+        gecenSure = (self.saat() if simdi is None else simdi) - self.sonDeğişiklikZamani
+        return gecenSure >= self.minDeğişiklikAraligi
+
+    def izleriSil(self, indeksler, simdi):
+        """İzleri sil - havuz açıksa imzası olanlar önce kayıp iz havuzuna alınır"""
+        for indeks in np.asarray(indeksler, dtype=np.int64).tolist():
+            imza = self.imzalar.pop(int(self.depo.kimlik[indeks]), None)
+            if self.kayipHavuzu is not None and imza is not None:
+                self.kayipHavuzu.ekle(self.depo, indeks, imza, simdi)
+        self.depo.sil(indeksler)
+
+    def izAc(self, X1, X2, Y1, Y2, guvenSkoru, simdi, havuzYeri=None):
+        """Yeni iz ekle veya havuzYeri verilmişse kayıp izi geri getir - satır indeksi"""
+        if havuzYeri is None:
+            return self.depo.ekle(X1, X2, Y1, Y2, guvenSkoru, simdi)
+        satir, imza = self.kayipHavuzu.al(havuzYeri)
+        indeks = self.depo.geriYukle(satir, X1, X2, Y1, Y2, guvenSkoru, simdi)
+        self.imzalar[int(self.depo.kimlik[indeks])] = imza
+        if self.ayrintili:
+            print(f"Kayıp balon {int(self.depo.kimlik[indeks])} geri getirildi")
+        return indeks
+
+    def imzalariTamamla(self, imzaci):
+        """imzaHit'e ulaşmış, bu karede görülmüş ve imzası olmayan izlerin imzasını bir kez hesapla"""
+        depo = self.depo
+        adaylar = np.flatnonzero((depo.kimlik != 0) & (depo.toplamHits >= self.imzaHit) &
+                                 (depo.consecutiveMisses == 0))
+        adaylar = [i for i in adaylar.tolist() if int(depo.kimlik[i]) not in self.imzalar]
+        if adaylar:
+            for indeks, imza in zip(adaylar, imzaci(depo.kutular[adaylar])):
+                self.imzalar[int(depo.kimlik[indeks])] = imza
+
+    def tumDetectionlariIsle(self, detectionlar, simdi=None, imzaci=None):
+        """Tüm detectionları tek seferde işle - N balon desteği
+
+        simdi: karenin zaman damgası; tüm iz güncellemeleri bunu kullanır.
+        imzaci: kutular (n, 4) -> renk imzaları (n, D); kayıp iz havuzu için.
+        """
+        simdi = self.saat() if simdi is None else simdi
+        depo = self.depo
+        aktif = depo.aktifIndeksler()
+
+        # Kalman modunda tüm izler bu kareye ilerletilir (kaçırılan karelerde de)
+        depo.tahminEt(aktif, simdi)
+
+        if len(detectionlar) == 0:
+            # Hiç detection yok - missed frame
+            depo.missedFrame(aktif)
+            return
+        havuzKullan = self.kayipHavuzu is not None and imzaci is not None
+
+        # Çok düşük güvenli detectionları toptan ele (TespitSuzgeci'nden geldiyse zaten elenmiş)
+        detectionlar = np.asarray(detectionlar)
+        gecerliIndeksler = np.flatnonzero(detectionlar[:, 4] * 100 >= 40)
+        kutular = detectionlar[gecerliIndeksler, :4].astype(np.int64)
+        guvenler = detectionlar[gecerliIndeksler, 4] * 100
+
+        guncellenenler = []
+        kullanildi = np.zeros(len(gecerliIndeksler), dtype=bool)
+
+        # Önce mevcut balonları güncellemeye çalış - global atama
+        gecerli = depo.gecerliMaske(simdi)
+        izler = np.flatnonzero(gecerli)
+        izgaraKullan = len(izler) * len(kutular) > self.izgaraEsigi
+        if len(izler) > 0 and len(kutular) > 0:
+            if izgaraKullan:
+                # Kalabalık sahne: yalnızca komşu hücrelerdeki çiftler skorlanır
+                izSira, detSira = self.adayCiftleri(izler, kutular)
+            else:
+                izSira = np.repeat(np.arange(len(izler)), len(kutular))
+                detSira = np.tile(np.arange(len(kutular)), len(izler))
+            skorlar = self.ciftSkorlari(izler, kutular, izSira, detSira, simdi)
+            kabul = skorlar > 0.3
+            if izgaraKullan:
+                izSira, detSira = seyrekAtama(izSira[kabul], detSira[kabul], skorlar[kabul])
+            else:
+                kabul, skorlar = kabul.reshape(len(izler), -1), skorlar.reshape(len(izler), -1)
+                # Maksimum toplam skor = minimum negatif skor; eşik altı çiftler serbest
+                izSira, detSira = macarAtama(np.where(kabul, -skorlar, 0.0))
+                tutan = kabul[izSira, detSira]
+                izSira, detSira = izSira[tutan], detSira[tutan]
+            depo.guncelle(izler[izSira], kutular[detSira], guvenler[detSira], simdi)
+            guncellenenler.extend(izler[izSira])
+            kullanildi[detSira] = True
+
+        # Yeni iz bastırma: kalabalıkta yalnızca komşu hücrelerdeki izlere bakılır
+        bastirma = None
+        eklenenler = []
+
+        # Eşleşmeyen detectionlar önce kayıp iz havuzuyla toplu karşılaştırılır
+        havuzYerleri = {}
+        serbest = np.flatnonzero(~kullanildi)
+        if havuzKullan and len(serbest) and len(self.kayipHavuzu):
+            serbestKutular = kutular[serbest]
+            yerler, detSira = self.kayipHavuzu.eslestir(
+                (serbestKutular[:, :2] + serbestKutular[:, 2:]) // 2, imzaci(serbestKutular), simdi)
+            havuzYerleri = dict(zip(serbest[detSira].tolist(), yerler.tolist()))
+
+        # Yeni balon ekleme
+        for det in np.flatnonzero(~kullanildi):
+            X1, Y1, X2, Y2 = kutular[det].tolist()
+
+            # HEAD yoksa veya geçersizse, direkt HEAD olarak ekle
+            if not self.headGecerliMi(gecerli):
+                if self.headIndeks >= 0:
+                    self.izleriSil([self.headIndeks], simdi)
+                self.headIndeks = self.izAc(X1, X2, Y1, Y2, guvenler[det], simdi, havuzYerleri.get(det))
+                self.sonDeğişiklikZamani = simdi
+                gecerli = depo.gecerliMaske(simdi)
+                guncellenenler.append(self.headIndeks)
+                eklenenler.append(self.headIndeks)
+                continue
+
+            # Kapasite dolu mu? Geçersiz izlerin yeri yeni balona açılır
+            if np.count_nonzero(gecerli) >= self.maksIz:
+                continue
+
+            # Mevcut izlerden minimum mesafe kontrolü
+            merkez = np.array(((X1 + X2) // 2, (Y1 + Y2) // 2))
+            if izgaraKullan:
+                if bastirma is None:
+                    izler = np.flatnonzero(gecerli)
+                    bastirma = (izler, UzaysalIzgara(self.mesafeThreshold).kur(depo.merkezler(izler),
+                                                                               self.yeniIzMesafesi))
+                yakinSira, _ = bastirma[1].adaylar(merkez)
+                izler = np.concatenate((bastirma[0][yakinSira], np.array(eklenenler, dtype=np.int64)))
+            else:
+                izler = np.flatnonzero(gecerli)
+            mesafeler = np.sqrt(((depo.merkezler(izler) - merkez) ** 2).sum(axis=1))
+            if np.all(mesafeler > self.yeniIzMesafesi):
+                eskiler = np.flatnonzero((depo.kimlik != 0) & ~gecerli & (np.arange(depo.kapasite) != self.headIndeks))
+                if len(eskiler) > 0:
+                    self.izleriSil(eskiler[:1], simdi)
+                indeks = self.izAc(X1, X2, Y1, Y2, guvenler[det], simdi, havuzYerleri.get(det))
+                self.sonDeğişiklikZamani = simdi
+                gecerli = depo.gecerliMaske(simdi)
+                guncellenenler.append(indeks)
+                eklenenler.append(indeks)
+
+        # ÖZEL DURUM: HEAD yoksa terfi sistemi
+        if self.headIndeks < 0:
+            self.headTerfi(gecerli, simdi)
+
+        # Güncellenmeyenlere missed frame
+        guncellendi = np.zeros(depo.kapasite, dtype=bool)
+        guncellendi[np.array(guncellenenler, dtype=np.int64)] = True
+        depo.missedFrame(np.flatnonzero((depo.kimlik != 0) & ~guncellendi))
+        if havuzKullan:
+            self.imzalariTamamla(imzaci)
+
+        # HEAD'e en yakın balon 1. balon olsun
+        self.mesafeKontrolVeYenidenSirala(simdi)
+
+    def headTerfi(self, gecerli, simdi):
+        """Kalite puanı en yüksek geçerli izi HEAD yap"""
+        adaylar = np.flatnonzero(gecerli & (np.arange(self.depo.kapasite) != self.headIndeks))
+        if len(adaylar) == 0:
+            self.headIndeks = -1
+            return False
+        kaliteler = self.depo.kalitePuanlari(simdi)[adaylar]
+        self.headIndeks = int(adaylar[np.argmax(kaliteler)])
+        return True
+
+    def mesafeKontrolVeYenidenSirala(self, simdi=None):
+        """HEAD'e yakınlığa göre sırala - en yakın balon 1. balon"""
+        gecerli = self.depo.gecerliMaske(self.saat() if simdi is None else simdi)
+        if self.headIndeks < 0:
+            self.siralama = np.empty(0, dtype=np.int64)
+            return
+        if not gecerli[self.headIndeks]:
+            # Geçersiz HEAD - optimize_kontrol terfi ettirene kadar sıralama aynı
+            self.siralama = np.concatenate(([self.headIndeks],
+                                            [i for i in self.siralama[1:] if self.depo.kimlik[i] != 0]
+                                            )).astype(np.int64)
+            return
+
+        digerleri = np.flatnonzero(gecerli & (np.arange(self.depo.kapasite) != self.headIndeks))
+        mesafeler = np.sqrt(((self.depo.merkezler(digerleri) -
+                              self.depo.merkezler([self.headIndeks])) ** 2).sum(axis=1))
+        sira = np.argsort(mesafeler, kind="stable")
+        sirali = digerleri[sira]
+
+        # Eski 1. balon hâlâ geçerli ama artık en yakın değilse yer değişti
+        eskiBirinci = self.siralama[1] if len(self.siralama) > 1 else -1
+        if len(sirali) > 1 and eskiBirinci != sirali[0] and eskiBirinci in sirali:
+            eskiMesafe = mesafeler[digerleri == eskiBirinci][0]
+            if self.ayrintili:
+                print(f"Balonlar yer değiştirdi! 1.balon HEAD'e daha yakın ({mesafeler[sira[0]]:.0f} < {eskiMesafe:.0f})")
+        self.siralama = np.concatenate(([self.headIndeks], sirali)).astype(np.int64)
+
+    def optimize_kontrol(self, simdi=None):
+        """Her frame hızlı kontrol + Otomatik terfi sistemi"""
+        simdi = self.saat() if simdi is None else simdi
+        gecerli = self.depo.gecerliMaske(simdi)
+
+        # HEAD geçersizse en kaliteli balonu HEAD yap
+        if self.headIndeks >= 0 and not gecerli[self.headIndeks]:
+            if self.headTerfi(gecerli, simdi):
+                self.sonDeğişiklikZamani = simdi
+                if self.ayrintili:
+                    print("1. BALON HEAD'e terfi etti!")
+
+        # Geçersiz balonları sil
+        self.izleriSil(np.flatnonzero((self.depo.kimlik != 0) & ~gecerli), simdi)
+
+        # HEAD'e en yakın balon 1. balon olsun
+        self.mesafeKontrolVeYenidenSirala(simdi)
+
+    def beslikliBalonKontrolu(self, simdi=None):
+        """5 saniyede bir kontrol - ÇOK SINIRLI"""
+        simdikiZaman = self.saat() if simdi is None else simdi
+
+        if simdikiZaman - self.sonKontrolZamani >= self.kontrolAraligi:
+            gecerli = self.depo.gecerliMaske(simdikiZaman)
+            kilitli = self.depo.kilitliMaske(simdikiZaman)
+            # Sadece KİLİTLİ OLMAYAN balonlar için kontrol
+            adaylar = np.flatnonzero(gecerli & ~kilitli & (np.arange(self.depo.kapasite) != self.headIndeks))
+            if (len(adaylar) > 0 and self.headIndeks >= 0 and
+                not kilitli[self.headIndeks] and
+                self.degisiklikYapilabilirMi(simdikiZaman)):
+
+                # Kalite farkı ÇOK büyükse değiştir
+                kaliteler = self.depo.kalitePuanlari(simdikiZaman)
+                enIyi = int(adaylar[np.argmax(kaliteler[adaylar])])
+
+                if kaliteler[enIyi] > kaliteler[self.headIndeks] + 30:  # Büyük fark gerekli
+                    # Yer değiştir
+                    self.headIndeks = enIyi
+                    self.sonDeğişiklikZamani = simdikiZaman
+                    self.mesafeKontrolVeYenidenSirala(simdikiZaman)
+
+            self.sonKontrolZamani = simdikiZaman
+
+    def kopya(self):
+        """Çizim için anlık kopya - pipeline modunda tracker ile yarışmaz"""
+        anlik = copy.copy(self)
+        anlik.depo = self.depo.kopya()
+        anlik.siralama = self.siralama.copy()
+        return anlik
+
+    def aktifBalonSayisi(self, simdi=None):
+        """Aktif balon sayısını döndür"""
+        return int(np.count_nonzero(self.depo.gecerliMaske(self.saat() if simdi is None else simdi)))
+
+    def kaydir(self, simdi=None):
+        """Detection atlanan kare - geçerli izler hareket modeliyle ilerler, miss sayılmaz"""
+        simdi = self.saat() if simdi is None else simdi
+        self.depo.kaydir(np.flatnonzero(self.depo.gecerliMaske(simdi)), simdi)
+
+    def egoKaydir(self, kayma):
+        """Kamera hareketini (tamsayı piksel) tüm izlerden çıkar"""
+        self.depo.egoKaydir(kayma)
+
+    def akisIleTasi(self, indeksler, kaymalar, simdi=None, kopru=False):
+        """İzleri optik akış kaymasıyla taşı - detection atlanan veya ıskalanan kare
+
+        kopru: detection bu karede çalıştı; yalnızca eşleşmeyen izler taşınır
+        ve bu karenin miss'i geri alınır. Güven düşüşü geri alınmaz, zaman
+        aşımı da geçerli kalır, böylece akışla köprülenen iz sonsuza dek yaşamaz.
+        """
+        simdi = self.saat() if simdi is None else simdi
+        depo = self.depo
+        indeksler = np.asarray(indeksler, dtype=np.int64)
+        kaymalar = np.asarray(kaymalar).reshape(-1, 2)
+        if kopru:
+            iskalanan = (depo.sonGorulen[indeksler] < simdi) & (depo.consecutiveMisses[indeksler] > 0)
+            indeksler, kaymalar = indeksler[iskalanan], kaymalar[iskalanan]
+            depo.consecutiveMisses[indeksler] -= 1
+        depo.akisIleTasi(indeksler, kaymalar, simdi)
+        return indeksler
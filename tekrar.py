@@ -0,0 +1,142 @@
+"""Kayıtlı detectionlarla deterministik tracker tekrar oynatma
+
+Kamera ve model olmadan tracker'ı ölçmek için: kare başına kaydedilmiş
+[x1,y1,x2,y2,conf,cls] satırları simüle saatle tumDetectionlariIsle'ye
+verilir, CPU'nun izin verdiği hızda oynatılır. Aynı kayıt her zaman aynı
+sonucu üretir.
+
+Canlı döngünün --kayit ile yazdığı .det/.idx oturumları doğrudan oynatılır
+(kayit.TespitKaydi). Elle hazırlanan kayıtlar için .npz formatı:
+    zamanlar  (F,)    kare zaman damgaları (saniye)
+    ofsetler  (F+1,)  kare i'nin satırları: satirlar[ofsetler[i]:ofsetler[i+1]]
+    satirlar  (R, 6)  detection satırları
+    kimlikler (R,)    isteğe bağlı gerçek hedef kimlikleri (-1 = sahte tespit)
+
+Çalıştırma:
+    python tekrar.py kayit.npz [--maks-iz 3] [--hareket-modeli kalman-cv]
+    python tekrar.py oturum.det
+"""
+import argparse
+import time
+
+import numpy as np
+
+from kayit import TespitKaydi
+from takip import IzDeposu, SimuleSaat, UltraKararliUcBalonSistemi, iouMatrisi, macarAtama
+
+
+def kayitKaydet(yol, zamanlar, kareler, kimlikler=None):
+    """Kare listesini tekrar formatında .npz olarak yaz
+
+    kareler: kare başına (n, 6) detection dizileri
+    kimlikler: kare başına (n,) gerçek kimlik dizileri veya None
+    """
+    ofsetler = np.zeros(len(kareler) + 1, dtype=np.int64)
+    ofsetler[1:] = np.cumsum([len(kare) for kare in kareler])
+    satirlar = (np.concatenate([np.asarray(kare, dtype=np.float32).reshape(-1, 6) for kare in kareler])
+                if kareler else np.zeros((0, 6), dtype=np.float32))
+    veri = {"zamanlar": np.asarray(zamanlar, dtype=np.float64), "ofsetler": ofsetler, "satirlar": satirlar}
+    if kimlikler is not None:
+        veri["kimlikler"] = np.concatenate([np.asarray(k, dtype=np.int64) for k in kimlikler])
+    np.savez(yol, **veri)
+
+
+def kayitOku(yol):
+    """Tekrar kaydını kare kare (zaman, satirlar, kimlikler) olarak üret"""
+    veri = np.load(yol)
+    zamanlar, ofsetler, satirlar = veri["zamanlar"], veri["ofsetler"], veri["satirlar"]
+    kimlikler = veri["kimlikler"] if "kimlikler" in veri.files else None
+    for i, zaman in enumerate(zamanlar):
+        bas, son = ofsetler[i], ofsetler[i + 1]
+        yield float(zaman), satirlar[bas:son], None if kimlikler is None else kimlikler[bas:son]
+
+
+class TekrarSonucu:
+    """Tekrar oynatma ölçümleri"""
+    def __init__(self):
+        self.kareSureleri = []   # Kare başına tracker işlem süresi (s)
+        self.idDegisimi = 0      # Gerçek hedefin tracker kimliği değişti (kimlik varsa)
+        self.headDegisimi = 0    # HEAD başka bir ize geçti
+        self.kilitKaybi = 0      # Geçerli HEAD varken bir sonraki karede yok
+        self.eslesme = 0         # Gerçek hedef - iz eşleşme sayısı (kimlik varsa)
+        self.kimlikVar = False   # Kayıtta gerçek kimlik görüldü mü - yoksa ID değişimi ölçülemez
+
+    def ozet(self):
+        sureler = np.array(self.kareSureleri) * 1000
+        if len(sureler) == 0:
+            return "Kare yok"
+        p50, p95, p99 = np.percentile(sureler, [50, 95, 99])
+        idDegisimi = self.idDegisimi if self.kimlikVar else "ölçülmedi (kayıtta gerçek kimlik yok)"
+        return (f"Kare: {len(sureler)} | Tracker ms p50: {p50:.3f}, p95: {p95:.3f}, p99: {p99:.3f}, "
+                f"max: {sureler.max():.3f} | ID değişimi: {idDegisimi} | "
+                f"HEAD değişimi: {self.headDegisimi} | Kilit kaybı: {self.kilitKaybi}")
+
+
+def tekrarOynat(kareler, maksIz=3, hareketModeli="hiz", sistem=None):
+    """Kareleri simüle saatle tracker'dan geçir, TekrarSonucu döndür
+
+    kareler: (zaman, satirlar, kimlikler) üreteci - kayitOku gibi
+    """
+    saat = SimuleSaat()
+    sonuc = TekrarSonucu()
+    oncekiHead = 0
+    hedefIz = {}  # gerçek kimlik -> son eşleştiği iz kimliği
+
+    for zaman, satirlar, kimlikler in kareler:
+        saat.zaman = zaman
+        if sistem is None:
+            # Saat ilk karenin zamanındayken kurulur - periyodik kontroller buradan sayar
+            sistem = UltraKararliUcBalonSistemi(maksIz, hareketModeli, saat=saat, ayrintili=False)
+
+        baslangic = time.perf_counter()
+        sistem.tumDetectionlariIsle(satirlar, zaman)
+        sistem.optimize_kontrol(zaman)
+        sistem.beslikliBalonKontrolu(zaman)
+        sonuc.kareSureleri.append(time.perf_counter() - baslangic)
+
+        head = sistem.headBalon
+        headKimlik = head.kimlik if head is not None and head.isValid(zaman) else 0
+        if oncekiHead and headKimlik and headKimlik != oncekiHead:
+            sonuc.headDegisimi += 1
+        if oncekiHead and not headKimlik:
+            sonuc.kilitKaybi += 1
+        oncekiHead = headKimlik
+
+        if kimlikler is not None and np.any(kimlikler >= 0):
+            sonuc.kimlikVar = True
+        if kimlikler is not None and len(satirlar) > 0:
+            idDegisimleriniSay(sistem, zaman, satirlar, kimlikler, hedefIz, sonuc)
+
+    return sonuc
+
+
+def idDegisimleriniSay(sistem, zaman, satirlar, kimlikler, hedefIz, sonuc):
+    """Geçerli izleri gerçek hedeflere IoU ile eşle, kimlik değişimlerini say"""
+    depo = sistem.depo
+    izler = np.flatnonzero(depo.gecerliMaske(zaman))
+    hedefler = np.flatnonzero(kimlikler >= 0)
+    if len(izler) == 0 or len(hedefler) == 0:
+        return
+    iou = iouMatrisi(depo.kutular[izler], satirlar[hedefler, :4])
+    izSira, hedefSira = macarAtama(-iou)
+    for iz, hedef in zip(izSira, hedefSira):
+        if iou[iz, hedef] < 0.3:
+            continue
+        gercek = int(kimlikler[hedefler[hedef]])
+        izKimlik = int(depo.kimlik[izler[iz]])
+        if gercek in hedefIz and hedefIz[gercek] != izKimlik:
+            sonuc.idDegisimi += 1
+        hedefIz[gercek] = izKimlik
+        sonuc.eslesme += 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kayıtlı detectionlarla tracker tekrar oynatma")
+    parser.add_argument("kayit", help="Tekrar kaydı (.npz) veya --kayit oturumu (.det/.idx)")
+    parser.add_argument("--maks-iz", type=int, default=3)
+    parser.add_argument("--hareket-modeli", choices=sorted(IzDeposu.hareketModelleri), default="hiz")
+    args = parser.parse_args()
+
+    kareler = kayitOku(args.kayit) if args.kayit.endswith(".npz") else TespitKaydi(args.kayit)
+    sonuc = tekrarOynat(kareler, args.maks_iz, args.hareket_modeli)
+    print(sonuc.ozet())
@@ -0,0 +1,52 @@
+"""kayit.VideoKaydedici - videonun açıldığı hız"""
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from kayit import VideoKaydedici  # noqa: E402
+
+
+@pytest.fixture
+def sahteCv2(monkeypatch):
+    """VideoWriter'ın hangi hızla açıldığını kaydeden cv2 yerine geçen modül"""
+    acilanlar = []
+
+    class SahteYazici:
+        def __init__(self, yol, fourcc, fps, boyut):
+            acilanlar.append(fps)
+
+        def write(self, img):
+            pass
+
+        def release(self):
+            pass
+
+    cv2 = types.ModuleType("cv2")
+    cv2.VideoWriter = SahteYazici
+    cv2.VideoWriter_fourcc = lambda *harfler: 0
+    monkeypatch.setitem(sys.modules, "cv2", cv2)
+    return acilanlar
+
+
+def kaydet(kaydedici, kareSayisi, kaynakFps):
+    img = np.zeros((4, 4, 3), dtype=np.uint8)
+    for kare in range(kareSayisi):
+        kaydedici.ekle(img, 1000.0 + kare / kaynakFps)
+    kaydedici.kapat()
+
+
+def test_verilen_hiz_her_ile_bolunur(sahteCv2, tmp_path):
+    kaydedici = VideoKaydedici(str(tmp_path / "a.avi"), fps=60.0, her=3, tamponSayisi=64)
+    kaydet(kaydedici, 30, 60.0)
+    assert sahteCv2 == [pytest.approx(20.0)]
+    assert kaydedici.yazilan == 10
+
+
+def test_hiz_verilmezse_yakalama_zamanlarindan_olculur(sahteCv2, tmp_path):
+    kaydedici = VideoKaydedici(str(tmp_path / "b.avi"), her=2)
+    kaydet(kaydedici, 40, 15.0)
+    assert sahteCv2 == [pytest.approx(7.5)]
@@ -0,0 +1,96 @@
+"""nisan - NisanCikisi -> DonguKanal -> paketCoz gidiş-dönüşü ve seri kanalda kısmi yazma"""
+import os
+import sys
+import types
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from nisan import DonguKanal, NisanCikisi, SeriKanal, paketBoyu, paketCoz  # noqa: E402
+from takip import SimuleSaat, UltraKararliUcBalonSistemi  # noqa: E402
+
+
+@pytest.fixture
+def sistem():
+    """Sağa doğru ~120 px/s giden tek hedefi 10 kare izlemiş tracker"""
+    saat = SimuleSaat(100.0)
+    sistem = UltraKararliUcBalonSistemi(3, saat=saat, ayrintili=False)
+    for kare in range(10):
+        saat.zaman = 100.0 + kare / 30.0
+        x = 200 + 4 * kare
+        sistem.tumDetectionlariIsle(np.array([[x, 100, x + 40, 140, 0.9, 0]], dtype=np.float32), saat.zaman)
+    return sistem
+
+
+def test_ileri_tasima(sistem):
+    yakalama = sistem.saat()
+    kanal = DonguKanal()
+    cikis = NisanCikisi(kanal, izSayisi=3, ekGecikme=0.01, saat=lambda: yakalama + 0.05)
+    assert cikis.yayinla(sistem, yakalama)
+
+    sira, paketYakalama, gonderim, kayitlar = kanal.oku()
+    assert (sira, paketYakalama, gonderim) == (0, yakalama, yakalama + 0.05)
+    assert len(kayitlar) == 1   # Kullanılmayan kayıtlar pakette ama geçersiz
+    head = sistem.headBalon
+    kimlik, izSira, x, y, vx, vy, guven = kayitlar[0]
+    ortaX, ortaY = head.ortaNokta()
+    assert (kimlik, izSira) == (head.kimlik, 0)
+    assert vx == pytest.approx(head.hizVektoruX) and vx > 100
+    assert x == pytest.approx(ortaX + head.hizVektoruX * 0.06, rel=1e-6)
+    assert y == pytest.approx(ortaY + head.hizVektoruY * 0.06, rel=1e-6)
+    assert guven == pytest.approx(head.guvenSkoru)
+
+
+def test_hiz_siniri_ve_sira_tasmasi(sistem):
+    saat = SimuleSaat(200.0)
+    kanal = DonguKanal()
+    cikis = NisanCikisi(kanal, hizSiniri=10.0, saat=saat)
+    cikis.sira = 0xFFFFFFFF
+    for zaman in (200.0, 200.05, 200.15, 200.2, 200.3):
+        saat.zaman = zaman
+        cikis.yayinla(sistem, zaman)
+    assert (cikis.gonderilen, cikis.atlanan, cikis.dusurulen) == (3, 2, 0)
+    assert [kanal.oku()[0] for _ in range(3)] == [0xFFFFFFFF, 0, 1]
+    assert kanal.oku() is None
+
+
+@pytest.fixture
+def seriPort(monkeypatch):
+    """Her write çağrısında en fazla 'butce' bayt kabul eden pyserial yerine geçen modül"""
+    class SahtePort:
+        def __init__(self, port, baud, timeout, write_timeout):
+            self.yazilan = bytearray()
+            self.butce = 1 << 20
+
+        def write(self, veri):
+            kabul = veri[:self.butce]
+            self.yazilan += kabul
+            return len(kabul)
+
+        def close(self):
+            pass
+
+    serial = types.ModuleType("serial")
+    serial.Serial = SahtePort
+    serial.SerialTimeoutException = type("SerialTimeoutException", (Exception,), {})
+    monkeypatch.setitem(sys.modules, "serial", serial)
+
+
+def test_seri_kismi_yazma_gonderilmis_sayilir(seriPort, sistem):
+    kanal = SeriKanal("/dev/sahte")
+    saat = SimuleSaat(300.0)
+    cikis = NisanCikisi(kanal, hizSiniri=0, saat=saat)
+    boy = paketBoyu(1)
+
+    kanal.port.butce = 10                 # Paketin başı gider, sonu saklanır
+    assert cikis.yayinla(sistem, 300.0)
+    kanal.port.butce = 5                  # Saklanan son tamamlanamaz - yeni paket düşer
+    assert not cikis.yayinla(sistem, 300.0)
+    kanal.port.butce = 1 << 20            # Önce kalan, sonra yeni paket
+    assert cikis.yayinla(sistem, 300.0)
+
+    assert (cikis.gonderilen, cikis.dusurulen, kanal.yarimYazma) == (2, 1, 1)
+    akis = bytes(kanal.port.yazilan)
+    assert len(akis) == 2 * boy
+    assert [paketCoz(akis[i:i + boy])[0] for i in (0, boy)] == [0, 2]   # Düşen paketin sırası 1
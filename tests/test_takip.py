@@ -0,0 +1,108 @@
+"""takip - IoU matrisi, Macar atama, seyrek (bileşen bileşen) atama ve IzDeposu güncelleme yolları"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from takip import IzDeposu, iouMatrisi, macarAtama, seyrekAtama  # noqa: E402
+
+
+def ciftler(satirlar, sutunlar):
+    return set(zip(np.asarray(satirlar).tolist(), np.asarray(sutunlar).tolist()))
+
+
+def test_iou_matrisi_elle():
+    kutular1 = [[0, 0, 10, 10], [0, 0, 0, 0]]
+    kutular2 = [[5, 0, 15, 10], [0, 0, 10, 10], [20, 20, 30, 30]]
+    iou = iouMatrisi(kutular1, kutular2)
+    assert iou.shape == (2, 3)
+    assert iou[0] == pytest.approx([50 / 150, 1.0, 0.0])
+    assert iou[1] == pytest.approx([0.0, 0.0, 0.0])   # Sıfır alanlı kutu
+    assert iouMatrisi(np.zeros((0, 4)), kutular2).shape == (0, 3)
+
+
+def test_macar_kare_elle():
+    # Tek optimum: 1 + 2 + 2 = 5
+    satirlar, sutunlar = macarAtama([[4, 1, 3], [2, 0, 5], [3, 2, 2]])
+    assert satirlar.tolist() == [0, 1, 2]
+    assert sutunlar.tolist() == [1, 0, 2]
+
+
+def test_macar_dikdortgen():
+    satirlar, sutunlar = macarAtama([[1, 5, 9], [2, 1, 8]])       # n < m: sütun 2 boş
+    assert ciftler(satirlar, sutunlar) == {(0, 0), (1, 1)}
+    satirlar, sutunlar = macarAtama([[5, 1], [1, 5], [3, 3]])     # n > m: satır 2 boş
+    assert ciftler(satirlar, sutunlar) == {(0, 1), (1, 0)}
+    assert satirlar.tolist() == sorted(satirlar.tolist())
+
+
+def test_macar_esitlik():
+    maliyet = np.ones((3, 3))
+    satirlar, sutunlar = macarAtama(maliyet)
+    assert sorted(satirlar.tolist()) == [0, 1, 2]
+    assert sorted(sutunlar.tolist()) == [0, 1, 2]
+    assert maliyet[satirlar, sutunlar].sum() == 3
+
+
+def test_macar_bos_ve_sifir_satir():
+    for sekil in ((0, 0), (0, 3), (3, 0)):
+        satirlar, sutunlar = macarAtama(np.zeros(sekil))
+        assert len(satirlar) == len(sutunlar) == 0
+    # Eşik altı (0 maliyet) satır skorlu çiftleri bozmaz
+    satirlar, sutunlar = macarAtama([[-0.9, 0.0, 0.0], [0.0, 0.0, 0.0], [0.0, 0.0, -0.8]])
+    assert {(0, 0), (2, 2)} <= ciftler(satirlar, sutunlar)
+
+
+def test_seyrek_atama_elle():
+    # Bileşen {10, 11 | 5, 6}: 10-6 + 11-5 = 1.3 > 10-5 = 0.9; bileşen {20 | 7} tek çift
+    satirlar, sutunlar = seyrekAtama(np.array([10, 10, 11, 20]), np.array([5, 6, 5, 7]),
+                                     np.array([0.9, 0.5, 0.8, 0.7]))
+    assert ciftler(satirlar, sutunlar) == {(10, 6), (11, 5), (20, 7)}
+    satirlar, sutunlar = seyrekAtama(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0))
+    assert len(satirlar) == len(sutunlar) == 0
+
+
+@pytest.mark.parametrize("tohum", range(20))
+def test_seyrek_ve_yogun_ayni_atama(tohum):
+    rng = np.random.default_rng(tohum)
+    n, m = rng.integers(1, 12, 2)
+    skor = np.where(rng.random((n, m)) < 0.3, rng.uniform(0.31, 2.0, (n, m)), 0.0)
+    satirSira, sutunSira = np.nonzero(skor)
+
+    yogunSatir, yogunSutun = macarAtama(-skor)
+    tutan = skor[yogunSatir, yogunSutun] > 0
+    seyrekSatir, seyrekSutun = seyrekAtama(satirSira, sutunSira, skor[satirSira, sutunSira])
+    assert ciftler(seyrekSatir, seyrekSutun) == ciftler(yogunSatir[tutan], yogunSutun[tutan])
+
+
+@pytest.mark.parametrize("hareketModeli", sorted(IzDeposu.hareketModelleri))
+def test_skaler_ve_vektorize_guncelleme_ayni(hareketModeli):
+    """guncelleTek ve hizVektoruGuncelle aynı halka tamponunu aynı sonuçla ilerletmeli"""
+    rng = np.random.default_rng(0)
+    konumlar = rng.uniform(50, 400, (5, 2)).astype(np.int64).tolist()
+    depolar = []
+    for skalerSinir in (float("inf"), 0):
+        depo = IzDeposu(4, hareketModeli)   # 5. iz kapasiteyi büyütür
+        depo.skalerSinir = skalerSinir
+        for x, y in konumlar:
+            depo.ekle(x, x + 20, y, y + 20, 80.0, 0.0)
+        depolar.append(depo)
+
+    for kare in range(30):
+        # Her 7. kare önceki zaman damgasını tekrarlar (dt = 0 çifti); izlerin bir kısmı kaçırılır
+        simdi = (kare - (kare % 7 == 6)) / 30.0
+        secilen = np.flatnonzero(rng.random(5) < 0.8)
+        kutular = (np.array([[100, 100, 120, 120]]) + rng.integers(-5, 6, (len(secilen), 4))).astype(np.int64)
+        guvenler = rng.uniform(50, 95, len(secilen))
+        for depo in depolar:
+            depo.tahminEt(depo.aktifIndeksler(), simdi)
+            depo.guncelle(secilen, kutular, guvenler, simdi)
+
+    skaler, vektorize = depolar
+    for alan in ("kutular", "gecmis", "gecmisBas", "gecmisSayi", "farkToplami", "farkSayi", "toplamHits",
+                 "stabilite", "guven"):
+        assert np.array_equal(getattr(skaler, alan), getattr(vektorize, alan)), alan
+    for alan in ("hiz", "tahmin", "kfDurum"):
+        assert np.allclose(getattr(skaler, alan), getattr(vektorize, alan), rtol=1e-9, equal_nan=True), alan
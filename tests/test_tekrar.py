@@ -0,0 +1,56 @@
+"""tekrar.tekrarOynat - sabit tohumlu sentetik senaryoda takip sayaçları"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from senaryo import senaryoUret  # noqa: E402
+from takip import SimuleSaat, UltraKararliUcBalonSistemi  # noqa: E402
+from tekrar import tekrarOynat  # noqa: E402
+
+
+def kesintiliSenaryo():
+    """3 hedef, 240 kare; 100-109 arası kareler boş (HEAD kilidi düşer)"""
+    kareler = senaryoUret(3, 240, kesinti=0.02, sahte=1.0, tohum=1)
+    for kare in range(100, 110):
+        zaman, satirlar, kimlikler = kareler[kare]
+        kareler[kare] = (zaman, satirlar[:0], kimlikler[:0])
+    return kareler
+
+
+# (ID değişimi, HEAD değişimi, kilit kaybı, eşleşme) - model başına sabitlenmiş
+BEKLENEN = {
+    "hiz": (15, 4, 1, 504),
+    "kalman-cv": (16, 6, 1, 478),
+    "kalman-ca": (15, 4, 1, 479),
+}
+
+
+@pytest.mark.parametrize("hareketModeli", sorted(BEKLENEN))
+def test_sayaclar(hareketModeli):
+    sonuc = tekrarOynat(iter(kesintiliSenaryo()), 3, hareketModeli)
+    assert sonuc.kimlikVar
+    assert (sonuc.idDegisimi, sonuc.headDegisimi, sonuc.kilitKaybi, sonuc.eslesme) == BEKLENEN[hareketModeli]
+
+
+def test_gercek_kimlik_yoksa_id_degisimi_olculmez():
+    kareler = [(zaman, satirlar, np.full(len(satirlar), -1)) for zaman, satirlar, _ in kesintiliSenaryo()]
+    sonuc = tekrarOynat(iter(kareler), 3)
+    assert not sonuc.kimlikVar
+    assert sonuc.idDegisimi == 0
+    assert "ID değişimi: ölçülmedi" in sonuc.ozet()
+
+
+@pytest.mark.parametrize("hareketModeli", ["hiz", "kalman-cv"])
+def test_izgara_ve_yogun_eslestirme_ayni(hareketModeli):
+    kareler = senaryoUret(30, 120, sahte=3.0, tohum=2)
+    sonuclar = []
+    for izgaraEsigi in (float("inf"), 0):
+        sistem = UltraKararliUcBalonSistemi(30, hareketModeli, saat=SimuleSaat(kareler[0][0]), ayrintili=False)
+        sistem.izgaraEsigi = izgaraEsigi
+        sonuc = tekrarOynat(iter(kareler), sistem=sistem)
+        sonuclar.append((sonuc.idDegisimi, sonuc.headDegisimi, sonuc.kilitKaybi, sonuc.eslesme,
+                         sistem.depo.kimlik.tolist(), sistem.depo.kutular.tolist()))
+    assert sonuclar[0] == sonuclar[1]